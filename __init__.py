@@ -0,0 +1,4 @@
+# abMaya package init, bundled Maya modules each hold a part of the package, see libCore.bundle
+from pkgutil import extend_path
+
+__path__ = extend_path(__path__, __name__)
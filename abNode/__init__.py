@@ -1 +1,8 @@
-from api import 
+from abMaya.libCore.lib.lazy import attach
+
+__getattr__, __dir__, __all__ = attach(__name__, modules={
+    'geo'   : '.python.geo',
+    'label' : '.python.label',
+    'master': '.python.master',
+    'skin'  : '.python.skin',
+})
@@ -0,0 +1,233 @@
+"""
+    Joint label index.
+    Parses the side, type and name tokens of joints once from their names and Maya joint
+    labels into hashed lookup tables, so influence remapping, mirroring and weight import
+    resolve thousands of joints per call without scanning names.
+
+        index = LabelIndex.from_scene()
+        ids = index.lookup(['L_arm_jnt', '|root|spine_jnt', 'rig:R_leg_jnt'])
+        partners = index.partners[ids]
+        rows = index.remap(sourceInfluences, targetInfluences)
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+from collections import namedtuple
+
+import numpy as np
+# ----------------------------------------------------------------------------------------------- #
+
+
+# values of the joint side attribute
+CENTER, LEFT, RIGHT, NONE = range(4)
+
+# names of the joint type attribute values, 'Other' uses the otherType string
+JOINT_TYPES = [
+    'None', 'Root', 'Hip', 'Knee', 'Foot', 'Toe', 'Spine', 'Neck', 'Head', 'Collar', 'Shoulder',
+    'Elbow', 'Hand', 'Finger', 'Thumb', 'PropA', 'PropB', 'PropC', 'Other', 'Index Finger',
+    'Middle Finger', 'Ring Finger', 'Pinky Finger', 'Extra Finger', 'Big Toe', 'Index Toe',
+    'Middle Toe', 'Ring Toe', 'Pinky Toe', 'Foot Thumb',
+]
+OTHER = JOINT_TYPES.index('Other')
+
+# side tokens of joint names with their partner token, matched as whole '_' separated tokens
+SIDE_TOKENS = {
+    'L': (LEFT, 'R'), 'R': (RIGHT, 'L'),
+    'l': (LEFT, 'r'), 'r': (RIGHT, 'l'),
+    'Left': (LEFT, 'Right'), 'Right': (RIGHT, 'Left'),
+    'left': (LEFT, 'right'), 'right': (RIGHT, 'left'),
+    'lf': (LEFT, 'rt'), 'rt': (RIGHT, 'lf'),
+    'C': (CENTER, 'C'), 'M': (CENTER, 'M'), 'c': (CENTER, 'c'), 'mid': (CENTER, 'mid'),
+}
+SEPARATOR = '_'
+
+Label = namedtuple('Label', ['path', 'name', 'side', 'type', 'key'])
+
+
+# PARSING --------------------------------------------------------------------------------------- #
+def short_name(name):
+    """ :return name: name without DAG path and namespaces - str """
+    return name.rsplit('|', 1)[-1].rsplit(':', 1)[-1]
+
+
+def parse_name(name):
+    """
+    :param name:   joint name or DAG path, namespaces are ignored
+                    - str
+
+    :return label: side from the first side token and the name key with the side token
+                   replaced by '*', e.g. 'L_arm_jnt' -> (LEFT, '*_arm_jnt')
+                    - tuple (int, str)
+    """
+    tokens = short_name(name).split(SEPARATOR)
+    for position, token in enumerate(tokens):
+        if token in SIDE_TOKENS:
+            tokens[position] = '*'
+            return SIDE_TOKENS[token][0], SEPARATOR.join(tokens)
+    return NONE, SEPARATOR.join(tokens)
+
+
+def partner_name(name):
+    """ :return name: short name with the first side token swapped, itself without side - str """
+    tokens = short_name(name).split(SEPARATOR)
+    for position, token in enumerate(tokens):
+        if token in SIDE_TOKENS:
+            tokens[position] = SIDE_TOKENS[token][1]
+            break
+    return SEPARATOR.join(tokens)
+
+
+def label_key(side, jointType, otherType=''):
+    """ :return key: key of a Maya joint label, None for unlabeled joints - str """
+    if side == NONE or not jointType:
+        return None
+    if jointType == OTHER:
+        return 'label:' + otherType if otherType else None
+    return 'label:' + JOINT_TYPES[jointType]
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+class LabelIndex(object):
+    """ hashed lookup tables of joint names, paths, labels and side partners """
+    def __init__(self, paths, sides=None, types=None, otherTypes=None):
+        """
+        :param paths:      joint names or long DAG paths
+                            - list [str, str, ...]
+        :param sides:      joint label side per joint, parsed from the name if None
+                            - list [int, int, ...]
+        :param types:      joint label type per joint
+                            - list [int, int, ...]
+        :param otherTypes: joint label otherType string per joint
+                            - list [str, str, ...]
+        """
+        count = len(paths)
+        sides = sides if sides is not None else [NONE] * count
+        types = types if types is not None else [0] * count
+        otherTypes = otherTypes if otherTypes is not None else [''] * count
+
+        self.labels = []
+        self.ids    = {}  # short name, path and namespaced name -> id
+        self.paths  = list(paths)
+        for index, path in enumerate(self.paths):
+            nameSide, nameKey = parse_name(path)
+            labelSide = sides[index] if sides[index] != NONE else nameSide
+            key = label_key(labelSide, types[index], otherTypes[index])
+            self.labels.append(Label(path, short_name(path), labelSide if key else nameSide,
+                                     types[index], key or nameKey))
+            self.ids[path] = index
+            self.ids.setdefault(path.rsplit('|', 1)[-1], index)
+            self.ids.setdefault(short_name(path), index)
+
+        self.partners = self._find_partners()
+
+    def _find_partners(self):
+        """ pair left and right joints by label, or by name where labels are not unique """
+        keys = {}
+        for index, label in enumerate(self.labels):
+            keys.setdefault((label.key, label.side), []).append(index)
+
+        partners = np.arange(len(self.labels), dtype=np.int32)
+        opposite = {LEFT: RIGHT, RIGHT: LEFT}
+        for index, label in enumerate(self.labels):
+            if label.side not in opposite:
+                continue
+            matches = keys.get((label.key, opposite[label.side]), [])
+            if label.key.startswith('label:') and (len(matches) != 1
+                                                   or len(keys[(label.key, label.side)]) != 1):
+                # the label is shared by several joints, pair by name instead
+                matches = [self.ids[partner_name(label.name)]] \
+                    if partner_name(label.name) in self.ids else []
+            if len(matches) == 1:
+                partners[index] = matches[0]
+        return partners
+
+    @classmethod
+    def from_scene(cls, joints=None):
+        """
+        :param joints: joints to index, all joints of the scene if None
+                        - list [str, str, ...]
+
+        :return index: index of the joint names and Maya joint labels
+                        - LabelIndex
+        """
+        from maya import cmds
+        from maya.api import OpenMaya
+
+        selectionList = OpenMaya.MSelectionList()
+        for joint in joints or cmds.ls(type='joint', long=True):
+            selectionList.add(joint)
+
+        paths, sides, types, otherTypes = [], [], [], []
+        for index in range(selectionList.length()):
+            paths.append(selectionList.getDagPath(index).fullPathName())
+            nodeFn = OpenMaya.MFnDependencyNode(selectionList.getDependNode(index))
+            if not nodeFn.hasAttribute('side'):  # transforms used as influences
+                sides.append(NONE)
+                types.append(0)
+                otherTypes.append('')
+                continue
+            sides.append(nodeFn.findPlug('side', False).asInt())
+            types.append(nodeFn.findPlug('type', False).asInt())
+            otherTypes.append(nodeFn.findPlug('otherType', False).asString())
+        return cls(paths, sides, types, otherTypes)
+
+    def __len__(self):
+        return len(self.labels)
+
+    # QUERIES ----------------------------------------------------------------------------------- #
+    def lookup(self, names):
+        """
+        :param names: short names, DAG paths or namespaced names
+                       - list [str, str, ...]
+
+        :return ids:  index of every name, -1 for unknown names
+                       - ndarray int32 (nameCount,)
+        """
+        ids = self.ids
+        return np.array([ids.get(name, ids.get(short_name(name), -1)) for name in names],
+                        dtype=np.int32)
+
+    def mirror(self, names):
+        """ :return names: path of the side partner of every name, None if unknown - list """
+        ids = self.lookup(names)
+        return [self.paths[self.partners[index]] if index >= 0 else None for index in ids]
+
+    def remap(self, source, target, mirror=False):
+        """
+        :param source: influence names to map from
+                        - list [str, str, ...]
+        :param target: influence names to map to
+                        - list [str, str, ...]
+        :param mirror: map every source influence to its side partner
+                        - bool
+
+        :return rows:  index in target of every source influence, -1 if it is not in target
+                        - ndarray int32 (sourceCount,)
+        """
+        ids = self.lookup(source)
+        if mirror:
+            ids = np.where(ids >= 0, self.partners[ids], -1)
+        targetIds = self.lookup(target)
+        rows = np.full(len(self) + 1, -1, dtype=np.int32)  # last entry for unknown ids
+        known = targetIds >= 0
+        rows[targetIds[known][::-1]] = np.flatnonzero(known)[::-1].astype(np.int32)
+        return rows[ids]
+
+    def mirror_remap(self, influences):
+        """
+        :param influences: influence names, e.g. of a layer
+                            - list [str, str, ...]
+
+        :return rows:      index of the side partner of every influence, itself if missing
+                            - ndarray int32 (influenceCount,)
+        """
+        rows = self.remap(influences, influences, mirror=True)
+        return np.where(rows >= 0, rows, np.arange(len(influences), dtype=np.int32))
+
+    def side(self, names):
+        """ :return sides: side of every name, NONE for unknown names - ndarray int8 """
+        ids = self.lookup(names)
+        sides = np.array([label.side for label in self.labels] + [NONE], dtype=np.int8)
+        return sides[ids]
+# ----------------------------------------------------------------------------------------------- #
@@ -0,0 +1,322 @@
+"""
+    Asset master node registry.
+    Asset roots are transforms with an assetName attribute, optionally assetType and
+    assetVersion. The registry indexes them with one attribute pattern query on first use and
+    keeps the index current through node added, removed and DAG change callbacks plus an
+    attribute changed callback per master, so tools query assets by type, name and owned node
+    without scanning the scene.
+
+        registry = get_registry()
+        for asset in registry.assets('character'):
+            print(asset.path, asset.version, asset.geometry(), asset.skins())
+        registry.owner('|char_master|geo|body_geo').name
+
+    Roots that get the assetName attribute after creation are picked up by rescan() or
+    register(node).
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+from maya import cmds
+from maya.api import OpenMaya
+# ----------------------------------------------------------------------------------------------- #
+
+
+MASTER_ATTRIBUTE  = 'assetName'
+TYPE_ATTRIBUTE    = 'assetType'
+VERSION_ATTRIBUTE = 'assetVersion'
+METADATA_ATTRIBUTES = (MASTER_ATTRIBUTE, TYPE_ATTRIBUTE, VERSION_ATTRIBUTE)
+
+REGISTRY = None  # registry of get_registry
+
+
+# ----------------------------------------------------------------------------------------------- #
+def get_object(node):
+    """ :return mObject: dependency node of the given name - MObject """
+    selection = OpenMaya.MSelectionList()
+    selection.add(node)
+    return selection.getDependNode(0)
+
+
+def is_master(mObject):
+    """ :return master: True for transforms with the asset name attribute - bool """
+    return (mObject.hasFn(OpenMaya.MFn.kTransform)
+            and OpenMaya.MFnDependencyNode(mObject).hasAttribute(MASTER_ATTRIBUTE))
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+class Asset(object):
+    """ asset master node with its metadata, geometry and skin clusters are read on demand """
+    def __init__(self, mObject):
+        self.handle  = OpenMaya.MObjectHandle(mObject)
+        self.key     = self.handle.hashCode()
+        self._cache  = {}
+        self.refresh()
+
+    def refresh(self):
+        """ reread name, type and version from the node """
+        self.name    = self._read(MASTER_ATTRIBUTE)
+        self.type    = self._read(TYPE_ATTRIBUTE)
+        self.version = self._read(VERSION_ATTRIBUTE)
+
+    def _read(self, attribute):
+        node = self.path
+        if not cmds.attributeQuery(attribute, node=node, exists=True):
+            return None
+        return cmds.getAttr('{}.{}'.format(node, attribute))
+
+    @property
+    def path(self):
+        return OpenMaya.MFnDagNode(self.handle.object()).fullPathName()
+
+    def geometry(self):
+        """ :return meshes: long names of all non intermediate meshes below the root - list """
+        if 'geometry' not in self._cache:
+            self._cache['geometry'] = cmds.listRelatives(
+                self.path, allDescendents=True, type='mesh', fullPath=True, noIntermediate=True
+            ) or []
+        return self._cache['geometry']
+
+    def skins(self):
+        """ :return skinClusters: skin clusters deforming the asset geometry - list """
+        if 'skins' not in self._cache:
+            meshes = self.geometry()
+            history = (cmds.listHistory(meshes, pruneDagObjects=True) or []) if meshes else []
+            self._cache['skins'] = cmds.ls(history, type='skinCluster')
+        return self._cache['skins']
+
+    def invalidate(self):
+        """ forget geometry and skin clusters, reread on the next query """
+        self._cache = {}
+
+    def __repr__(self):
+        return 'Asset({!r}, type={!r}, version={!r})'.format(self.name, self.type, self.version)
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+class MasterRegistry(object):
+    """
+    Index of all asset master nodes of the scene.
+    Assets are keyed by object handle hash, so renames and reparenting keep them valid.
+    Added transforms are checked for the master attribute on the next query, the owner of a
+    node is found by walking up its DAG path once and cached until the hierarchy changes.
+    Assets whose name, type or version changed are read and indexed again on the next query.
+    """
+    def __init__(self):
+        self.callbacks = []
+        self._assets   = {}    # handle hash -> Asset
+        self._byType   = {}    # asset type -> {handle hash: Asset}
+        self._byName   = {}    # asset name -> Asset
+        self._owners   = {}    # node handle hash -> asset handle hash or None
+        self._pending  = {}    # handle hash -> handle of added transforms
+        self._stale    = set()  # handle hashes of assets with changed metadata
+        self._watched  = {}    # handle hash -> attribute changed callback of the asset
+        self.full      = True  # rescan on the next query
+
+    # CALLBACKS --------------------------------------------------------------------------------- #
+    def install(self):
+        """ keep the index current through scene callbacks """
+        if self.callbacks:
+            return
+        self.callbacks.append(
+            OpenMaya.MDGMessage.addNodeAddedCallback(self._node_added, 'transform')
+        )
+        self.callbacks.append(
+            OpenMaya.MDGMessage.addNodeRemovedCallback(self._node_removed, 'dagNode')
+        )
+        self.callbacks.append(OpenMaya.MDagMessage.addAllDagChangesCallback(self._dag_changed))
+        for message in (OpenMaya.MSceneMessage.kAfterOpen, OpenMaya.MSceneMessage.kAfterNew):
+            self.callbacks.append(OpenMaya.MSceneMessage.addCallback(message, self._scene_changed))
+
+    def remove(self):
+        """ remove all scene callbacks, the index is rescanned when installed again """
+        OpenMaya.MMessage.removeCallbacks(self.callbacks)
+        self.callbacks = []
+        self._unwatch_all()
+        self.full = True
+
+    def _watch(self, mObject, key):
+        if self.callbacks and key not in self._watched:
+            self._watched[key] = OpenMaya.MNodeMessage.addAttributeChangedCallback(
+                mObject, self._attribute_changed
+            )
+
+    def _unwatch(self, key):
+        callback = self._watched.pop(key, None)
+        if callback is None:
+            return
+        try:
+            OpenMaya.MMessage.removeCallback(callback)
+        except RuntimeError:  # already gone with its node, e.g. after a new scene
+            pass
+
+    def _unwatch_all(self):
+        for key in list(self._watched):
+            self._unwatch(key)
+
+    def _node_added(self, mObject, *args):
+        handle = OpenMaya.MObjectHandle(mObject)
+        self._pending[handle.hashCode()] = handle
+
+    def _node_removed(self, mObject, *args):
+        key = OpenMaya.MObjectHandle(mObject).hashCode()
+        self._pending.pop(key, None)
+        owner = self._assets.get(self._owners.pop(key, None))
+        if owner is not None:
+            owner.invalidate()
+        if key in self._assets:
+            self._remove(key)
+
+    def _dag_changed(self, message, child, parent, *args):
+        # reparenting changes the owner of a whole subtree, owners are looked up again lazily
+        childKey = OpenMaya.MObjectHandle(child.node()).hashCode()
+        previous = self._assets.get(self._owners.get(childKey))
+        current = self._owner_of(parent) if parent.length() else None
+        for asset in (previous, current):
+            if asset is not None:
+                asset.invalidate()
+        self._owners = {}
+
+    def _attribute_changed(self, message, plug, otherPlug, *args):
+        changes = (OpenMaya.MNodeMessage.kAttributeSet | OpenMaya.MNodeMessage.kAttributeAdded |
+                   OpenMaya.MNodeMessage.kAttributeRemoved)
+        if message & changes and plug.partialName(useLongNames=True) in METADATA_ATTRIBUTES:
+            self._stale.add(OpenMaya.MObjectHandle(plug.node()).hashCode())
+
+    def _scene_changed(self, *args):
+        self.full = True
+
+    # INDEX ------------------------------------------------------------------------------------- #
+    def _add(self, mObject):
+        asset = Asset(mObject)
+        self._assets[asset.key] = asset
+        self._index(asset)
+        self._watch(mObject, asset.key)
+        return asset
+
+    def _index(self, asset):
+        self._byType.setdefault(asset.type, {})[asset.key] = asset
+        if asset.name is not None:
+            self._byName[asset.name] = asset
+
+    def _unindex(self, asset):
+        self._byType.get(asset.type, {}).pop(asset.key, None)
+        if self._byName.get(asset.name) is asset:
+            del self._byName[asset.name]
+
+    def _remove(self, key):
+        asset = self._assets.pop(key)
+        self._unindex(asset)
+        self._unwatch(key)
+        self._stale.discard(key)
+        self._owners = {}
+
+    def _reindex(self, key):
+        """ read the metadata of a changed asset again, drop it if it is no master anymore """
+        asset = self._assets.get(key)
+        if asset is None:
+            return
+        if not asset.handle.isValid() or not is_master(asset.handle.object()):
+            self._remove(key)
+            return
+        self._unindex(asset)
+        asset.refresh()
+        self._index(asset)
+
+    def rescan(self):
+        """ rebuild the index with a single attribute pattern query """
+        self._unwatch_all()
+        self._assets, self._byType, self._byName, self._owners = {}, {}, {}, {}
+        self._pending, self._stale = {}, set()
+        nodes = cmds.ls('*.' + MASTER_ATTRIBUTE, objectsOnly=True, long=True, recursive=True)
+        for node in nodes or []:
+            mObject = get_object(node)
+            if is_master(mObject):
+                self._add(mObject)
+        self.full = False
+
+    def register(self, node):
+        """ add or update a single master node, e.g. after adding the attribute to it """
+        self._update()
+        mObject = get_object(node)
+        key = OpenMaya.MObjectHandle(mObject).hashCode()
+        if key in self._assets:
+            self._remove(key)
+        return self._add(mObject) if is_master(mObject) else None
+
+    def _update(self):
+        if self.full or not self.callbacks:
+            self.rescan()
+            return
+        pending, self._pending = self._pending, {}
+        for key, handle in pending.items():
+            if handle.isValid() and key not in self._assets and is_master(handle.object()):
+                self._add(handle.object())
+                self._owners = {}
+        stale, self._stale = self._stale, set()
+        for key in stale:
+            self._reindex(key)
+
+    # QUERIES ----------------------------------------------------------------------------------- #
+    def assets(self, assetType=None):
+        """
+        :param assetType: only assets of this type, all assets if None
+                           - str
+
+        :return assets:   registered assets
+                           - list [Asset, Asset, ...]
+        """
+        self._update()
+        if assetType is None:
+            return list(self._assets.values())
+        return list(self._byType.get(assetType, {}).values())
+
+    def find(self, name):
+        """ :return asset: asset of the given asset name, None if there is none - Asset """
+        self._update()
+        return self._byName.get(name)
+
+    def owner(self, node):
+        """
+        :param node:   any DAG node
+                        - str
+
+        :return asset: closest asset master above or at the node, None outside of assets
+                        - Asset
+        """
+        self._update()
+        selection = OpenMaya.MSelectionList()
+        selection.add(node)
+        return self._owner_of(selection.getDagPath(0))
+
+    def _owner_of(self, dagPath):
+        dagPath = OpenMaya.MDagPath(dagPath)
+        walked = []
+        owner = None
+        while dagPath.length():
+            key = OpenMaya.MObjectHandle(dagPath.node()).hashCode()
+            if key in self._owners:
+                owner = self._owners[key]
+                break
+            walked.append(key)
+            if key in self._assets:
+                owner = key
+                break
+            dagPath.pop()
+        for key in walked:
+            self._owners[key] = owner
+        return self._assets.get(owner)
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+def get_registry():
+    """ :return registry: shared registry, created and installed on first use - MasterRegistry """
+    global REGISTRY
+    if REGISTRY is None:
+        REGISTRY = MasterRegistry()
+        REGISTRY.install()
+    return REGISTRY
+# ----------------------------------------------------------------------------------------------- #
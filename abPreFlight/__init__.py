@@ -0,0 +1,7 @@
+from abMaya.libCore.lib.lazy import attach
+
+__getattr__, __dir__, __all__ = attach(__name__, attributes={
+    'IncrementalPreflight': '.api',
+    'load_config'         : '.api',
+    'run'                 : '.api',
+})
@@ -0,0 +1,363 @@
+"""
+Preflight engine.
+Loads the rules of a yaml config, scans the scene once into an indexed snapshot and runs
+all rule checks against that snapshot on a thread pool.
+IncrementalPreflight re-runs only the rules affected by nodes changed since the last run.
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import hashlib
+import json
+import os
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from abMaya.libCore.lib.resources import resource_path
+
+from .core import mesh_rules  # registers the mesh hygiene rule pack
+from .core.rules import create_rule
+# ----------------------------------------------------------------------------------------------- #
+
+
+DEFAULT_CONFIG = resource_path(__file__, 'config', 'default.yml')
+CACHE_VERSION  = 1
+
+
+# CONFIG ---------------------------------------------------------------------------------------- #
+def load_config(path=None):
+    """
+    :param path:   path of a yaml preflight config, defaults to config/default.yml
+                    - str
+
+    :return config: parsed config
+                    - dict
+    """
+    import yaml  # first use only, keeps the package import cheap
+
+    with open(path or DEFAULT_CONFIG, 'r') as config_file:
+        return yaml.safe_load(config_file) or {}
+
+
+def load_rules(config):
+    """
+    :param config: parsed preflight config
+                    - dict
+
+    :return rules: configured rule instances
+                    - list [Rule, Rule, ...]
+    """
+    return [create_rule(entry) for entry in config.get('rules') or []]
+
+
+def required_attributes(rules):
+    """
+    :param rules:       rule instances
+                         - list [Rule, Rule, ...]
+
+    :return attributes: union of the attributes read by all rules
+                         - dict {nodeType: [str, str, ...], ...}
+    """
+    attributes = {}
+    for rule in rules:
+        for nodeType, names in rule.attributes().items():
+            merged = attributes.setdefault(nodeType, [])
+            merged.extend(name for name in names if name not in merged)
+    return attributes
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ENGINE ---------------------------------------------------------------------------------------- #
+def run_rule(rule, snapshot):
+    """
+    :param rule:     rule instance
+                      - Rule
+    :param snapshot: indexed scene snapshot
+                      - SceneSnapshot
+
+    :return result:  issues and wall time of the rule
+                      - dict
+    """
+    start = time.perf_counter()
+    try:
+        issues = [list(issue) for issue in rule.check(snapshot)]
+        error = None
+    except Exception as exception:
+        issues = []
+        error = '{}: {}'.format(type(exception).__name__, exception)
+
+    return {
+        'rule': rule.label,
+        'severity': rule.severity,
+        'issues': issues,
+        'error': error,
+        'seconds': time.perf_counter() - start,
+    }
+
+
+def check_snapshot(rules, snapshot, threads=None):
+    """
+    :param rules:    rule instances
+                      - list [Rule, Rule, ...]
+    :param snapshot: indexed scene snapshot
+                      - SceneSnapshot
+    :param threads:  number of worker threads, 0 runs all rules in the calling thread
+                      - int
+
+    :return results: rule results in rule order, see run_rule
+                      - list [dict, dict, ...]
+    """
+    if threads == 0:
+        return [run_rule(rule, snapshot) for rule in rules]
+
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        return list(pool.map(lambda rule: run_rule(rule, snapshot), rules))
+
+
+def run(config=None, snapshot=None, threads=None):
+    """
+    Run a preflight check.
+
+    :param config:   parsed preflight config or path of a yaml config, defaults to default.yml
+                      - dict
+                      - str
+    :param snapshot: snapshot to check, scans the open Maya scene if None
+                      - SceneSnapshot
+    :param threads:  number of worker threads
+                      - int
+
+    :return report:  rule results, issue count, scan time and total wall time
+                      - dict
+    """
+    start = time.perf_counter()
+    if not isinstance(config, dict):
+        config = load_config(config)
+    rules = load_rules(config)
+
+    scan_time = 0.0
+    if snapshot is None:
+        from .core.scan import scan_scene  # requires Maya, snapshots can be built without it
+        scan_start = time.perf_counter()
+        geometry = any(rule.geometry for rule in rules)
+        snapshot = scan_scene(required_attributes(rules), geometry=geometry)
+        scan_time = time.perf_counter() - scan_start
+
+    results = check_snapshot(rules, snapshot, threads)
+
+    return {
+        'nodes': len(snapshot),
+        'rules': results,
+        'issues': sum(len(result['issues']) for result in results),
+        'scan': scan_time,
+        'wall': time.perf_counter() - start,
+    }
+
+
+def format_report(report):
+    """
+    :param report: preflight report, see run
+                    - dict
+
+    :return text:  human readable summary with per rule timings
+                    - str
+    """
+    lines = []
+    for result in report['rules']:
+        status = 'ERROR' if result['error'] else '{} issues'.format(len(result['issues']))
+        lines.append('{:<24}{:<10}{:>14}{:>10.3f}s'.format(
+            result['rule'], result['severity'], status, result['seconds']
+        ))
+        for node, message in result['issues']:
+            lines.append('    {}: {}'.format(node, message))
+        if result['error']:
+            lines.append('    {}'.format(result['error']))
+
+    lines.append('{} nodes, {} issues, scan {:.3f}s, total {:.3f}s'.format(
+        report['nodes'], report['issues'], report['scan'], report['wall']
+    ))
+    return '\n'.join(lines)
+# ----------------------------------------------------------------------------------------------- #
+
+
+# INCREMENTAL ----------------------------------------------------------------------------------- #
+def rule_key(rule):
+    """ identifies a rule and its config, results of a changed config are not reused """
+    content = repr((type(rule).__name__, rule.label, rule.severity, sorted(rule.options.items())))
+    return hashlib.blake2b(content.encode('utf-8'), digest_size=8).hexdigest()
+
+
+def default_cache_path(scene):
+    """ cache file of a scene in the temp directory """
+    digest = hashlib.blake2b(scene.encode('utf-8'), digest_size=8).hexdigest()
+    name = '{}_{}.json'.format(os.path.splitext(os.path.basename(scene))[0] or 'untitled', digest)
+    return os.path.join(tempfile.gettempdir(), 'abPreFlight', name)
+
+
+def load_cache(path):
+    """ previous fingerprints and results, empty if the cache is missing or outdated """
+    try:
+        with open(path, 'r') as cache_file:
+            cache = json.load(cache_file)
+    except (IOError, OSError, ValueError):
+        return {'fingerprints': {}, 'results': {}}
+    if cache.get('version') != CACHE_VERSION:
+        return {'fingerprints': {}, 'results': {}}
+    return cache
+
+
+def save_cache(path, fingerprints, results):
+    directory = os.path.dirname(path)
+    if directory and not os.path.isdir(directory):
+        os.makedirs(directory)
+    with open(path, 'w') as cache_file:
+        json.dump({'version': CACHE_VERSION, 'fingerprints': fingerprints, 'results': results},
+                  cache_file)
+
+
+def typed_fingerprints(snapshot):
+    """
+    :param snapshot:      indexed scene snapshot
+                           - SceneSnapshot
+
+    :return fingerprints: node type and content hash of every node, "type:hash"
+                           - dict {str: str, ...}
+    """
+    return {node: '{}:{}'.format(snapshot.types[node], fingerprint)
+            for node, fingerprint in snapshot.fingerprints().items()}
+
+
+def changed_nodes(previous, current):
+    """
+    :param previous: fingerprints of the last run
+                      - dict {str: str, ...}
+    :param current:  fingerprints of this run
+                      - dict {str: str, ...}
+
+    :return nodes:   nodes that were added, removed or changed content
+                      - set
+    """
+    changed = set(node for node, value in current.items() if previous.get(node) != value)
+    changed.update(node for node in previous if node not in current)
+    return changed
+
+
+def is_affected(rule, changedTypes):
+    nodeTypes = rule.node_types()
+    if nodeTypes is None:
+        return bool(changedTypes)
+    return bool(changedTypes.intersection(nodeTypes))
+
+
+# ----------------------------------------------------------------------------------------------- #
+class IncrementalPreflight(object):
+    """
+    Preflight runner that re-checks only the rules whose node types changed since the last run.
+
+    Per node content fingerprints and rule results are cached on disk, so repeated runs in
+    later sessions also skip unaffected rules. With tracking enabled, scene callbacks collect
+    the changed nodes and only those are rescanned into the snapshot kept from the last run.
+    """
+    def __init__(self, config=None, cache=None, threads=None, track=False):
+        """
+        :param config:  parsed preflight config or path of a yaml config
+                         - dict
+                         - str
+        :param cache:   path of the cache file, defaults to a file per scene in the temp directory
+                         - str
+        :param threads: number of worker threads
+                         - int
+        :param track:   track scene changes through callbacks, requires Maya
+                         - bool
+        """
+        if not isinstance(config, dict):
+            config = load_config(config)
+        self.rules      = load_rules(config)
+        self.attributes = required_attributes(self.rules)
+        self.geometry   = any(rule.geometry for rule in self.rules)
+        self.cache      = cache
+        self.threads    = threads
+        self.snapshot   = None
+        self.tracker    = None
+
+        if track:
+            from .core.tracker import DirtyTracker
+            self.tracker = DirtyTracker(list(self.attributes))
+
+    def cache_path(self):
+        if self.cache:
+            return self.cache
+        from maya import cmds
+        return default_cache_path(cmds.file(q=True, sceneName=True) or 'untitled')
+
+    def scan(self):
+        """ full scan, or a rescan of the tracked changes merged into the last snapshot """
+        from .core.scan import scan_scene
+
+        if self.snapshot is None or self.tracker is None or self.tracker.full:
+            self.snapshot = scan_scene(self.attributes, geometry=self.geometry)
+        else:
+            changed, removed = self.tracker.dirty()
+            for node in removed.union(changed):
+                self.snapshot.remove_node(node)
+            partial = scan_scene(self.attributes, nodes=list(changed), geometry=self.geometry)
+            for node in partial.nodes:
+                self.snapshot.add_node(node, partial.types[node], partial.attributes.get(node))
+                if node in partial.meshes:
+                    self.snapshot.set_mesh(node, partial.meshes[node])
+
+        if self.tracker:
+            self.tracker.reset()
+        return self.snapshot
+
+    def run(self, snapshot=None):
+        """
+        :param snapshot: snapshot to check, scans the open Maya scene if None
+                          - SceneSnapshot
+
+        :return report:  preflight report, see run, with the rechecked rule labels
+                          - dict
+        """
+        start = time.perf_counter()
+        cache_path = self.cache_path()
+        cache = load_cache(cache_path)
+
+        scan_time = 0.0
+        if snapshot is None:
+            snapshot = self.scan()
+            scan_time = time.perf_counter() - start
+
+        fingerprints = typed_fingerprints(snapshot)
+        previous = cache['fingerprints']
+        changed = changed_nodes(previous, fingerprints)
+        changedTypes = set(
+            (fingerprints.get(node) or previous[node]).rsplit(':', 1)[0] for node in changed
+        )
+
+        keys = [rule_key(rule) for rule in self.rules]
+        stale = [(key, rule) for key, rule in zip(keys, self.rules)
+                 if key not in cache['results'] or is_affected(rule, changedTypes)]
+        fresh = dict(zip(
+            [key for key, _ in stale],
+            check_snapshot([rule for _, rule in stale], snapshot, self.threads)
+        ))
+
+        results = [fresh.get(key, cache['results'].get(key)) for key in keys]
+        save_cache(cache_path, fingerprints, dict(zip(keys, results)))
+
+        return {
+            'nodes': len(snapshot),
+            'rules': results,
+            'rechecked': [rule.label for _, rule in stale],
+            'changed': len(changed),
+            'issues': sum(len(result['issues']) for result in results),
+            'scan': scan_time,
+            'wall': time.perf_counter() - start,
+        }
+
+    def close(self):
+        """ remove the scene callbacks of the tracker """
+        if self.tracker:
+            self.tracker.remove()
+            self.tracker = None
+# ----------------------------------------------------------------------------------------------- #
@@ -0,0 +1,184 @@
+"""
+Standalone preflight of Maya ASCII files, without Maya.
+
+    python -m abMaya.abPreFlight.cli scenes/ --processes 8 --json report.json --junit report.xml
+
+Files are streamed into snapshots by core.ascii and checked with every rule of the config
+that does not need evaluated geometry. Directories are searched recursively for .ma files
+and all files are processed on a process pool.
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from xml.etree import ElementTree
+
+from . import api
+from .core.ascii import read_ascii
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+def collect_files(paths):
+    """
+    :param paths: Maya ASCII files or directories
+                   - list [str, str, ...]
+
+    :return files: all .ma files, directories are searched recursively
+                   - list [str, str, ...]
+    """
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, names in os.walk(path):
+                files.extend(os.path.join(root, name) for name in sorted(names)
+                             if name.lower().endswith('.ma'))
+        else:
+            files.append(path)
+    return files
+
+
+def static_rules(config):
+    """ rules of the config that can run on a file snapshot """
+    return [rule for rule in api.load_rules(config) if not rule.geometry]
+
+
+def check_file(path, config):
+    """
+    :param path:   path of a Maya ASCII file
+                    - str
+    :param config: parsed preflight config
+                    - dict
+
+    :return report: preflight report of the file, see api.run, with the parse time
+                    - dict
+    """
+    start = time.perf_counter()
+    rules = static_rules(config)
+    try:
+        snapshot = read_ascii(path, api.required_attributes(rules))
+    except (IOError, OSError, UnicodeError) as exception:
+        return {'file': path, 'error': str(exception), 'nodes': 0, 'rules': [], 'issues': 0,
+                'scan': 0.0, 'wall': time.perf_counter() - start}
+    parse_time = time.perf_counter() - start
+
+    results = api.check_snapshot(rules, snapshot, threads=0)
+    return {
+        'file': path,
+        'error': None,
+        'nodes': len(snapshot),
+        'rules': results,
+        'issues': sum(len(result['issues']) for result in results),
+        'scan': parse_time,
+        'wall': time.perf_counter() - start,
+    }
+
+
+def check_files(files, config, processes=None):
+    """
+    :param files:     paths of Maya ASCII files
+                       - list [str, str, ...]
+    :param config:    parsed preflight config
+                       - dict
+    :param processes: number of worker processes, 0 checks all files in this process
+                       - int
+
+    :return reports:  preflight report per file, in file order
+                       - list [dict, dict, ...]
+    """
+    if processes == 0:
+        return [check_file(path, config) for path in files]
+    with ProcessPoolExecutor(max_workers=processes) as pool:
+        return list(pool.map(check_file, files, [config] * len(files)))
+# ----------------------------------------------------------------------------------------------- #
+
+
+# REPORTS --------------------------------------------------------------------------------------- #
+def failed(report):
+    """ a file fails on read errors, rule errors and issues of error severity """
+    return bool(report['error']) or any(
+        result['error'] or (result['issues'] and result['severity'] == 'error')
+        for result in report['rules']
+    )
+
+
+def junit_report(reports):
+    """
+    :param reports: preflight report per file
+                     - list [dict, dict, ...]
+
+    :return xml:    JUnit xml with one test suite per file and one test case per rule
+                     - str
+    """
+    suites = ElementTree.Element('testsuites', name='abPreFlight')
+    for report in reports:
+        suite = ElementTree.SubElement(
+            suites, 'testsuite', name=report['file'], tests=str(len(report['rules'])),
+            time='{:.6f}'.format(report['wall'])
+        )
+        if report['error']:
+            case = ElementTree.SubElement(suite, 'testcase', name='read', classname=report['file'])
+            ElementTree.SubElement(case, 'error', message=report['error'])
+            continue
+
+        failures = 0
+        for result in report['rules']:
+            case = ElementTree.SubElement(
+                suite, 'testcase', name=result['rule'], classname=report['file'],
+                time='{:.6f}'.format(result['seconds'])
+            )
+            text = '\n'.join('{}: {}'.format(node, message) for node, message in result['issues'])
+            if result['error']:
+                ElementTree.SubElement(case, 'error', message=result['error'])
+                failures += 1
+            elif result['issues'] and result['severity'] == 'error':
+                failure = ElementTree.SubElement(
+                    case, 'failure', message='{} issues'.format(len(result['issues']))
+                )
+                failure.text = text
+                failures += 1
+            elif result['issues']:
+                ElementTree.SubElement(case, 'system-out').text = text
+        suite.set('failures', str(failures))
+
+    return ElementTree.tostring(suites, encoding='unicode')
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Preflight Maya ASCII files without Maya.')
+    parser.add_argument('paths', nargs='+', help='Maya ASCII files or directories')
+    parser.add_argument('--config', default=None, help='path of a yaml preflight config')
+    parser.add_argument('--processes', type=int, default=None, help='number of workers')
+    parser.add_argument('--json', default=None, help='path of the json report')
+    parser.add_argument('--junit', default=None, help='path of the JUnit xml report')
+    options = parser.parse_args(args)
+
+    start = time.perf_counter()
+    config = api.load_config(options.config)
+    reports = check_files(collect_files(options.paths), config, options.processes)
+    wall = time.perf_counter() - start
+
+    if options.json:
+        with open(options.json, 'w') as report_file:
+            json.dump({'files': reports, 'wall': wall}, report_file, indent=4)
+    if options.junit:
+        with open(options.junit, 'w') as report_file:
+            report_file.write(junit_report(reports))
+
+    failures = [report for report in reports if failed(report)]
+    for report in reports:
+        status = 'FAIL' if report in failures else 'ok'
+        print('{:<6}{:>6} issues{:>10.3f}s  {}'.format(
+            status, report['issues'], report['wall'], report['file']
+        ))
+    print('{} files, {} failed, {:.2f}s'.format(len(reports), len(failures), wall))
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
+# ----------------------------------------------------------------------------------------------- #
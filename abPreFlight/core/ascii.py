@@ -0,0 +1,231 @@
+"""
+Streaming Maya ASCII reader.
+Extracts createNode, setAttr and connectAttr records of a .ma file into a SceneSnapshot
+without Maya. Only values written to the file are known, nothing is evaluated.
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import re
+
+from .snapshot import SceneSnapshot, short_name
+# ----------------------------------------------------------------------------------------------- #
+
+
+TOKEN     = re.compile(r'"(?:[^"\\]|\\.)*"|[^\s;]+')
+ATTRIBUTE = re.compile(r'"\.([^"]*)"')
+COMMAND   = re.compile(r'\S+')
+
+# node types created without a parent that are still DAG nodes under the world
+DAG_TYPES = set([
+    'transform', 'joint', 'camera', 'mesh', 'nurbsCurve', 'nurbsSurface', 'locator',
+    'ikHandle', 'ikEffector', 'lodGroup', 'annotationShape', 'distanceDimShape',
+    'clusterHandle', 'deformBend', 'baseLattice', 'lattice', 'hikIKEffector',
+    'parentConstraint', 'pointConstraint', 'orientConstraint', 'aimConstraint',
+    'scaleConstraint', 'poleVectorConstraint', 'directionalLight', 'pointLight',
+    'spotLight', 'areaLight', 'ambientLight', 'volumeLight', 'place3dTexture',
+])
+
+# short attribute names as written by Maya, mapped to the long names used by rules
+ATTRIBUTE_ALIASES = {
+    'v': 'visibility',
+    'io': 'intermediateObject',
+    'ds': 'doubleSided',
+    'op': 'opposite',
+    't': 'translate',
+    'tx': 'translateX',
+    'ty': 'translateY',
+    'tz': 'translateZ',
+    'r': 'rotate',
+    'rx': 'rotateX',
+    'ry': 'rotateY',
+    'rz': 'rotateZ',
+    's': 'scale',
+    'sx': 'scaleX',
+    'sy': 'scaleY',
+    'sz': 'scaleZ',
+    'ro': 'rotateOrder',
+    'ove': 'overrideEnabled',
+    'lodv': 'lodVisibility',
+}
+
+KEYWORDS = {'yes': True, 'on': True, 'true': True, 'no': False, 'off': False, 'false': False}
+
+
+# ----------------------------------------------------------------------------------------------- #
+def statements(lines):
+    """
+    join the lines of a Maya ASCII file into statements, ending on semicolons outside of strings.
+
+    :param lines:      lines of the file
+                        - iterable [str, str, ...]
+
+    :return statements: generator of complete statements without the trailing semicolon
+                        - str
+    """
+    buffer = []
+    quoted = False
+    for line in lines:
+        if not buffer and (line.startswith('//') or not line.strip()):
+            continue
+        buffer.append(line)
+
+        if '"' in line:
+            quoted = _ends_quoted(line, quoted)
+        if quoted or not line.rstrip().endswith(';'):
+            continue
+
+        statement = ''.join(buffer).strip()
+        buffer = []
+        yield statement[:-1]
+
+
+def _ends_quoted(line, quoted):
+    """ whether a string literal is still open at the end of the line """
+    index = 0
+    while True:
+        index = line.find('"', index)
+        if index < 0:
+            return quoted
+        backslashes = 0
+        while index - backslashes - 1 >= 0 and line[index - backslashes - 1] == '\\':
+            backslashes += 1
+        if not backslashes % 2:
+            quoted = not quoted
+        index += 1
+
+
+def parse_value(token):
+    """ convert a setAttr value token into bool, int, float or str """
+    if token.startswith('"'):
+        return token[1:-1].replace('\\"', '"').replace('\\\\', '\\')
+    if token in KEYWORDS:
+        return KEYWORDS[token]
+    try:
+        return int(token)
+    except ValueError:
+        pass
+    try:
+        return float(token)
+    except ValueError:
+        return token
+
+
+def unquote(token):
+    return token[1:-1] if token.startswith('"') else token
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+class AsciiReader(object):
+    """
+    Builds a SceneSnapshot from the statements of a Maya ASCII file.
+    setAttr values are only parsed for the requested attributes, all other setAttr
+    statements are skipped after matching the attribute name.
+    """
+    def __init__(self, attributes=None):
+        """
+        :param attributes: attributes to read per node type, see Rule.attributes
+                            - dict {nodeType: [str, str, ...], ...}
+        """
+        self.attributes = attributes or {}
+        self.snapshot   = SceneSnapshot()
+        self.current    = None
+        self.dagNodes   = {}
+
+    def read(self, path):
+        """
+        :param path:      path of a Maya ASCII file
+                           - str
+
+        :return snapshot: snapshot of all nodes created in the file
+                           - SceneSnapshot
+        """
+        with open(path, 'r', errors='replace') as ascii_file:
+            for statement in statements(ascii_file):
+                command = COMMAND.match(statement).group()
+                if command == 'createNode':
+                    self.create_node(TOKEN.findall(statement)[1:])
+                elif command == 'setAttr':
+                    self.set_attr(statement)
+                elif command == 'connectAttr':
+                    self.connect_attr(TOKEN.findall(statement)[1:])
+                elif command == 'select':
+                    self.select(TOKEN.findall(statement)[1:])
+        return self.snapshot
+
+    def resolve(self, name):
+        """ long name of a node as written in the file """
+        if name.startswith('|') or name not in self.dagNodes:
+            return name
+        return self.dagNodes[name]
+
+    def create_node(self, tokens):
+        nodeType, name, parent = tokens[0], None, None
+        for index, token in enumerate(tokens[1:-1], 1):
+            if token == '-n':
+                name = unquote(tokens[index + 1])
+            elif token == '-p':
+                parent = unquote(tokens[index + 1])
+
+        name = name or nodeType + '1'
+        if parent is not None:
+            node = '{}|{}'.format(self.resolve(parent), name)
+            if not node.startswith('|'):
+                node = '|' + node
+        elif nodeType in DAG_TYPES:
+            node = '|' + name
+        else:
+            node = name
+
+        if node.startswith('|'):
+            self.dagNodes[short_name(node)] = node
+        self.snapshot.add_node(node, nodeType)
+        self.current = node
+
+    def select(self, tokens):
+        names = [unquote(token) for token in tokens if not token.startswith('-')]
+        if names:
+            self.current = self.resolve(names[0].lstrip(':'))
+
+    def set_attr(self, statement):
+        if self.current is None or self.current not in self.snapshot:
+            return
+        wanted = self.attributes.get(self.snapshot.types[self.current])
+        if not wanted:
+            return
+
+        match = ATTRIBUTE.search(statement)
+        if not match:
+            return
+        attribute = ATTRIBUTE_ALIASES.get(match.group(1), match.group(1))
+        if attribute not in wanted:
+            return  # values of unread attributes are never tokenized
+
+        values = TOKEN.findall(statement, match.end())
+        if len(values) > 1 and values[0] == '-type':
+            values = values[2:]
+        if not values:
+            return
+        values = [parse_value(token) for token in values]
+        value = values[0] if len(values) == 1 else values
+        self.snapshot.set_attribute(self.current, attribute, value)
+
+    def connect_attr(self, tokens):
+        plugs = [unquote(token) for token in tokens if not token.startswith('-')]
+        if len(plugs) >= 2:
+            self.snapshot.add_connection(plugs[0], plugs[1])
+
+
+def read_ascii(path, attributes=None):
+    """
+    :param path:       path of a Maya ASCII file
+                        - str
+    :param attributes: attributes to read per node type
+                        - dict {nodeType: [str, str, ...], ...}
+
+    :return snapshot:  snapshot of all nodes created in the file
+                        - SceneSnapshot
+    """
+    return AsciiReader(attributes).read(path)
+# ----------------------------------------------------------------------------------------------- #
@@ -0,0 +1,272 @@
+"""
+Mesh hygiene rule pack.
+All checks run as array operations over the bulk MeshData arrays of the snapshot,
+the check functions take MeshData and can be used without Maya.
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import time
+
+import numpy as np
+
+from abMaya.libModel.lib.raster import rasterize
+from abMaya.libModel.lib.synthetic import grid
+from abMaya.libModel.lib.topology import face_edges
+
+from .rules import Rule, register
+# ----------------------------------------------------------------------------------------------- #
+
+
+REPORTED_IDS = 10  # component IDs listed per issue message
+
+
+# CHECKS ---------------------------------------------------------------------------------------- #
+def face_areas(meshData):
+    """
+    :param meshData: bulk mesh arrays
+                      - MeshData
+
+    :return areas:   area of every face, from the polygon vector area
+                      - ndarray float64 (faceCount,)
+    """
+    edges = face_edges(meshData.faceCounts, meshData.faceConnects)
+    crosses = np.cross(meshData.points[edges[:, 0]], meshData.points[edges[:, 1]])
+    faces = np.repeat(np.arange(meshData.faceCount), meshData.faceCounts)
+
+    vectorArea = np.stack([
+        np.bincount(faces, weights=crosses[:, axis], minlength=meshData.faceCount)
+        for axis in range(3)
+    ], axis=1)
+    return 0.5 * np.linalg.norm(vectorArea, axis=1)
+
+
+def zero_area_faces(meshData, tolerance=1e-10):
+    """ :return faces: IDs of faces with an area below the tolerance - ndarray int64 """
+    return np.flatnonzero(face_areas(meshData) <= tolerance)
+
+
+def edge_face_counts(meshData):
+    """
+    :param meshData: bulk mesh arrays
+                      - MeshData
+
+    :return edges:   unique edges as sorted vertex ID pairs and the number of adjacent faces
+                      - tuple (ndarray int32 (edgeCount, 2), ndarray int64 (edgeCount,))
+    """
+    edges = np.sort(face_edges(meshData.faceCounts, meshData.faceConnects), axis=1)
+    keys = edges[:, 0].astype(np.int64) * meshData.vertexCount + edges[:, 1]
+    keys, counts = np.unique(keys, return_counts=True)
+    pairs = np.stack([keys // meshData.vertexCount, keys % meshData.vertexCount], axis=1)
+    return pairs.astype(np.int32), counts
+
+
+def non_manifold_edges(meshData):
+    """ :return edges: vertex ID pairs of edges shared by more than two faces - ndarray int32 """
+    edges, counts = edge_face_counts(meshData)
+    return edges[counts > 2]
+
+
+def lamina_faces(meshData):
+    """
+    :param meshData: bulk mesh arrays
+                      - MeshData
+
+    :return faces:   IDs of faces that share all of their vertices with another face
+                      - ndarray int64
+    """
+    faceStarts = np.cumsum(meshData.faceCounts) - meshData.faceCounts
+    lamina = []
+    for size in np.unique(meshData.faceCounts):
+        faces = np.flatnonzero(meshData.faceCounts == size)
+        if len(faces) < 2:
+            continue
+        positions = faceStarts[faces][:, None] + np.arange(size)
+        vertices = np.sort(meshData.faceConnects[positions], axis=1)
+        _, inverse, counts = np.unique(vertices, axis=0, return_inverse=True, return_counts=True)
+        lamina.append(faces[counts[inverse.reshape(-1)] > 1])
+    return np.sort(np.concatenate(lamina)) if lamina else np.zeros(0, dtype=np.int64)
+
+
+def unused_vertices(meshData):
+    """ :return vertices: IDs of vertices not used by any face - ndarray int64 """
+    usage = np.bincount(meshData.faceConnects, minlength=meshData.vertexCount)
+    return np.flatnonzero(usage == 0)
+
+
+def nan_points(meshData):
+    """ :return vertices: IDs of vertices with NaN or infinite positions - ndarray int64 """
+    return np.flatnonzero(~np.isfinite(meshData.points).all(axis=1))
+
+
+def overlapping_uv_shells(meshData, resolution=1024):
+    """
+    find uv shells that cover the same area of uv space.
+    all uv triangles are rasterized at once, pixels covered by more than one shell overlap.
+    Shells that only touch along an edge do not overlap, see raster.rasterize.
+
+    :param meshData:   bulk mesh arrays with uvs
+                        - MeshData
+    :param resolution: raster pixels along the longer side of the uv bounding box
+                        - int
+
+    :return shells:    shell labels of all overlapping shells, see MeshData.uv_shells
+                        - ndarray int64
+    """
+    if meshData.uvs is None or not len(meshData.uvs):
+        return np.zeros(0, dtype=np.int64)
+
+    shells = meshData.uv_shells()
+    uvStarts = np.cumsum(meshData.uvCounts) - meshData.uvCounts
+    triangles = []
+    for size in np.unique(meshData.uvCounts[meshData.uvCounts >= 3]):
+        positions = uvStarts[meshData.uvCounts == size][:, None] + np.arange(size)
+        corners = meshData.uvIds[positions]
+        for index in range(1, size - 1):
+            triangles.append(corners[:, [0, index, index + 1]])
+    if not triangles:
+        return np.zeros(0, dtype=np.int64)
+    triangles = np.concatenate(triangles)
+
+    uvs = meshData.uvs
+    low, high = uvs.min(axis=0), uvs.max(axis=0)
+    scale = resolution / max(float((high - low).max()), 1e-12)
+    width, height = [int(np.ceil(span * scale)) + 1 for span in (high - low)]
+    pixels = (uvs - low) * scale
+
+    keys = []
+    for index, pixelX, pixelY, _ in rasterize(pixels[triangles], width, height):
+        shell = shells[triangles[index, 0]]
+        keys.append(np.unique((pixelY * width + pixelX) * len(uvs) + shell))
+    if not keys:
+        return np.zeros(0, dtype=np.int64)
+
+    keys = np.unique(np.concatenate(keys))
+    pixel, shell = keys // len(uvs), keys % len(uvs)
+    _, inverse, counts = np.unique(pixel, return_inverse=True, return_counts=True)
+    return np.unique(shell[counts[inverse] > 1])
+# ----------------------------------------------------------------------------------------------- #
+
+
+# RULES ----------------------------------------------------------------------------------------- #
+def format_ids(ids):
+    ids = np.asarray(ids).reshape(-1)
+    listed = ', '.join(str(int(index)) for index in ids[:REPORTED_IDS])
+    return listed + (', ...' if len(ids) > REPORTED_IDS else '')
+
+
+class MeshRule(Rule):
+    """ base class of rules that check the MeshData of every mesh in the snapshot """
+    geometry    = True
+    description = None
+
+    def node_types(self):
+        return ['mesh']
+
+    def find(self, meshData):
+        """ :return ids: failing component IDs - ndarray """
+        raise NotImplementedError
+
+    def check(self, snapshot):
+        issues = []
+        for node in snapshot.of_type('mesh'):
+            meshData = snapshot.meshes.get(node)
+            if meshData is None:
+                continue
+            ids = self.find(meshData)
+            if len(ids):
+                message = '{} {}: {}'.format(len(ids), self.description, format_ids(ids))
+                issues.append((node, message))
+        return issues
+
+
+@register
+class ZeroAreaFaces(MeshRule):
+    name        = 'zero_area_faces'
+    description = 'zero area faces'
+
+    def find(self, meshData):
+        return zero_area_faces(meshData, self.options.get('tolerance', 1e-10))
+
+
+@register
+class LaminaFaces(MeshRule):
+    name        = 'lamina_faces'
+    description = 'lamina faces'
+
+    def find(self, meshData):
+        return lamina_faces(meshData)
+
+
+@register
+class NonManifoldEdges(MeshRule):
+    name        = 'non_manifold_edges'
+    description = 'non-manifold edges (vertex pairs)'
+
+    def find(self, meshData):
+        return non_manifold_edges(meshData)
+
+
+@register
+class UnusedVertices(MeshRule):
+    name        = 'unused_vertices'
+    description = 'unused vertices'
+
+    def find(self, meshData):
+        return unused_vertices(meshData)
+
+
+@register
+class NanPoints(MeshRule):
+    name        = 'nan_points'
+    description = 'NaN points'
+
+    def find(self, meshData):
+        return nan_points(meshData)
+
+
+@register
+class OverlappingUvShells(MeshRule):
+    name        = 'overlapping_uv_shells'
+    description = 'overlapping uv shells (first uv of shell)'
+
+    def find(self, meshData):
+        return overlapping_uv_shells(meshData, self.options.get('resolution', 1024))
+# ----------------------------------------------------------------------------------------------- #
+
+
+# BENCHMARK ------------------------------------------------------------------------------------- #
+CHECKS = {
+    'zero_area_faces'      : zero_area_faces,
+    'lamina_faces'         : lamina_faces,
+    'non_manifold_edges'   : non_manifold_edges,
+    'unused_vertices'      : unused_vertices,
+    'nan_points'           : nan_points,
+    'overlapping_uv_shells': overlapping_uv_shells,
+}
+
+
+def benchmark(faces=2000000):
+    """
+    Time every mesh check on a synthetic quad grid.
+
+    :param faces:    approximate number of faces of the grid
+                      - int
+
+    :return timings: wall time in seconds per check and the face count of the grid
+                      - dict {str: float, ...}
+    """
+    side = int(round(np.sqrt(faces)))
+    meshData = grid(side, side)
+    timings = {'faces': meshData.faceCount}
+    for name, check in CHECKS.items():
+        start = time.perf_counter()
+        check(meshData)
+        timings[name] = time.perf_counter() - start
+    return timings
+
+
+if __name__ == '__main__':
+    for name, value in benchmark().items():
+        print('{:<24}{}'.format(name, value))
+# ----------------------------------------------------------------------------------------------- #
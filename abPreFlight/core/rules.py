@@ -0,0 +1,173 @@
+"""
+Preflight rules, each rule checks a SceneSnapshot and never queries the scene itself.
+Rules are registered by name and configured through the rules list of the preflight config.
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+from collections import Counter
+
+from .snapshot import short_name
+# ----------------------------------------------------------------------------------------------- #
+
+
+RULES = {}
+
+
+def register(cls):
+    """ class decorator adding a rule to the registry under its name """
+    RULES[cls.name] = cls
+    return cls
+
+
+def create_rule(entry):
+    """
+    :param entry: rule entry of the config, the rule key selects the registered rule,
+                  all remaining keys are passed on as options
+                   - dict
+
+    :return rule: configured rule instance
+                   - Rule
+    """
+    options = dict(entry)
+    name = options.pop('rule')
+    if name not in RULES:
+        raise KeyError('unknown preflight rule: {}'.format(name))
+    return RULES[name](**options)
+
+
+# ----------------------------------------------------------------------------------------------- #
+class Rule(object):
+    """
+    Base class of all preflight rules.
+    Subclasses set name, describe the node types they inspect through node_types
+    and implement check. Rules that set geometry get the MeshData of all meshes
+    in the meshes dict of the snapshot.
+    """
+    name     = None
+    geometry = False
+
+    def __init__(self, label=None, severity='error', **options):
+        """
+        :param label:    name of this rule instance in reports, defaults to the rule name
+                          - str
+        :param severity: severity of the reported issues
+                          - str ('error', 'warning')
+        :param options:  rule specific options
+        """
+        self.label    = label or self.name
+        self.severity = severity
+        self.options  = options
+
+    def node_types(self):
+        """
+        :return nodeTypes: node types inspected by the rule, None if the rule inspects all nodes
+                            - list [str, str, ...]
+        """
+        return None
+
+    def attributes(self):
+        """
+        :return attributes: attribute values the rule reads from the snapshot
+                             - dict {nodeType: [str, str, ...], ...}
+        """
+        return {}
+
+    def check(self, snapshot):
+        """
+        :param snapshot: indexed scene snapshot
+                          - SceneSnapshot
+
+        :return issues:  failing nodes with a message
+                          - list [(str, str), ...]
+        """
+        raise NotImplementedError
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+@register
+class ForbiddenTypes(Rule):
+    """ nodes of forbidden types, e.g. unknown nodes of missing plugins """
+    name = 'forbidden_types'
+
+    def node_types(self):
+        return list(self.options.get('types', []))
+
+    def check(self, snapshot):
+        return [(node, 'forbidden node type {}'.format(snapshot.types[node]))
+                for node in snapshot.of_type(*self.node_types())]
+
+
+@register
+class UniqueNames(Rule):
+    """ nodes sharing their short name with another node """
+    name = 'unique_names'
+
+    def node_types(self):
+        return self.options.get('types')
+
+    def check(self, snapshot):
+        nodes = snapshot.of_type(*(self.node_types() or []))
+        counts = Counter(short_name(node) for node in nodes)
+        return [(node, 'name is not unique') for node in nodes if counts[short_name(node)] > 1]
+
+
+@register
+class Namespaces(Rule):
+    """ nodes inside namespaces that are not allowed """
+    name = 'namespaces'
+
+    def check(self, snapshot):
+        allowed = set(self.options.get('allowed', []))
+        allowed.add('')
+        issues = []
+        for name, nodes in snapshot.byNamespace.items():
+            if name in allowed:
+                continue
+            issues.extend((node, 'namespace {} is not allowed'.format(name)) for node in nodes)
+        return issues
+
+
+@register
+class AttributeValues(Rule):
+    """ attributes that do not match their expected value """
+    name = 'attribute_values'
+
+    def node_types(self):
+        return list(self.options.get('types', []))
+
+    def attributes(self):
+        names = list(self.options.get('values', {}))
+        return {nodeType: names for nodeType in self.node_types()}
+
+    def check(self, snapshot):
+        tolerance = self.options.get('tolerance', 1e-6)
+        issues = []
+        for node in snapshot.of_type(*self.node_types()):
+            for attribute, expected in self.options.get('values', {}).items():
+                value = snapshot.get_attribute(node, attribute)
+                if value is None:
+                    continue
+                if isinstance(expected, float) or isinstance(value, float):
+                    matches = abs(value - expected) <= tolerance
+                else:
+                    matches = value == expected
+                if not matches:
+                    message = '{} is {}, expected {}'.format(attribute, value, expected)
+                    issues.append((node, message))
+        return issues
+
+
+@register
+class EmptyGroups(Rule):
+    """ transforms without any children """
+    name = 'empty_groups'
+
+    def node_types(self):
+        return ['transform']
+
+    def check(self, snapshot):
+        return [(node, 'empty group') for node in snapshot.of_type('transform')
+                if not snapshot.children.get(node)]
+# ----------------------------------------------------------------------------------------------- #
@@ -0,0 +1,57 @@
+"""
+Single pass scene scan into a SceneSnapshot.
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+from maya import cmds
+
+from abMaya.libContext.lib.attributes import get_plug, get_plug_value
+from abMaya.libModel.lib.mesh import get_mesh_data
+
+from .snapshot import SceneSnapshot
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+def scan_scene(attributes=None, nodes=None, geometry=False):
+    """
+    List all nodes with their type in one ls query, then read the requested attributes
+    of the matching node types through the API and optionally the bulk arrays of all meshes.
+
+    :param attributes: attributes to read per node type
+                        - dict {nodeType: [str, str, ...], ...}
+    :param nodes:      restrict the scan to the given nodes, whole scene if None
+                        - list [str, str, ...]
+    :param geometry:   read MeshData of all non intermediate meshes
+                        - bool
+
+    :return snapshot:  indexed scene snapshot
+                        - SceneSnapshot
+    """
+    snapshot = SceneSnapshot()
+
+    if nodes is None:
+        listing = cmds.ls(long=True, showType=True) or []
+    else:
+        listing = cmds.ls(nodes, long=True, showType=True) if nodes else []
+
+    for index in range(0, len(listing), 2):
+        snapshot.add_node(listing[index], listing[index + 1])
+
+    for nodeType, names in (attributes or {}).items():
+        for node in snapshot.of_type(nodeType):
+            for attribute in names:
+                try:
+                    value = get_plug_value(get_plug('{}.{}'.format(node, attribute)))
+                except (RuntimeError, ValueError):
+                    continue  # attribute does not exist on this node
+                snapshot.set_attribute(node, attribute, value)
+
+    if geometry:
+        for node in snapshot.of_type('mesh'):
+            if not cmds.getAttr('{}.intermediateObject'.format(node)):
+                snapshot.set_mesh(node, get_mesh_data(node))
+
+    return snapshot
+# ----------------------------------------------------------------------------------------------- #
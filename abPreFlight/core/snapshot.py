@@ -0,0 +1,170 @@
+"""
+Indexed scene snapshot shared by all preflight rules.
+Independent of Maya, the snapshot is filled by abPreFlight.core.scan.
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import hashlib
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+def short_name(node):
+    """ node name without DAG path """
+    return node.rsplit('|', 1)[-1]
+
+
+def namespace(node):
+    """ namespace of a node, empty string for the root namespace """
+    name = short_name(node)
+    return name.rsplit(':', 1)[0] if ':' in name else ''
+
+
+def parent(node):
+    """ long name of the DAG parent, None for DG nodes and world children """
+    if not node.startswith('|') or node.count('|') < 2:
+        return None
+    return node.rsplit('|', 1)[0]
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+class SceneSnapshot(object):
+    """
+    Nodes of a scene indexed by type, namespace and DAG parent,
+    plus the attribute values and mesh data requested by the active rules
+    and, where the source provides them, the connections between plugs.
+    Node names are long names, DAG nodes include their full path.
+    """
+    def __init__(self):
+        self.nodes       = []
+        self.types       = {}
+        self.byType      = {}
+        self.byNamespace = {}
+        self.children    = {}
+        self.attributes  = {}
+        self.meshes      = {}
+        self.connections = []
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def __contains__(self, node):
+        return node in self.types
+
+    def add_node(self, node, nodeType, attributes=None):
+        """
+        :param node:       long name of the node
+                            - str
+        :param nodeType:   type of the node
+                            - str
+        :param attributes: attribute values of the node
+                            - dict {str: value, ...}
+        """
+        if node not in self.types:
+            self.nodes.append(node)
+            self.byType.setdefault(nodeType, []).append(node)
+            self.byNamespace.setdefault(namespace(node), []).append(node)
+            nodeParent = parent(node)
+            if nodeParent:
+                self.children.setdefault(nodeParent, []).append(node)
+        self.types[node] = nodeType
+
+        if attributes:
+            self.attributes.setdefault(node, {}).update(attributes)
+
+    def remove_node(self, node):
+        """
+        :param node: long name of the node, unknown nodes are ignored
+                      - str
+        """
+        nodeType = self.types.pop(node, None)
+        if nodeType is None:
+            return
+
+        self.nodes.remove(node)
+        self.byType[nodeType].remove(node)
+        self.byNamespace[namespace(node)].remove(node)
+        self.attributes.pop(node, None)
+        self.meshes.pop(node, None)
+        nodeParent = parent(node)
+        if nodeParent in self.children:
+            self.children[nodeParent].remove(node)
+
+    def set_attribute(self, node, attribute, value):
+        self.attributes.setdefault(node, {})[attribute] = value
+
+    def get_attribute(self, node, attribute, default=None):
+        return self.attributes.get(node, {}).get(attribute, default)
+
+    def add_connection(self, source, destination):
+        """
+        :param source:      source plug, "node.attribute"
+                             - str
+        :param destination: destination plug, "node.attribute"
+                             - str
+        """
+        self.connections.append((source, destination))
+
+    def set_mesh(self, node, meshData):
+        """
+        :param node:     long name of the mesh
+                          - str
+        :param meshData: bulk arrays of the mesh
+                          - MeshData
+        """
+        self.meshes[node] = meshData
+
+    def of_type(self, *nodeTypes):
+        """
+        :param nodeTypes: node types, all nodes if none are given
+                           - str
+
+        :return nodes:    nodes of the given types
+                           - list [str, str, ...]
+        """
+        if not nodeTypes:
+            return list(self.nodes)
+        nodes = []
+        for nodeType in nodeTypes:
+            nodes.extend(self.byType.get(nodeType, []))
+        return nodes
+
+    def in_namespace(self, name):
+        return list(self.byNamespace.get(name, []))
+
+    def children_of(self, node):
+        return list(self.children.get(node, []))
+
+    def fingerprint(self, node):
+        """
+        :param node:        long name of the node
+                             - str
+
+        :return fingerprint: hash of everything rules can see of the node,
+                             its type, attribute values, children and mesh data
+                             - str
+        """
+        content = repr((
+            self.types[node],
+            sorted(self.attributes.get(node, {}).items()),
+            sorted(self.children.get(node, [])),
+        ))
+        digest = hashlib.blake2b(content.encode('utf-8'), digest_size=8)
+
+        meshData = self.meshes.get(node)
+        if meshData is not None:
+            for array in (meshData.points, meshData.faceCounts, meshData.faceConnects,
+                          meshData.uvs, meshData.uvIds):
+                if array is not None:
+                    digest.update(array.tobytes())
+        return digest.hexdigest()
+
+    def fingerprints(self):
+        """
+        :return fingerprints: content hash of every node, see fingerprint
+                               - dict {str: str, ...}
+        """
+        return {node: self.fingerprint(node) for node in self.nodes}
+# ----------------------------------------------------------------------------------------------- #
@@ -0,0 +1,120 @@
+"""
+Scene change tracking between preflight runs.
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+from maya import cmds
+from maya.api import OpenMaya
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+def node_name(mObject):
+    """ long name of a DAG node or name of a DG node """
+    if mObject.hasFn(OpenMaya.MFn.kDagNode):
+        return OpenMaya.MFnDagNode(mObject).fullPathName()
+    return OpenMaya.MFnDependencyNode(mObject).name()
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+class DirtyTracker(object):
+    """
+    Collects the nodes that changed since the last reset through scene callbacks.
+    Added nodes, removed nodes, connection changes and attribute changes on the tracked
+    node types mark nodes dirty. Renames and reparenting of existing nodes change long names
+    and request a full rescan instead.
+    Changed nodes are kept as object handles and resolved to names when queried,
+    so nodes that are created and parented afterwards report their final path.
+    """
+    def __init__(self, nodeTypes=None):
+        """
+        :param nodeTypes: node types whose attribute changes are tracked
+                           - list [str, str, ...]
+        """
+        self.nodeTypes = list(nodeTypes or [])
+        self.callbacks = []
+        self.watched   = set()
+        self.changed   = {}
+        self.added     = set()
+        self.removed   = set()
+        self.full      = False
+
+        self.callbacks.append(OpenMaya.MDGMessage.addNodeAddedCallback(self._node_added))
+        self.callbacks.append(OpenMaya.MDGMessage.addNodeRemovedCallback(self._node_removed))
+        self.callbacks.append(OpenMaya.MDGMessage.addConnectionCallback(self._connection))
+        self.callbacks.append(
+            OpenMaya.MNodeMessage.addNameChangedCallback(OpenMaya.MObject(), self._renamed)
+        )
+        self.callbacks.append(OpenMaya.MDagMessage.addAllDagChangesCallback(self._dag_changed))
+
+        for node in cmds.ls(type=self.nodeTypes, long=True) if self.nodeTypes else []:
+            selection = OpenMaya.MSelectionList()
+            selection.add(node)
+            self.watch(selection.getDependNode(0))
+
+    def watch(self, mObject):
+        """ track attribute changes of a node """
+        handle = OpenMaya.MObjectHandle(mObject)
+        if handle.hashCode() in self.watched:
+            return
+        self.callbacks.append(
+            OpenMaya.MNodeMessage.addAttributeChangedCallback(mObject, self._attribute_changed)
+        )
+        self.watched.add(handle.hashCode())
+
+    def _mark(self, mObject):
+        handle = OpenMaya.MObjectHandle(mObject)
+        self.changed[handle.hashCode()] = handle
+        return handle.hashCode()
+
+    def _node_added(self, mObject, *args):
+        self.added.add(self._mark(mObject))
+        if self.nodeTypes and OpenMaya.MFnDependencyNode(mObject).typeName in self.nodeTypes:
+            self.watch(mObject)
+
+    def _node_removed(self, mObject, *args):
+        self.changed.pop(OpenMaya.MObjectHandle(mObject).hashCode(), None)
+        self.removed.add(node_name(mObject))
+
+    def _connection(self, sourcePlug, destinationPlug, made, *args):
+        self._mark(sourcePlug.node())
+        self._mark(destinationPlug.node())
+
+    def _attribute_changed(self, message, plug, otherPlug, *args):
+        self._mark(plug.node())
+
+    def _renamed(self, mObject, previousName, *args):
+        if OpenMaya.MObjectHandle(mObject).hashCode() not in self.added:
+            self.full = True
+
+    def _dag_changed(self, message, child, parent, *args):
+        if OpenMaya.MObjectHandle(child.node()).hashCode() not in self.added:
+            self.full = True
+        elif parent.length():
+            self._mark(parent.node())
+
+    def dirty(self):
+        """
+        :return nodes: names of changed nodes that still exist and names of removed nodes
+                        - tuple (set, set)
+        """
+        changed = set(
+            node_name(handle.object()) for handle in self.changed.values() if handle.isValid()
+        )
+        return changed, set(self.removed)
+
+    def reset(self):
+        """ forget all changes, called after every preflight run """
+        self.changed = {}
+        self.added   = set()
+        self.removed = set()
+        self.full    = False
+
+    def remove(self):
+        """ remove all scene callbacks """
+        OpenMaya.MMessage.removeCallbacks(self.callbacks)
+        self.callbacks = []
+        self.watched   = set()
+# ----------------------------------------------------------------------------------------------- #
@@ -0,0 +1,5 @@
+from abMaya.libCore.lib.lazy import attach
+
+__getattr__, __dir__, __all__ = attach(__name__, attributes={
+    'CurveSet': '.lib.curve',
+})
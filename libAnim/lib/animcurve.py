@@ -0,0 +1,278 @@
+"""
+    Bulk transfer between Maya anim curves and CurveSet arrays.
+    Key arrays are read with one keyframe / keyTangent query per array for all curves,
+    curves are written through MFnAnimCurve.addKeys into an MAnimCurveChange, so a whole write
+    is one entry of the undo queue.
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import numpy as np
+from maya import cmds
+from maya.api import OpenMaya, OpenMayaAnim
+
+from abMaya.libCore.lib.undo import commit
+
+from .curve import CurveSet, INFINITY_TYPES
+from .reduce import reduce_curves
+# ----------------------------------------------------------------------------------------------- #
+
+
+# cycle relative and oscillate are not supported by CurveSet and are read as cycle
+INFINITY_FROM_MAYA = {
+    OpenMayaAnim.MFnAnimCurve.kConstant      : INFINITY_TYPES['constant'],
+    OpenMayaAnim.MFnAnimCurve.kLinear        : INFINITY_TYPES['linear'],
+    OpenMayaAnim.MFnAnimCurve.kCycle         : INFINITY_TYPES['cycle'],
+    OpenMayaAnim.MFnAnimCurve.kCycleRelative : INFINITY_TYPES['cycle'],
+    OpenMayaAnim.MFnAnimCurve.kOscillate     : INFINITY_TYPES['cycle'],
+}
+INFINITY_TO_MAYA = {
+    INFINITY_TYPES['constant']: OpenMayaAnim.MFnAnimCurve.kConstant,
+    INFINITY_TYPES['linear']  : OpenMayaAnim.MFnAnimCurve.kLinear,
+    INFINITY_TYPES['cycle']   : OpenMayaAnim.MFnAnimCurve.kCycle,
+}
+
+
+# ----------------------------------------------------------------------------------------------- #
+def frames_per_second():
+    """ :return fps: frames per second of the current time unit - float """
+    return OpenMaya.MTime(1.0, OpenMaya.MTime.kSeconds).asUnits(OpenMaya.MTime.uiUnit())
+
+
+def get_curve_fn(curve):
+    """
+    :param curve:    name of an anim curve node
+                      - str
+
+    :return curveFn: function set of the anim curve
+                      - MFnAnimCurve
+    """
+    selectionList = OpenMaya.MSelectionList()
+    selectionList.add(curve)
+    return OpenMayaAnim.MFnAnimCurve(selectionList.getDependNode(0))
+
+
+def unit_scale(curveFn):
+    """
+    :param curveFn: function set of an anim curve
+                     - MFnAnimCurve
+
+    :return scale:  internal units per ui unit of the curve values
+                     - float
+    """
+    curveType = curveFn.animCurveType
+    if curveType in (OpenMayaAnim.MFnAnimCurve.kAnimCurveTA,
+                     OpenMayaAnim.MFnAnimCurve.kAnimCurveUA):
+        return OpenMaya.MAngle(1.0, OpenMaya.MAngle.uiUnit()).asRadians()
+    if curveType in (OpenMayaAnim.MFnAnimCurve.kAnimCurveTL,
+                     OpenMayaAnim.MFnAnimCurve.kAnimCurveUL):
+        return OpenMaya.MDistance(1.0, OpenMaya.MDistance.uiUnit()).asCentimeters()
+    return 1.0
+
+
+def get_anim_curves(plugs):
+    """
+    :param plugs:   animated plugs, e.g. 'pCube1.translateX'
+                     - list [str, str, ...]
+
+    :return curves: anim curve driving each plug, None for plugs without a curve
+                     - list [str, None, ...]
+    """
+    curves = []
+    for plug in plugs:
+        sources = cmds.listConnections(plug, source=True, destination=False,
+                                       type='animCurve', skipConversionNodes=True) or []
+        curves.append(sources[0] if sources else None)
+    return curves
+# ----------------------------------------------------------------------------------------------- #
+
+
+# READ ------------------------------------------------------------------------------------------ #
+def _query_keys(curves, command, flag):
+    return np.array(command(curves, query=True, **{flag: True}) or [], dtype=np.float64)
+
+
+def read_curves(curves, names=None):
+    """
+    read all keys of many anim curves into one CurveSet.
+    values and slopes are in ui units, times in frames of the current time unit.
+
+    :param curves:    names of anim curve nodes
+                       - list [str, str, ...]
+    :param names:     names stored on the CurveSet, defaults to the curve names
+                       - list [str, str, ...]
+
+    :return curveSet: keys of all curves
+                       - CurveSet
+    """
+    curveFns = [get_curve_fn(curve) for curve in curves]
+    counts = [curveFn.numKeys for curveFn in curveFns]
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    if not offsets[-1]:
+        return CurveSet(offsets, [], [], [], [], names=names or list(curves))
+
+    times = _query_keys(curves, cmds.keyframe, 'timeChange')
+    values = _query_keys(curves, cmds.keyframe, 'valueChange')
+
+    # tangent x is in seconds, y in ui value units
+    fps = frames_per_second()
+    inX = _query_keys(curves, cmds.keyTangent, 'ix') * fps
+    inY = _query_keys(curves, cmds.keyTangent, 'iy')
+    outX = _query_keys(curves, cmds.keyTangent, 'ox') * fps
+    outY = _query_keys(curves, cmds.keyTangent, 'oy')
+    inSlopes = inY / np.where(np.abs(inX) > 1e-12, inX, 1e-12)
+    outSlopes = outY / np.where(np.abs(outX) > 1e-12, outX, 1e-12)
+    steps = np.array(cmds.keyTangent(curves, query=True, outTangentType=True) or [], dtype=str)
+
+    return CurveSet(
+        offsets, times, values, inSlopes, outSlopes,
+        inWeights=inX / 3.0, outWeights=outX / 3.0,
+        steps=np.isin(steps, ('step', 'stepnext')),
+        weighted=[curveFn.isWeighted for curveFn in curveFns],
+        preInfinity=[INFINITY_FROM_MAYA.get(fn.preInfinityType, 0) for fn in curveFns],
+        postInfinity=[INFINITY_FROM_MAYA.get(fn.postInfinityType, 0) for fn in curveFns],
+        names=names or list(curves),
+    )
+
+
+def read_plugs(plugs):
+    """
+    :param plugs:     animated plugs, plugs without anim curve are skipped
+                       - list [str, str, ...]
+
+    :return curveSet: keys of the anim curves of the plugs, named by plug
+                       - CurveSet
+    """
+    pairs = [(plug, curve) for plug, curve in zip(plugs, get_anim_curves(plugs)) if curve]
+    return read_curves([curve for _, curve in pairs], names=[plug for plug, _ in pairs])
+# ----------------------------------------------------------------------------------------------- #
+
+
+# WRITE ----------------------------------------------------------------------------------------- #
+def _curve_fn_for_plug(plug, modifier):
+    """ function set of the anim curve driving the plug, a new curve is created if needed """
+    curves = get_anim_curves([plug])
+    if curves[0]:
+        return get_curve_fn(curves[0])
+    selectionList = OpenMaya.MSelectionList()
+    selectionList.add(plug)
+    curveFn = OpenMayaAnim.MFnAnimCurve()
+    curveFn.create(selectionList.getPlug(0), modifier=modifier)
+    return curveFn
+
+
+def write_curve(curveFn, curveSet, index, change=None):
+    """
+    replace all keys of an anim curve with curve index of the CurveSet.
+    The existing keys are replaced by a single addKeys call.
+
+    :param curveFn:  function set of the target anim curve
+                      - MFnAnimCurve
+    :param curveSet: source keys, in ui units
+                      - CurveSet
+    :param index:    curve index in the CurveSet
+                      - int
+    :param change:   collects the key edits for undo
+                      - MAnimCurveChange
+    """
+    start, end = curveSet.offsets[index], curveSet.offsets[index + 1]
+    if start == end:
+        for key in reversed(range(curveFn.numKeys)):
+            curveFn.remove(key, change)
+        return
+
+    scale = unit_scale(curveFn)
+    fps = frames_per_second()
+    timeUnit = OpenMaya.MTime.uiUnit()
+    times = OpenMaya.MTimeArray([OpenMaya.MTime(frame, timeUnit)
+                                 for frame in curveSet.times[start:end]])
+    values = OpenMaya.MDoubleArray((curveSet.values[start:end] * scale).tolist())
+    curveFn.addKeys(times, values, OpenMayaAnim.MFnAnimCurve.kTangentFixed,
+                    OpenMayaAnim.MFnAnimCurve.kTangentFixed, False, change)
+
+    weighted = bool(curveSet.weighted[index]) and curveSet.inWeights is not None
+    curveFn.setIsWeighted(weighted, change)
+    for key in range(end - start):
+        if curveFn.isWeighted:
+            inFrames = curveSet.inWeights[start + key] * 3.0
+            outFrames = curveSet.outWeights[start + key] * 3.0
+        else:
+            inFrames = outFrames = 1.0
+        # tangent x in seconds, y in internal value units
+        curveFn.setTangent(key, inFrames / fps, curveSet.inSlopes[start + key] * inFrames * scale,
+                           True, change, convertUnits=False)
+        curveFn.setTangent(key, outFrames / fps,
+                           curveSet.outSlopes[start + key] * outFrames * scale, False, change,
+                           convertUnits=False)
+        if curveSet.steps[start + key]:
+            curveFn.setOutTangentType(key, OpenMayaAnim.MFnAnimCurve.kTangentStep, change)
+
+    curveFn.setPreInfinityType(INFINITY_TO_MAYA[int(curveSet.preInfinity[index])], change)
+    curveFn.setPostInfinityType(INFINITY_TO_MAYA[int(curveSet.postInfinity[index])], change)
+
+
+def write_curves(curveSet, plugs=None, modifier=None):
+    """
+    write every curve of a CurveSet to the anim curve of its plug, as one undo step.
+
+    :param curveSet: keys to write, in ui units
+                      - CurveSet
+    :param plugs:    target plug per curve, defaults to the CurveSet names
+                      - list [str, str, ...]
+    :param modifier: modifier with edits of the same undo step, executed before the new anim
+                     curves are created, e.g. disconnected constraints
+                      - MDGModifier
+
+    :return curves:  names of the written anim curves
+                      - list [str, str, ...]
+    """
+    plugs = plugs or curveSet.names
+    modifier = modifier or OpenMaya.MDGModifier()
+    change = OpenMayaAnim.MAnimCurveChange()
+    curveFns = [_curve_fn_for_plug(plug, modifier) for plug in plugs]
+    modifier.doIt()
+
+    for index, curveFn in enumerate(curveFns):
+        write_curve(curveFn, curveSet, index, change)
+    commit_change(change, modifier)
+    return [curveFn.name() for curveFn in curveFns]
+
+
+def commit_change(change, modifier=None):
+    """ add executed key edits and the node edits before them to the undo queue as one step """
+    def undo():
+        change.undoIt()
+        if modifier is not None:
+            modifier.undoIt()
+
+    def redo():
+        if modifier is not None:
+            modifier.doIt()
+        change.redoIt()
+
+    commit(undo, redo)
+
+
+def reduce_anim_curves(curves, tolerance=0.01, processes=0):
+    """
+    reduce the keys of anim curves in place, see libAnim.lib.reduce.
+
+    :param curves:    names of anim curve nodes
+                       - list [str, str, ...]
+    :param tolerance: maximum value error in ui units, per curve or for all curves
+                       - float
+                       - list [float, float, ...]
+    :param processes: number of worker processes, 0 reduces in this process, see reduce_curves
+                       - int
+
+    :return report:   original and reduced key count, ratio of removed keys and maximum error
+                      per curve
+                       - list [dict, dict, ...]
+    """
+    reduced, report = reduce_curves(read_curves(curves), tolerance, processes=processes)
+    change = OpenMayaAnim.MAnimCurveChange()
+    for index, curve in enumerate(curves):
+        write_curve(get_curve_fn(curve), reduced, index, change)
+    commit_change(change)
+    return report
+# ----------------------------------------------------------------------------------------------- #
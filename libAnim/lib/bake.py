@@ -0,0 +1,275 @@
+"""
+    Bake sampler.
+    Steps the scene time once per frame and reads every requested plug at that frame, instead
+    of re-evaluating the DG per attribute per frame. Samples land in a preallocated
+    frames x channels array and are written out as anim curves through libAnim.lib.animcurve.
+
+    Sub-ranges can be sampled in parallel by mayapy worker processes that open the saved scene,
+    only use this for scenes without simulations or other state carried across frames.
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from maya import cmds
+from maya.api import OpenMaya, OpenMayaAnim
+
+from abMaya.libContext.lib.attributes import get_plug
+from abMaya.libCore.lib.shared import pool_context
+from abMaya.libContext.lib.scene import SuspendEvaluation
+
+from .animcurve import write_curves
+from .curve import CurveSet
+from .reduce import reduce_curves
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+def frame_range(start, end, step=1.0):
+    """ :return frames: sampled frames from start to end inclusive - ndarray float64 """
+    return np.arange(start, end + step * 0.5, step, dtype=np.float64)
+
+
+def plug_scales(plugs):
+    """
+    :param plugs:   plugs to sample
+                     - list [MPlug, MPlug, ...]
+
+    :return scales: ui units per internal unit of every plug
+                     - ndarray float64 (channelCount,)
+    """
+    angle = OpenMaya.MAngle(1.0, OpenMaya.MAngle.kRadians).asUnits(OpenMaya.MAngle.uiUnit())
+    distance = OpenMaya.MDistance(1.0, OpenMaya.MDistance.kCentimeters).asUnits(
+        OpenMaya.MDistance.uiUnit()
+    )
+    scales = np.ones(len(plugs))
+    for index, plug in enumerate(plugs):
+        attribute = plug.attribute()
+        if not attribute.hasFn(OpenMaya.MFn.kUnitAttribute):
+            continue
+        unitType = OpenMaya.MFnUnitAttribute(attribute).unitType()
+        if unitType == OpenMaya.MFnUnitAttribute.kAngle:
+            scales[index] = angle
+        elif unitType == OpenMaya.MFnUnitAttribute.kDistance:
+            scales[index] = distance
+    return scales
+
+
+def sample(plugs, start, end, step=1.0):
+    """
+    sample plugs over a frame range, changing the scene time once per frame.
+
+    :param plugs:    numeric plugs, e.g. 'pCube1.translateX'
+                      - list [str, str, ...]
+    :param start:    first frame
+                      - float
+    :param end:      last frame, inclusive
+                      - float
+    :param step:     frame step
+                      - float
+
+    :return samples: sampled frames and the ui unit values of every plug per frame
+                      - tuple (ndarray float64 (frameCount,),
+                               ndarray float64 (frameCount, channelCount))
+    """
+    frames = frame_range(start, end, step)
+    mplugs = [get_plug(plug) for plug in plugs]
+    values = np.empty((len(frames), len(mplugs)), dtype=np.float64)
+
+    timeUnit = OpenMaya.MTime.uiUnit()
+    currentTime = OpenMayaAnim.MAnimControl.currentTime()
+    with SuspendEvaluation(refresh=True, autoKey=True):
+        try:
+            for row, frame in enumerate(frames):
+                OpenMayaAnim.MAnimControl.setCurrentTime(OpenMaya.MTime(frame, timeUnit))
+                values[row] = [plug.asDouble() for plug in mplugs]
+        finally:
+            OpenMayaAnim.MAnimControl.setCurrentTime(currentTime)
+
+    values *= plug_scales(mplugs)
+    return frames, values
+
+
+def sample_per_attribute(plugs, start, end, step=1.0):
+    """ reference sampler reading every plug at every frame with getAttr, see sample """
+    frames = frame_range(start, end, step)
+    values = np.empty((len(frames), len(plugs)), dtype=np.float64)
+    for column, plug in enumerate(plugs):
+        values[:, column] = [cmds.getAttr(plug, time=frame) for frame in frames]
+    return frames, values
+# ----------------------------------------------------------------------------------------------- #
+
+
+# PARALLEL -------------------------------------------------------------------------------------- #
+def initialize_worker():
+    """ starts maya.standalone, once per worker process """
+    import maya.standalone
+    maya.standalone.initialize(name='python')
+
+
+def _sample_scene(arguments):
+    scene, plugs, start, end, step = arguments
+    cmds.file(scene, open=True, force=True)
+    return sample(plugs, start, end, step)
+
+
+def sample_parallel(scene, plugs, start, end, step=1.0, processes=4):
+    """
+    sample sub-ranges of the frame range in mayapy worker processes and merge the results.
+
+    :param scene:     path of the saved scene to sample
+                       - str
+    :param plugs:     numeric plugs
+                       - list [str, str, ...]
+    :param start:     first frame
+                       - float
+    :param end:       last frame, inclusive
+                       - float
+    :param step:      frame step
+                       - float
+    :param processes: number of worker processes and sub-ranges
+                       - int
+
+    :return samples:  sampled frames and values, see sample
+                       - tuple (ndarray float64, ndarray float64)
+    """
+    frames = frame_range(start, end, step)
+    ranges = [chunk for chunk in np.array_split(frames, processes) if len(chunk)]
+    tasks = [(scene, list(plugs), chunk[0], chunk[-1], step) for chunk in ranges]
+    with ProcessPoolExecutor(max_workers=len(tasks), initializer=initialize_worker,
+                             mp_context=pool_context()) as pool:
+        results = list(pool.map(_sample_scene, tasks))
+    return (np.concatenate([result[0] for result in results]),
+            np.concatenate([result[1] for result in results]))
+# ----------------------------------------------------------------------------------------------- #
+
+
+# BAKE ------------------------------------------------------------------------------------------ #
+def to_curves(frames, values, names, tolerance=None, processes=0):
+    """
+    :param frames:    sampled frames
+                       - ndarray float64 (frameCount,)
+    :param values:    samples per frame and channel
+                       - ndarray float64 (frameCount, channelCount)
+    :param names:     name per channel
+                       - list [str, str, ...]
+    :param tolerance: reduce the keys to this error, keys on every frame if None
+                       - float
+    :param processes: worker processes of the key reduction, see reduce_curves
+                       - int
+
+    :return curveSet: one spline curve per channel
+                       - CurveSet
+    """
+    frameCount, channelCount = values.shape
+    curveSet = CurveSet(np.arange(channelCount + 1) * frameCount, np.tile(frames, channelCount),
+                        values.T.reshape(-1), names=names)
+    curveSet.inSlopes, curveSet.outSlopes = curveSet.auto_slopes('spline')
+    if tolerance is not None:
+        curveSet, _ = reduce_curves(curveSet, tolerance, processes=processes)
+    return curveSet
+
+
+def disconnect_drivers(plugs, modifier=None):
+    """
+    queue breaking the incoming connections that are not anim curves, e.g. constraints.
+
+    :param plugs:     driven plugs
+                       - list [str, str, ...]
+    :param modifier:  modifier collecting the disconnects, a new one if None
+                       - MDGModifier
+
+    :return modifier: the modifier, the disconnects happen on its next doIt
+                       - MDGModifier
+    """
+    modifier = modifier or OpenMaya.MDGModifier()
+    for plug in plugs:
+        mplug = get_plug(plug)
+        source = mplug.source()
+        if not source.isNull and not source.node().hasFn(OpenMaya.MFn.kAnimCurve):
+            modifier.disconnect(source, mplug)
+    return modifier
+
+
+def bake(plugs, start, end, step=1.0, tolerance=None, scene=None, processes=None):
+    """
+    sample plugs over a frame range and replace their inputs with the baked anim curves.
+
+    :param plugs:     numeric plugs
+                       - list [str, str, ...]
+    :param start:     first frame
+                       - float
+    :param end:       last frame, inclusive
+                       - float
+    :param step:      frame step
+                       - float
+    :param tolerance: reduce the baked keys to this error, see libAnim.lib.reduce
+                       - float
+    :param scene:     saved scene to sample in parallel worker processes, None samples here
+                       - str
+    :param processes: number of worker processes for parallel sampling and key reduction
+                       - int
+
+    :return curveSet: the baked curves
+                       - CurveSet
+    """
+    if scene and processes:
+        frames, values = sample_parallel(scene, plugs, start, end, step, processes)
+    else:
+        frames, values = sample(plugs, start, end, step)
+
+    curveSet = to_curves(frames, values, list(plugs), tolerance, processes or 0)
+    # disconnects, new anim curves and keys are one undo step
+    write_curves(curveSet, list(plugs), modifier=disconnect_drivers(plugs))
+    return curveSet
+# ----------------------------------------------------------------------------------------------- #
+
+
+# BENCHMARK ------------------------------------------------------------------------------------- #
+def benchmark(count=200, start=1, end=100):
+    """
+    Compare the per frame sampler with per attribute sampling on constrained locators.
+    The benchmark nodes are created in the current scene and deleted afterwards.
+
+    :param count:    number of constrained locators, six channels each
+                      - int
+    :param start:    first frame
+                      - int
+    :param end:      last frame
+                      - int
+
+    :return timings: wall time in seconds of both samplers and the largest difference
+                      - dict {str: float, ...}
+    """
+    root = cmds.spaceLocator(name='bakeBenchmark_root')[0]
+    nodes = [root]
+    for attribute, value in (('translateX', 10.0), ('rotateY', 360.0)):
+        cmds.setKeyframe(root, attribute=attribute, time=start, value=0.0)
+        cmds.setKeyframe(root, attribute=attribute, time=end, value=value)
+
+    plugs = []
+    try:
+        for index in range(count):
+            locator = cmds.spaceLocator(name='bakeBenchmark_{}'.format(index))[0]
+            cmds.setAttr(locator + '.translate', index % 10, index // 10, 0)
+            cmds.parentConstraint(root, locator, maintainOffset=True)
+            nodes.append(locator)
+            plugs.extend('{}.{}{}'.format(locator, channel, axis)
+                         for channel in ('translate', 'rotate') for axis in 'XYZ')
+
+        timings = {'channels': len(plugs), 'frames': end - start + 1}
+        begin = time.perf_counter()
+        _, values = sample(plugs, start, end)
+        timings['sample'] = time.perf_counter() - begin
+
+        begin = time.perf_counter()
+        _, reference = sample_per_attribute(plugs, start, end)
+        timings['per_attribute'] = time.perf_counter() - begin
+        timings['difference'] = float(np.abs(values - reference).max())
+    finally:
+        cmds.delete(nodes)
+    return timings
+# ----------------------------------------------------------------------------------------------- #
@@ -0,0 +1,430 @@
+"""
+    Columnar animation curves with vectorized evaluation.
+    Independent of Maya, curves are read from and written to anim curve nodes by
+    libAnim.lib.animcurve.
+
+    All curves of a CurveSet share flat key arrays, the keys of curve i are
+    offsets[i]:offsets[i + 1]. Times are in frames, tangents are stored as slopes in
+    value units per frame plus, for weighted curves, the time extent of each tangent handle.
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import time
+
+import numpy as np
+# ----------------------------------------------------------------------------------------------- #
+
+
+INFINITY_TYPES = {'constant': 0, 'linear': 1, 'cycle': 2}
+NEWTON_STEPS   = 8
+
+
+# ----------------------------------------------------------------------------------------------- #
+def _segment_ids(offsets, count):
+    """ curve index of every key """
+    return np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))[:count]
+
+
+def _infinity(value, curveCount):
+    if value is None:
+        return np.zeros(curveCount, dtype=np.int8)
+    if isinstance(value, str):
+        return np.full(curveCount, INFINITY_TYPES[value], dtype=np.int8)
+    return np.array([INFINITY_TYPES.get(item, item) for item in value], dtype=np.int8)
+
+
+def _bezier(start, handleA, handleB, end, parameter):
+    inverse = 1.0 - parameter
+    return (inverse ** 3 * start + 3 * inverse ** 2 * parameter * handleA +
+            3 * inverse * parameter ** 2 * handleB + parameter ** 3 * end)
+
+
+def _bezier_derivative(start, handleA, handleB, end, parameter):
+    inverse = 1.0 - parameter
+    return (3 * inverse ** 2 * (handleA - start) + 6 * inverse * parameter * (handleB - handleA) +
+            3 * parameter ** 2 * (end - handleB))
+
+
+# ----------------------------------------------------------------------------------------------- #
+class CurveSet(object):
+    """
+    Many animation curves in columnar key arrays.
+    Segments between keys are cubic Hermite splines, or cubic Bezier splines in time and value
+    for weighted curves. Keys flagged as steps hold their value until the next key.
+    """
+    def __init__(self, offsets, times, values, inSlopes=None, outSlopes=None, inWeights=None,
+                 outWeights=None, steps=None, weighted=None, preInfinity=None,
+                 postInfinity=None, names=None):
+        """
+        :param offsets:      key offsets of every curve
+                              - ndarray int64 (curveCount + 1,)
+        :param times:        key times in frames, ascending per curve
+                              - ndarray float64 (keyCount,)
+        :param values:       key values
+                              - ndarray float64 (keyCount,)
+        :param inSlopes:     incoming tangent slopes, linear tangents if None
+                              - ndarray float64 (keyCount,)
+        :param outSlopes:    outgoing tangent slopes, same as inSlopes if None
+                              - ndarray float64 (keyCount,)
+        :param inWeights:    time extent of the incoming tangent handles of weighted curves
+                              - ndarray float64 (keyCount,)
+        :param outWeights:   time extent of the outgoing tangent handles of weighted curves
+                              - ndarray float64 (keyCount,)
+        :param steps:        keys with stepped outgoing tangents
+                              - ndarray bool (keyCount,)
+        :param weighted:     curves with weighted tangents
+                              - ndarray bool (curveCount,)
+        :param preInfinity:  behaviour before the first key, 'constant', 'linear' or 'cycle'
+                              - str
+                              - list [str, str, ...]
+        :param postInfinity: behaviour after the last key
+                              - str
+                              - list [str, str, ...]
+        :param names:        names of the curves, e.g. anim curve nodes or animated plugs
+                              - list [str, str, ...]
+        """
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        self.times   = np.asarray(times, dtype=np.float64)
+        self.values  = np.asarray(values, dtype=np.float64)
+        self.names   = list(names) if names is not None else None
+
+        if inSlopes is None:
+            self.inSlopes, self.outSlopes = self.auto_slopes('linear')
+        else:
+            self.inSlopes = np.asarray(inSlopes, dtype=np.float64)
+            self.outSlopes = self.inSlopes if outSlopes is None else np.asarray(outSlopes,
+                                                                                dtype=np.float64)
+
+        count = self.keyCount
+        self.inWeights  = None if inWeights is None else np.asarray(inWeights, dtype=np.float64)
+        self.outWeights = None if outWeights is None else np.asarray(outWeights, dtype=np.float64)
+        self.steps      = np.zeros(count, bool) if steps is None else np.asarray(steps, bool)
+        self.weighted   = (np.zeros(self.curveCount, bool) if weighted is None
+                           else np.asarray(weighted, bool))
+        self.preInfinity  = _infinity(preInfinity, self.curveCount)
+        self.postInfinity = _infinity(postInfinity, self.curveCount)
+
+    @classmethod
+    def from_keys(cls, curves, **kwargs):
+        """
+        :param curves:   key times and values of every curve
+                          - list [(times, values), ...]
+        :param kwargs:   per key arrays of all curves concatenated and per curve options,
+                         see __init__
+
+        :return curveSet: curves in columnar layout
+                          - CurveSet
+        """
+        counts = [len(times) for times, _ in curves]
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        times = np.concatenate([np.asarray(times, np.float64) for times, _ in curves] or [[]])
+        values = np.concatenate([np.asarray(values, np.float64) for _, values in curves] or [[]])
+        return cls(offsets, times, values, **kwargs)
+
+    @property
+    def curveCount(self):
+        return len(self.offsets) - 1
+
+    @property
+    def keyCount(self):
+        return len(self.times)
+
+    def curve(self, index):
+        """ :return keys: key times and values of a single curve - tuple (ndarray, ndarray) """
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.times[start:end], self.values[start:end]
+
+    def select(self, curves):
+        """
+        :param curves:    indices of the curves to copy
+                           - list [int, int, ...]
+
+        :return curveSet: new CurveSet with the selected curves in the given order
+                           - CurveSet
+        """
+        curves = np.asarray(curves, dtype=np.int64).reshape(-1)
+        counts = self.offsets[curves + 1] - self.offsets[curves]
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+        keys = np.arange(offsets[-1]) - np.repeat(offsets[:-1] - self.offsets[curves], counts)
+        return CurveSet(
+            offsets, self.times[keys], self.values[keys], self.inSlopes[keys],
+            self.outSlopes[keys],
+            inWeights=None if self.inWeights is None else self.inWeights[keys],
+            outWeights=None if self.outWeights is None else self.outWeights[keys],
+            steps=self.steps[keys], weighted=self.weighted[curves],
+            preInfinity=self.preInfinity[curves], postInfinity=self.postInfinity[curves],
+            names=None if self.names is None else [self.names[index] for index in curves],
+        )
+
+    @classmethod
+    def concatenate(cls, curveSets):
+        """
+        :param curveSets: CurveSets to join
+                           - list [CurveSet, CurveSet, ...]
+
+        :return curveSet: one CurveSet with all curves in order
+                           - CurveSet
+        """
+        counts = np.concatenate([np.diff(curveSet.offsets) for curveSet in curveSets] or [[]])
+        offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+
+        def join(attribute):
+            return np.concatenate([getattr(curveSet, attribute) for curveSet in curveSets])
+
+        def join_weights(attribute):
+            if all(getattr(curveSet, attribute) is None for curveSet in curveSets):
+                return None
+            return np.concatenate([
+                np.zeros(curveSet.keyCount) if getattr(curveSet, attribute) is None
+                else getattr(curveSet, attribute) for curveSet in curveSets
+            ])
+
+        names = None
+        if all(curveSet.names is not None for curveSet in curveSets):
+            names = [name for curveSet in curveSets for name in curveSet.names]
+        return cls(
+            offsets, join('times'), join('values'), join('inSlopes'), join('outSlopes'),
+            inWeights=join_weights('inWeights'), outWeights=join_weights('outWeights'),
+            steps=join('steps'), weighted=join('weighted'), preInfinity=join('preInfinity'),
+            postInfinity=join('postInfinity'), names=names,
+        )
+
+    # TANGENTS ---------------------------------------------------------------------------------- #
+    def auto_slopes(self, kind='spline'):
+        """
+        compute tangent slopes of all keys from their neighbours.
+
+        :param kind:   tangent type
+                        - str ('linear', 'flat', 'spline', 'clamped')
+
+        :return slopes: incoming and outgoing slopes of every key
+                        - tuple (ndarray float64 (keyCount,), ndarray float64 (keyCount,))
+        """
+        count = self.keyCount
+        if kind == 'flat' or count < 2:
+            zeros = np.zeros(count)
+            return zeros, zeros.copy()
+
+        curveIds = _segment_ids(self.offsets, count)
+        sameCurve = curveIds[1:] == curveIds[:-1]
+        deltaTimes = np.diff(self.times)
+        segments = np.where(sameCurve & (deltaTimes > 0),
+                            np.diff(self.values) / np.where(deltaTimes > 0, deltaTimes, 1.0), 0.0)
+
+        hasPrevious = np.concatenate([[False], sameCurve])
+        hasNext = np.concatenate([sameCurve, [False]])
+        previous = np.concatenate([[0.0], segments])
+        following = np.concatenate([segments, [0.0]])
+
+        if kind == 'linear':
+            inSlopes = np.where(hasPrevious, previous, following)
+            outSlopes = np.where(hasNext, following, previous)
+            return inSlopes, outSlopes
+
+        spanTimes = np.zeros(count)
+        both = hasPrevious & hasNext
+        spanTimes[1:-1] = self.times[2:] - self.times[:-2]
+        central = np.zeros(count)
+        central[1:-1] = (self.values[2:] - self.values[:-2]) / np.where(
+            spanTimes[1:-1] > 0, spanTimes[1:-1], 1.0
+        )
+        slopes = np.where(both, central, np.where(hasPrevious, previous, following))
+
+        if kind == 'clamped':
+            extreme = both & (previous * following <= 0)
+            slopes = np.where(extreme, 0.0, slopes)
+        return slopes, slopes.copy()
+
+    # EVALUATION -------------------------------------------------------------------------------- #
+    def segments(self):
+        """
+        cubic polynomial of every curve segment in local time, including the pre and post
+        infinity segments. Curve i owns the entries offsets[i] + i to offsets[i + 1] + i,
+        a sample after m keys of its curve uses entry offsets[i] + i + m.
+
+        :return table: origin time, start key (-1 before the first key) and the coefficients
+                       of x^3, x^2, x and 1 per entry
+                        - tuple (ndarray float64 (keyCount + curveCount,), ndarray int64, ...)
+        """
+        count, curveCount = self.keyCount, self.curveCount
+        curveIds = _segment_ids(self.offsets, count)
+        size = count + curveCount
+        origin, cubic, square, linear, constant = [np.zeros(size) for _ in range(5)]
+        startKeys = np.full(size, -1, dtype=np.int64)
+
+        # segments starting at every key, the last key of a curve starts its post infinity
+        entries = np.arange(count) + curveIds + 1
+        origin[entries] = self.times
+        constant[entries] = self.values
+        startKeys[entries] = np.arange(count)
+
+        inner = np.ones(count, bool)
+        inner[self.offsets[1:][self.offsets[1:] > 0] - 1] = False
+        keys = np.flatnonzero(inner & ~self.steps)
+        deltaTime = self.times[keys + 1] - self.times[keys]
+        deltaTime = np.where(deltaTime > 0, deltaTime, 1.0)
+        slope = (self.values[keys + 1] - self.values[keys]) / deltaTime
+        outSlope, inSlope = self.outSlopes[keys], self.inSlopes[keys + 1]
+        linear[entries[keys]] = outSlope
+        square[entries[keys]] = (3 * slope - 2 * outSlope - inSlope) / deltaTime
+        cubic[entries[keys]] = (outSlope + inSlope - 2 * slope) / deltaTime ** 2
+
+        # infinity, constant entries stay flat
+        filled = np.diff(self.offsets) > 0
+        starts, ends = self.offsets[:-1], self.offsets[1:] - 1
+        before = np.flatnonzero(filled)
+        origin[starts[before] + before] = self.times[starts[before]]
+        constant[starts[before] + before] = self.values[starts[before]]
+        linearBefore = before[self.preInfinity[before] == 1]
+        linear[starts[linearBefore] + linearBefore] = self.inSlopes[starts[linearBefore]]
+        linearAfter = before[self.postInfinity[before] == 1]
+        linear[ends[linearAfter] + linearAfter + 1] = self.outSlopes[ends[linearAfter]]
+        return origin, startKeys, cubic, square, linear, constant
+
+    def _wrap(self, sampleTimes, curves):
+        """ apply cycle infinity to the sample times of a block of curves """
+        first = self.times[self.offsets[curves]][:, None]
+        last = self.times[np.maximum(self.offsets[curves + 1] - 1, 0)][:, None]
+        span = np.maximum(last - first, 1e-12)
+        wrapped = first + np.mod(sampleTimes - first, span)
+        before = (sampleTimes < first) & (self.preInfinity[curves] == 2)[:, None]
+        after = (sampleTimes > last) & (self.postInfinity[curves] == 2)[:, None]
+        return np.where(before | after, wrapped, sampleTimes)
+
+    def _entries_shared(self, sampleTimes, curves):
+        """ segment entries of a block of curves for sorted sample times shared by all curves """
+        start, end = self.offsets[curves[0]], self.offsets[curves[-1] + 1]
+        keyCurves = _segment_ids(self.offsets[curves[0]:curves[-1] + 2] - start, end - start)
+        positions = np.searchsorted(sampleTimes, self.times[start:end], side='left')
+        width = len(sampleTimes) + 1
+        counts = np.bincount(keyCurves * width + positions, minlength=len(curves) * width)
+        counts = np.cumsum(counts.reshape(len(curves), width)[:, :-1], axis=1)
+        return counts + (self.offsets[curves] + curves)[:, None]
+
+    def _entries_general(self, sampleTimes, curves):
+        """ segment entries of a block of curves for per curve sample times """
+        start, end = self.offsets[curves[0]], self.offsets[curves[-1] + 1]
+        keyCurves = _segment_ids(self.offsets[curves[0]:curves[-1] + 2] - start, end - start)
+        times = self.times[start:end]
+        low = min(times.min() if len(times) else 0.0, sampleTimes.min())
+        span = max(times.max() if len(times) else 0.0, sampleTimes.max()) - low + 1.0
+        shifted = times - low + keyCurves * span
+        queries = sampleTimes - low + np.arange(len(curves))[:, None] * span
+        return np.searchsorted(shifted, queries, side='right') + start + curves[:, None]
+
+    def evaluate(self, sampleTimes, blockSize=1 << 16):
+        """
+        evaluate all curves at all sample times in one vectorized pass.
+        curves are processed in blocks of about blockSize samples to keep temporaries in cache.
+
+        :param sampleTimes: times in frames
+                             - ndarray float (sampleCount,)
+        :param blockSize:   samples evaluated per block
+                             - int
+
+        :return values:     curve values
+                             - ndarray float64 (curveCount, sampleCount)
+        """
+        sampleTimes = np.asarray(sampleTimes, dtype=np.float64).reshape(-1)
+        curveCount, sampleCount = self.curveCount, len(sampleTimes)
+        result = np.zeros((curveCount, sampleCount))
+        if not curveCount or not sampleCount:
+            return result
+
+        origin, startKeys, cubic, square, linear, constant = self.segments()
+        cycles = (self.preInfinity == 2) | (self.postInfinity == 2)
+        ordered = bool(np.all(np.diff(sampleTimes) >= 0))
+        weighted = self.weighted.any() and self.inWeights is not None
+        if weighted:
+            # keys that start a Bezier segment, not stepped and followed by a key of their curve
+            bezier = ~self.steps
+            bezier[self.offsets[1:][self.offsets[1:] > 0] - 1] = False
+
+        step = max(1, blockSize // sampleCount)
+        for first in range(0, curveCount, step):
+            curves = np.arange(first, min(first + step, curveCount))
+            if cycles[curves].any():
+                times = self._wrap(np.broadcast_to(sampleTimes, (len(curves), sampleCount)),
+                                   curves)
+                entries = self._entries_general(times, curves)
+            elif ordered:
+                times = sampleTimes
+                entries = self._entries_shared(sampleTimes, curves)
+            else:
+                times = sampleTimes
+                entries = self._entries_general(sampleTimes[None, :], curves)
+
+            local = times - origin[entries]
+            values = ((cubic[entries] * local + square[entries]) * local +
+                      linear[entries]) * local + constant[entries]
+
+            if weighted and self.weighted[curves].any():
+                keys = startKeys[entries]
+                mask = self.weighted[curves][:, None] & (keys >= 0)
+                mask[mask] = bezier[keys[mask]]
+                samples = np.broadcast_to(times, values.shape)[mask]
+                values[mask] = self._evaluate_weighted(samples, keys[mask], keys[mask] + 1)
+            result[first:first + len(curves)] = values
+        return result
+
+    def _evaluate_weighted(self, times, key, following):
+        """ Bezier evaluation of weighted segments, solving time to parameter with Newton steps """
+        t0, t1 = self.times[key], self.times[following]
+        v0, v1 = self.values[key], self.values[following]
+        w0, w1 = self.outWeights[key], self.inWeights[following]
+        handleTimeA, handleTimeB = t0 + w0, t1 - w1
+        handleValueA = v0 + w0 * self.outSlopes[key]
+        handleValueB = v1 - w1 * self.inSlopes[following]
+
+        deltaTime = np.where(t1 > t0, t1 - t0, 1.0)
+        parameter = np.clip((times - t0) / deltaTime, 0.0, 1.0)
+        for _ in range(NEWTON_STEPS):
+            error = _bezier(t0, handleTimeA, handleTimeB, t1, parameter) - times
+            slope = _bezier_derivative(t0, handleTimeA, handleTimeB, t1, parameter)
+            parameter = np.clip(parameter - error / np.where(np.abs(slope) > 1e-12, slope, 1e-12),
+                                0.0, 1.0)
+        return _bezier(v0, handleValueA, handleValueB, v1, parameter)
+# ----------------------------------------------------------------------------------------------- #
+
+
+# BENCHMARK ------------------------------------------------------------------------------------- #
+def benchmark(curves=5000, frames=1000, keys=20, repeats=3):
+    """
+    Time the evaluation of random spline curves at every frame.
+
+    :param curves:   number of curves
+                      - int
+    :param frames:   number of sampled frames
+                      - int
+    :param keys:     keys per curve
+                      - int
+    :param repeats:  evaluations, the fastest one is reported
+                      - int
+
+    :return timings: wall time in seconds of the slope setup and the evaluation
+                      - dict {str: float, ...}
+    """
+    generator = np.random.default_rng(0)
+    times = np.sort(generator.uniform(0, frames, (curves, keys)), axis=1)
+    values = generator.normal(size=(curves, keys))
+    curveSet = CurveSet(np.arange(curves + 1) * keys, times.reshape(-1), values.reshape(-1))
+
+    start = time.perf_counter()
+    curveSet.inSlopes, curveSet.outSlopes = curveSet.auto_slopes('spline')
+    timings = {'samples': curves * frames, 'slopes': time.perf_counter() - start}
+
+    sampleTimes = np.arange(frames, dtype=np.float64)
+    evaluations = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        curveSet.evaluate(sampleTimes)
+        evaluations.append(time.perf_counter() - start)
+    timings['evaluate'] = min(evaluations)
+    return timings
+
+
+if __name__ == '__main__':
+    for name, value in benchmark().items():
+        print('{:<12}{}'.format(name, value))
+# ----------------------------------------------------------------------------------------------- #
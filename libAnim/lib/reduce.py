@@ -0,0 +1,331 @@
+"""
+    Key reduction of densely keyed curves, e.g. baked motion capture.
+    Independent of Maya, see libAnim.lib.animcurve.reduce_anim_curves for the scene round trip.
+
+    Keys are picked Ramer-Douglas-Peucker style, splitting every segment at its worst sample
+    until the Hermite spline through the kept keys stays within the tolerance of every original
+    key. The tangents of the kept keys are then refit by least squares over all original keys.
+    All curves of a CurveSet are reduced together, one array pass per split level.
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from abMaya.libCore.lib.shared import pool_context
+
+from .curve import CurveSet
+# ----------------------------------------------------------------------------------------------- #
+
+
+REGULARIZATION = 1e-6  # pull of the fitted slopes towards the finite difference slopes
+
+
+# ----------------------------------------------------------------------------------------------- #
+def hermite(times, t0, t1, v0, v1, m0, m1):
+    """ cubic Hermite segments evaluated at times, all arguments broadcast """
+    deltaTime = t1 - t0
+    parameter = (times - t0) / np.where(deltaTime > 0, deltaTime, 1.0)
+    squared = parameter * parameter
+    cubed = squared * parameter
+    return ((2 * cubed - 3 * squared + 1) * v0 + (cubed - 2 * squared + parameter) * deltaTime *
+            m0 + (-2 * cubed + 3 * squared) * v1 + (cubed - squared) * deltaTime * m1)
+
+
+def _interior(starts, ends):
+    """ indices strictly between start and end of every segment, their segment and the first
+    position of every segment in the result, segments must contain at least one index """
+    lengths = ends - starts - 1
+    segments = np.repeat(np.arange(len(starts)), lengths)
+    firsts = np.cumsum(lengths) - lengths
+    samples = np.arange(lengths.sum()) - np.repeat(firsts, lengths) + starts[segments] + 1
+    return samples, segments, firsts
+
+
+def _enclosing(keep):
+    """ previous and next kept key of every key, kept keys enclose themselves """
+    indices = np.arange(len(keep))
+    previous = np.maximum.accumulate(np.where(keep, indices, 0))
+    following = np.minimum.accumulate(np.where(keep, indices, len(keep))[::-1])[::-1]
+    return previous, np.minimum(following, len(keep) - 1)
+
+
+def key_errors(times, values, keep, slopes):
+    """
+    :param times:  original key times of all curves
+                    - ndarray float64 (keyCount,)
+    :param values: original key values
+                    - ndarray float64 (keyCount,)
+    :param keep:   kept keys, the first and last key of every curve must be kept
+                    - ndarray bool (keyCount,)
+    :param slopes: tangent slopes, only read at kept keys
+                    - ndarray float64 (keyCount,)
+
+    :return errors: absolute error of the reduced curves at every original key
+                    - ndarray float64 (keyCount,)
+    """
+    previous, following = _enclosing(keep)
+    predicted = hermite(times, times[previous], times[following], values[previous],
+                        values[following], slopes[previous], slopes[following])
+    return np.where(keep, 0.0, np.abs(predicted - values))
+
+
+def select_keys(curveSet, tolerance, slopes):
+    """
+    :param curveSet:  densely keyed curves
+                       - CurveSet
+    :param tolerance: maximum error per curve
+                       - ndarray float64 (curveCount,)
+    :param slopes:    tangent slopes of the original keys used while splitting
+                       - ndarray float64 (keyCount,)
+
+    :return keep:     kept keys
+                       - ndarray bool (keyCount,)
+    """
+    offsets, times, values = curveSet.offsets, curveSet.times, curveSet.values
+    filled = np.flatnonzero(np.diff(offsets) > 0)
+    keep = np.zeros(curveSet.keyCount, bool)
+    keep[offsets[filled]] = True
+    keep[offsets[filled + 1] - 1] = True
+
+    curveIds = np.repeat(np.arange(curveSet.curveCount), np.diff(offsets))
+    starts, ends = offsets[filled], offsets[filled + 1] - 1
+    while True:
+        unfinished = ends - starts > 1
+        starts, ends = starts[unfinished], ends[unfinished]
+        if not len(starts):
+            break
+        samples, segments, firsts = _interior(starts, ends)
+        a, b = starts[segments], ends[segments]
+        errors = np.abs(hermite(times[samples], times[a], times[b], values[a], values[b],
+                                slopes[a], slopes[b]) - values[samples])
+        worst = np.maximum.reduceat(errors, firsts)
+        candidates = np.where(errors == worst[segments], samples, np.iinfo(np.int64).max)
+        splits = np.minimum.reduceat(candidates, firsts)
+
+        failing = worst > tolerance[curveIds[starts]]
+        splits = splits[failing]
+        keep[splits] = True
+        starts, ends = (np.concatenate([starts[failing], splits]),
+                        np.concatenate([splits, ends[failing]]))
+    return keep
+
+
+def fit_slopes(times, values, offsets, keep, slopes):
+    """
+    least squares slopes of the kept keys over all original keys of their curves.
+    the normal equations of each curve are tridiagonal and solved for all curves at once.
+
+    :param times:   original key times of all curves
+                     - ndarray float64 (keyCount,)
+    :param values:  original key values
+                     - ndarray float64 (keyCount,)
+    :param offsets: key offsets of every curve
+                     - ndarray int64 (curveCount + 1,)
+    :param keep:    kept keys
+                     - ndarray bool (keyCount,)
+    :param slopes:  initial slopes, regularization target
+                     - ndarray float64 (keyCount,)
+
+    :return fitted: slopes of the kept keys, in kept key order
+                     - ndarray float64 (keptCount,)
+    """
+    kept = np.flatnonzero(keep)
+    rank = np.cumsum(keep) - 1  # position of the previous kept key in kept order
+    previous, following = _enclosing(keep)
+    samples = np.flatnonzero(~keep)
+    left, right = rank[previous[samples]], rank[following[samples]]
+
+    t0, t1 = times[previous[samples]], times[following[samples]]
+    deltaTime = t1 - t0
+    parameter = (times[samples] - t0) / np.where(deltaTime > 0, deltaTime, 1.0)
+    squared = parameter * parameter
+    cubed = squared * parameter
+    weightA = (cubed - 2 * squared + parameter) * deltaTime
+    weightB = (cubed - squared) * deltaTime
+    residual = (values[samples] - (2 * cubed - 3 * squared + 1) * values[previous[samples]] -
+                (-2 * cubed + 3 * squared) * values[following[samples]])
+
+    size = len(kept)
+    diagonal = (np.bincount(left, weightA * weightA, size) +
+                np.bincount(right, weightB * weightB, size))
+    upper = np.bincount(left, weightA * weightB, size)  # couples kept key i with i + 1
+    rhs = np.bincount(left, weightA * residual, size) + np.bincount(right, weightB * residual,
+                                                                     size)
+    damping = REGULARIZATION * diagonal + 1e-12
+    diagonal = diagonal + damping
+    rhs = rhs + damping * slopes[kept]
+
+    # pad the systems of all curves to the same size and run the Thomas algorithm across curves
+    counts = np.bincount(np.searchsorted(offsets, kept, side='right') - 1,
+                         minlength=len(offsets) - 1)
+    width = counts.max() if len(counts) else 0
+    rows = np.repeat(np.arange(len(counts)), counts)
+    columns = np.arange(size) - np.repeat(np.cumsum(counts) - counts, counts)
+    a = np.zeros((len(counts), width))
+    b = np.ones((len(counts), width))
+    c = np.zeros((len(counts), width))
+    d = np.zeros((len(counts), width))
+    b[rows, columns] = diagonal
+    d[rows, columns] = rhs
+    last = columns == counts[rows] - 1
+    c[rows[~last], columns[~last]] = upper[~last]
+    a[rows[~last], columns[~last] + 1] = upper[~last]
+
+    for column in range(1, width):
+        factor = a[:, column] / b[:, column - 1]
+        b[:, column] -= factor * c[:, column - 1]
+        d[:, column] -= factor * d[:, column - 1]
+    solution = np.zeros_like(d)
+    if width:
+        solution[:, -1] = d[:, -1] / b[:, -1]
+    for column in range(width - 2, -1, -1):
+        solution[:, column] = ((d[:, column] - c[:, column] * solution[:, column + 1]) /
+                               b[:, column])
+    return solution[rows, columns]
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+def simplify(curveSet, tolerance=0.01):
+    """
+    reduce the keys of all curves of a CurveSet.
+
+    :param curveSet:  densely keyed curves, tangents of the original keys are ignored
+                       - CurveSet
+    :param tolerance: maximum value error at the original keys, per curve or for all curves
+                       - float
+                       - ndarray float (curveCount,)
+
+    :return result:   reduced curves and the maximum error of every curve
+                       - tuple (CurveSet, ndarray float64 (curveCount,))
+    """
+    tolerance = np.broadcast_to(np.asarray(tolerance, np.float64), (curveSet.curveCount,))
+    times, values, offsets = curveSet.times, curveSet.values, curveSet.offsets
+    slopes = CurveSet(offsets, times, values).auto_slopes('spline')[0]
+
+    keep = select_keys(curveSet, tolerance, slopes)
+    fitted = slopes.copy()
+    fitted[keep] = fit_slopes(times, values, offsets, keep, slopes)
+
+    # keep the fit per curve only where it stays within the tolerance
+    filled = np.diff(offsets) > 0
+    curveStarts = offsets[:-1][filled]
+    errors = np.zeros(curveSet.curveCount)
+    if curveSet.keyCount:
+        splitErrors = np.maximum.reduceat(key_errors(times, values, keep, slopes), curveStarts)
+        fitErrors = np.maximum.reduceat(key_errors(times, values, keep, fitted), curveStarts)
+        useFit = np.zeros(curveSet.curveCount, bool)
+        useFit[filled] = fitErrors <= np.maximum(tolerance[filled], splitErrors)
+        curveIds = np.repeat(np.arange(curveSet.curveCount), np.diff(offsets))
+        slopes = np.where(useFit[curveIds], fitted, slopes)
+        errors[filled] = np.where(useFit[filled], fitErrors, splitErrors)
+
+    kept = np.flatnonzero(keep)
+    counts = np.bincount(np.searchsorted(offsets, kept, side='right') - 1,
+                         minlength=curveSet.curveCount)
+    reduced = CurveSet(
+        np.concatenate([[0], np.cumsum(counts)]).astype(np.int64), times[kept], values[kept],
+        slopes[kept], slopes[kept], preInfinity=curveSet.preInfinity,
+        postInfinity=curveSet.postInfinity, names=curveSet.names,
+    )
+    return reduced, errors
+
+
+def _simplify_chunk(arguments):
+    curveSet, tolerance = arguments
+    return simplify(curveSet, tolerance)
+
+
+def reduce_curves(curveSet, tolerance=0.01, processes=None, chunkSize=500):
+    """
+    reduce many curves in chunks on a process pool.
+
+    :param curveSet:  densely keyed curves
+                       - CurveSet
+    :param tolerance: maximum value error, per curve or for all curves
+                       - float
+                       - ndarray float (curveCount,)
+    :param processes: number of worker processes, 0 reduces all curves in this process,
+                      None uses one process per CPU, spawned with mayapy inside Maya
+                       - int
+    :param chunkSize: curves per task
+                       - int
+
+    :return result:   reduced curves and a report per channel with the original and reduced key
+                      count, the ratio of removed keys and the maximum error
+                       - tuple (CurveSet, list [dict, dict, ...])
+    """
+    tolerance = np.broadcast_to(np.asarray(tolerance, np.float64), (curveSet.curveCount,))
+    chunks = [np.arange(start, min(start + chunkSize, curveSet.curveCount))
+              for start in range(0, curveSet.curveCount, chunkSize)]
+    tasks = [(curveSet.select(chunk), tolerance[chunk]) for chunk in chunks]
+
+    if processes == 0 or len(tasks) < 2:
+        results = [_simplify_chunk(task) for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=processes, mp_context=pool_context()) as pool:
+            results = list(pool.map(_simplify_chunk, tasks))
+
+    if not results:
+        return curveSet.select([]), []
+    reduced = CurveSet.concatenate([result[0] for result in results])
+    errors = np.concatenate([result[1] for result in results])
+
+    original, remaining = np.diff(curveSet.offsets), np.diff(reduced.offsets)
+    report = []
+    for index in range(curveSet.curveCount):
+        report.append({
+            'name': curveSet.names[index] if curveSet.names else index,
+            'keys': int(original[index]),
+            'reduced': int(remaining[index]),
+            'ratio': 1.0 - float(remaining[index]) / original[index] if original[index] else 0.0,
+            'error': float(errors[index]),
+        })
+    return reduced, report
+# ----------------------------------------------------------------------------------------------- #
+
+
+# BENCHMARK ------------------------------------------------------------------------------------- #
+def synthetic_capture(curves=5000, frames=1000, noise=0.001, seed=0):
+    """
+    :return curveSet: curves keyed on every frame, sums of random sines with sensor noise
+                       - CurveSet
+    """
+    generator = np.random.default_rng(seed)
+    frameTimes = np.arange(frames, dtype=np.float64)
+    frequencies = generator.uniform(0.002, 0.05, (curves, 3, 1))
+    phases = generator.uniform(0, 2 * np.pi, (curves, 3, 1))
+    amplitudes = generator.uniform(0.1, 10.0, (curves, 3, 1))
+    values = (amplitudes * np.sin(2 * np.pi * frequencies * frameTimes + phases)).sum(axis=1)
+    values += generator.normal(0.0, noise, values.shape)
+    return CurveSet(np.arange(curves + 1) * frames, np.tile(frameTimes, curves),
+                    values.reshape(-1))
+
+
+def benchmark(curves=5000, frames=1000, tolerance=0.01, processes=None):
+    """
+    Reduce synthetic motion capture curves keyed on every frame.
+
+    :return timings: wall time in seconds, key counts and the worst error of all curves
+                      - dict {str: float, ...}
+    """
+    curveSet = synthetic_capture(curves, frames)
+    start = time.perf_counter()
+    reduced, report = reduce_curves(curveSet, tolerance, processes=processes)
+    return {
+        'seconds': time.perf_counter() - start,
+        'keys': curveSet.keyCount,
+        'reduced': reduced.keyCount,
+        'ratio': 1.0 - float(reduced.keyCount) / curveSet.keyCount,
+        'error': max(channel['error'] for channel in report),
+    }
+
+
+if __name__ == '__main__':
+    for name, value in benchmark().items():
+        print('{:<12}{}'.format(name, value))
+# ----------------------------------------------------------------------------------------------- #
@@ -1 +1,10 @@
-from .lib.scene import BypassSceneName
\ No newline at end of file
+from abMaya.libCore.lib.lazy import attach
+
+__getattr__, __dir__, __all__ = attach(__name__, attributes={
+    'BypassSceneName'  : '.lib.scene',
+    'SuspendEvaluation': '.lib.scene',
+    'BypassValue'      : '.lib.attributes',
+    'BypassValues'     : '.lib.attributes',
+    'BypassConnections': '.lib.connections',
+    'ConnectionTable'  : '.lib.connections',
+})
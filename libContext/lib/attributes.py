@@ -5,7 +5,10 @@ Maya attribute specific context managers.
 
 # IMPORTS --------------------------------------------------------------------------------------- #
 import os
+import time
+
 from maya import cmds
+from maya.api import OpenMaya
 # ----------------------------------------------------------------------------------------------- #
 
 
@@ -42,6 +45,310 @@ class BypassValue(object):
 # ----------------------------------------------------------------------------------------------- #
 
 
-# NOTE: WIP, lock/unlock attribute
-# NOTE: WIP, key/unkey
-# NOTE: WIP, all channels
\ No newline at end of file
+# ----------------------------------------------------------------------------------------------- #
+GLOB_CHARACTERS = ('*', '?', '[')
+
+INTEGER_TYPES = (
+    OpenMaya.MFnNumericData.kByte,
+    OpenMaya.MFnNumericData.kChar,
+    OpenMaya.MFnNumericData.kShort,
+    OpenMaya.MFnNumericData.kInt,
+    OpenMaya.MFnNumericData.kInt64,
+    OpenMaya.MFnNumericData.kAddr,
+)
+FLOAT_TYPES = (
+    OpenMaya.MFnNumericData.kFloat,
+    OpenMaya.MFnNumericData.kDouble,
+)
+
+
+def expand_channels(patterns):
+    """
+    Expand plug names and glob patterns into existing channel names.
+    Patterns are resolved by Maya, e.g. "*_ctrl.visibility" or "rig:*.translateX".
+
+    :param patterns: plug names or glob patterns.
+                      - list [str, str, ...]
+
+    :return channels: existing channel names in the given order, without duplicates
+                       - list [str, str, ...]
+    """
+    channels = []
+    for pattern in patterns:
+        if any(character in pattern for character in GLOB_CHARACTERS):
+            channels.extend(cmds.ls(pattern) or [])
+        else:
+            channels.append(pattern)
+    return list(dict.fromkeys(channels))
+
+
+def get_plug(channel):
+    """
+    :param channel: name of the channel
+                     - str
+
+    :return plug:   API plug of the channel
+                     - MPlug
+    """
+    selection = OpenMaya.MSelectionList()
+    selection.add(channel)
+    return selection.getPlug(0)
+
+
+def get_plugs(channels):
+    """
+    :param channels: names of the channels, without duplicates
+                      - list [str, str, ...]
+
+    :return plugs:   API plug of every channel, resolved through a single selection list
+                      - list [MPlug, MPlug, ...]
+    """
+    selection = OpenMaya.MSelectionList()
+    for channel in channels:
+        selection.add(channel)
+    if selection.length() != len(channels):  # aliases of the same plug are merged
+        return [get_plug(channel) for channel in channels]
+    return [selection.getPlug(index) for index in range(len(channels))]
+
+
+def get_plug_value(plug):
+    """
+    Read the value of a plug through the API, in the same units cmds.getAttr would return.
+    Numeric, enum and unit attributes are read directly from the plug,
+    every other attribute type falls back to cmds.getAttr.
+
+    :param plug:   plug to read
+                    - MPlug
+
+    :return value: value of the plug
+                    - bool
+                    - int
+                    - float
+                    - str
+                    - list
+    """
+    attribute = plug.attribute()
+
+    if attribute.hasFn(OpenMaya.MFn.kNumericAttribute):
+        numericType = OpenMaya.MFnNumericAttribute(attribute).numericType()
+        if numericType == OpenMaya.MFnNumericData.kBoolean:
+            return plug.asBool()
+        if numericType in INTEGER_TYPES:
+            return plug.asInt()
+        if numericType in FLOAT_TYPES:
+            return plug.asDouble()
+
+    elif attribute.hasFn(OpenMaya.MFn.kEnumAttribute):
+        return plug.asShort()
+
+    elif attribute.hasFn(OpenMaya.MFn.kUnitAttribute):
+        unitType = OpenMaya.MFnUnitAttribute(attribute).unitType()
+        if unitType == OpenMaya.MFnUnitAttribute.kAngle:
+            return plug.asMAngle().asUnits(OpenMaya.MAngle.uiUnit())
+        if unitType == OpenMaya.MFnUnitAttribute.kDistance:
+            return plug.asMDistance().asUnits(OpenMaya.MDistance.uiUnit())
+        if unitType == OpenMaya.MFnUnitAttribute.kTime:
+            return plug.asMTime().asUnits(OpenMaya.MTime.uiUnit())
+        return plug.asDouble()
+
+    return cmds.getAttr(plug.partialName(includeNodeName=True, useLongNames=True))
+
+
+def add_plug_value(modifier, plug, value):
+    """
+    Queue a value change of a plug on a modifier.
+    Values are given in the same units cmds.setAttr takes.
+
+    :param modifier: modifier collecting the change
+                      - MDGModifier
+    :param plug:     plug to change
+                      - MPlug
+    :param value:    new value of the plug
+                      - bool
+                      - int
+                      - float
+                      - str
+                      - list [(float, float, float)] as returned by cmds.getAttr
+    """
+    attribute = plug.attribute()
+
+    if isinstance(value, (list, tuple)):
+        if value and isinstance(value[0], (list, tuple)):
+            value = value[0]
+        if not plug.isCompound or plug.numChildren() != len(value):
+            raise TypeError('{} takes no {} values'.format(plug.name(), len(value)))
+        for index, childValue in enumerate(value):
+            add_plug_value(modifier, plug.child(index), childValue)
+        return
+
+    if isinstance(value, str):
+        if not attribute.hasFn(OpenMaya.MFn.kTypedAttribute):
+            raise TypeError('{} takes no string value'.format(plug.name()))
+        modifier.newPlugValueString(plug, value)
+
+    elif attribute.hasFn(OpenMaya.MFn.kNumericAttribute):
+        numericType = OpenMaya.MFnNumericAttribute(attribute).numericType()
+        if numericType == OpenMaya.MFnNumericData.kBoolean:
+            modifier.newPlugValueBool(plug, bool(value))
+        elif numericType in INTEGER_TYPES:
+            modifier.newPlugValueInt(plug, int(value))
+        else:
+            modifier.newPlugValueDouble(plug, float(value))
+
+    elif attribute.hasFn(OpenMaya.MFn.kEnumAttribute):
+        modifier.newPlugValueShort(plug, int(value))
+
+    elif attribute.hasFn(OpenMaya.MFn.kUnitAttribute):
+        unitType = OpenMaya.MFnUnitAttribute(attribute).unitType()
+        if unitType == OpenMaya.MFnUnitAttribute.kAngle:
+            modifier.newPlugValueMAngle(plug, OpenMaya.MAngle(value, OpenMaya.MAngle.uiUnit()))
+        elif unitType == OpenMaya.MFnUnitAttribute.kDistance:
+            modifier.newPlugValueMDistance(
+                plug, OpenMaya.MDistance(value, OpenMaya.MDistance.uiUnit())
+            )
+        elif unitType == OpenMaya.MFnUnitAttribute.kTime:
+            modifier.newPlugValueMTime(plug, OpenMaya.MTime(value, OpenMaya.MTime.uiUnit()))
+        else:
+            modifier.newPlugValueDouble(plug, float(value))
+
+    else:
+        raise TypeError('{} is not a numeric, enum or string channel'.format(plug.name()))
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+class BypassValues(object):
+    """
+    Context Manager for temporarily changing the values of many channels at once.
+    e.g. for hiding all controls or zeroing out offsets during an export.
+
+    All channels are resolved through one selection list and snapshot in a single pass over the
+    API before any change is made. Locked channels are unlocked and keyed channels are detached
+    from their animation curve for the duration of the context. Disconnects and values are
+    applied with one MDGModifier, on exit the modifier is undone, which restores the values
+    and anim curve connections, and the locks are set again. The changes are not recorded in
+    the undo queue, the context leaves the scene as it found it.
+    """
+    def __init__(self, channels, tempValue=None):
+        """
+        :param channels:  bypassed channels, plug names or glob patterns.
+                           - dict {str: value, ...}
+                           - list [str, str, ...]
+        :param tempValue: temporary value of all channels, if channels is given as a list.
+                           - bool
+                           - str
+                           - int
+                           - float
+                           - enum
+
+        :return None:
+        """
+        if not isinstance(channels, dict):
+            channels = dict.fromkeys(channels, tempValue)
+
+        self.newValues = {}
+        for pattern, value in channels.items():
+            for channel in expand_channels([pattern]):
+                self.newValues[channel] = value
+
+        self.channels  = list(self.newValues)
+        self.plugs     = {}
+        self.oldValues = {}
+        self.locked    = []
+        self.keyed     = {}
+        self.modifier  = None
+        self.timings   = {}
+
+    def snapshot(self):
+        """ reads value, lock state and anim curve input of all channels """
+        start = time.perf_counter()
+
+        for channel, plug in zip(self.channels, get_plugs(self.channels)):
+            self.plugs[channel] = plug
+            self.oldValues[channel] = get_plug_value(plug)
+
+            if plug.isLocked:
+                self.locked.append(channel)
+
+            if plug.isDestination:
+                source = plug.source()
+                if source.node().hasFn(OpenMaya.MFn.kAnimCurve):
+                    self.keyed[channel] = source
+
+        self.timings['snapshot'] = time.perf_counter() - start
+
+    def _set_locks(self, locked):
+        for channel in self.locked:
+            self.plugs[channel].isLocked = locked
+
+    def __enter__(self):
+        self.snapshot()
+
+        start = time.perf_counter()
+        modifier = OpenMaya.MDGModifier()
+        for channel, source in self.keyed.items():
+            modifier.disconnect(source, self.plugs[channel])
+
+        # every channel is queued, undoIt then also restores channels changed inside the context
+        for channel in self.channels:
+            add_plug_value(modifier, self.plugs[channel], self.newValues[channel])
+
+        self._set_locks(False)
+        try:
+            modifier.doIt()
+        except Exception:
+            modifier.undoIt()
+            self._set_locks(True)
+            raise
+        self.modifier = modifier
+        self.timings['apply'] = time.perf_counter() - start
+
+        return self
+
+    def __exit__(self, ex_type, ex_value, ex_traceback):
+        start = time.perf_counter()
+        if self.modifier:
+            self.modifier.undoIt()
+        self.modifier = None
+        self._set_locks(True)
+        self.timings['restore'] = time.perf_counter() - start
+# ----------------------------------------------------------------------------------------------- #
+
+
+# BENCHMARK ------------------------------------------------------------------------------------- #
+def benchmark(count=10000):
+    """
+    Compare stacked BypassValue instances with a single BypassValues context.
+    Creates count / 10 temporary transforms with 10 channels each and deletes them afterwards.
+
+    :param count:    number of bypassed channels
+                      - int
+
+    :return timings: wall time in seconds of both approaches and the BypassValues phases
+                      - dict {str: float, ...}
+    """
+    attributes = ['tx', 'ty', 'tz', 'rx', 'ry', 'rz', 'sx', 'sy', 'sz', 'v']
+    nodes = [cmds.createNode('transform', name='bypassBenchmark#')
+             for _ in range(max(1, count // len(attributes)))]
+    channels = ['{}.{}'.format(node, attr) for node in nodes for attr in attributes]
+
+    timings = {}
+    try:
+        start = time.perf_counter()
+        bypassed = [BypassValue(channel, 0) for channel in channels]
+        for context in bypassed:
+            context.__enter__()
+        for context in reversed(bypassed):
+            context.__exit__(None, None, None)
+        timings['BypassValue'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with BypassValues(channels, 0) as context:
+            pass
+        timings['BypassValues'] = time.perf_counter() - start
+        timings.update(context.timings)
+    finally:
+        cmds.delete(nodes)
+
+    return timings
+# ----------------------------------------------------------------------------------------------- #
\ No newline at end of file
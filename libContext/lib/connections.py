@@ -0,0 +1,178 @@
+"""
+Maya connection specific context managers.
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import time
+from array import array
+
+from maya import cmds
+from maya.api import OpenMaya
+
+from .attributes import get_plugs
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+class ConnectionTable(object):
+    """
+    Compact edge table of Maya connections.
+    Plug names are stored once in a string table, edges are two parallel integer arrays
+    of source and destination plug indices.
+    The table is indexed on creation for constant time "what drives X" and
+    "what does X drive" queries.
+    """
+    def __init__(self):
+        self.plugs        = []
+        self.plugIndex    = {}
+        self.sources      = array('i')
+        self.destinations = array('i')
+        self.drivers      = {}
+        self.driven       = {}
+
+    def __len__(self):
+        return len(self.sources)
+
+    def __iter__(self):
+        for source, destination in zip(self.sources, self.destinations):
+            yield self.plugs[source], self.plugs[destination]
+
+    def _plug_id(self, plug):
+        index = self.plugIndex.get(plug)
+        if index is None:
+            index = self.plugIndex[plug] = len(self.plugs)
+            self.plugs.append(plug)
+        return index
+
+    def add(self, source, destination):
+        """
+        Add a single connection, duplicate connections are ignored.
+
+        :param source:      source plug of the connection
+                             - str
+        :param destination: destination plug of the connection
+                             - str
+        """
+        sourceID = self._plug_id(source)
+        destinationID = self._plug_id(destination)
+        if self.drivers.get(destinationID) == sourceID:
+            return
+
+        self.sources.append(sourceID)
+        self.destinations.append(destinationID)
+        self.drivers[destinationID] = sourceID
+        self.driven.setdefault(sourceID, []).append(destinationID)
+
+    @classmethod
+    def from_nodes(cls, nodes, incoming=True, outgoing=True):
+        """
+        Capture the connections of the given nodes with one listConnections query per direction.
+
+        :param nodes:    nodes whose connections are captured
+                          - list [str, str, ...]
+        :param incoming: capture connections that drive the given nodes
+                          - bool
+        :param outgoing: capture connections driven by the given nodes
+                          - bool
+
+        :return table:   edge table of the captured connections
+                          - ConnectionTable
+        """
+        table = cls()
+        if not nodes:
+            return table
+
+        if incoming:
+            pairs = cmds.listConnections(
+                nodes, source=True, destination=False, connections=True, plugs=True
+            ) or []
+            for index in range(0, len(pairs), 2):
+                table.add(pairs[index + 1], pairs[index])
+
+        if outgoing:
+            pairs = cmds.listConnections(
+                nodes, source=False, destination=True, connections=True, plugs=True
+            ) or []
+            for index in range(0, len(pairs), 2):
+                table.add(pairs[index], pairs[index + 1])
+
+        return table
+
+    def driver(self, plug):
+        """
+        :param plug:   destination plug
+                        - str
+
+        :return plug:  source plug driving the given plug or None
+                        - str
+        """
+        index = self.plugIndex.get(plug)
+        if index is None or index not in self.drivers:
+            return None
+        return self.plugs[self.drivers[index]]
+
+    def driven_plugs(self, plug):
+        """
+        :param plug:   source plug
+                        - str
+
+        :return plugs: destination plugs driven by the given plug
+                        - list [str, str, ...]
+        """
+        index = self.plugIndex.get(plug)
+        if index is None:
+            return []
+        return [self.plugs[destination] for destination in self.driven.get(index, [])]
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+class BypassConnections(object):
+    """
+    Context Manager for temporarily disconnecting all connections of a set of nodes.
+    e.g. for baking or exporting nodes without their constraints and drivers.
+
+    Connections are captured into a ConnectionTable and broken with a single DG modifier,
+    which is undone on exit to restore every connection exactly.
+    """
+    def __init__(self, nodes, incoming=True, outgoing=True):
+        """
+        :param nodes:    nodes whose connections are bypassed.
+                          - list [str, str, ...]
+        :param incoming: bypass connections driving the given nodes
+                          - bool
+        :param outgoing: bypass connections driven by the given nodes
+                          - bool
+
+        :return None:
+        """
+        self.nodes    = cmds.ls(nodes) or []
+        self.incoming = incoming
+        self.outgoing = outgoing
+        self.table    = ConnectionTable()
+        self.modifier = None
+        self.timings  = {}
+
+    def __enter__(self):
+        start = time.perf_counter()
+        self.table = ConnectionTable.from_nodes(self.nodes, self.incoming, self.outgoing)
+        self.timings['capture'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        self.modifier = OpenMaya.MDGModifier()
+        plugs = get_plugs(self.table.plugs)
+        for source, destination in zip(self.table.sources, self.table.destinations):
+            self.modifier.disconnect(plugs[source], plugs[destination])
+        self.modifier.doIt()
+        self.timings['disconnect'] = time.perf_counter() - start
+
+        return self.table
+
+    def __exit__(self, ex_type, ex_value, ex_traceback):
+        start = time.perf_counter()
+        if self.modifier:
+            self.modifier.undoIt()
+        self.modifier = None
+        self.timings['reconnect'] = time.perf_counter() - start
+# ----------------------------------------------------------------------------------------------- #
@@ -5,6 +5,8 @@ Maya scene specific context managers.
 
 # IMPORTS --------------------------------------------------------------------------------------- #
 import os
+import time
+
 from maya import cmds
 # ----------------------------------------------------------------------------------------------- #
 
@@ -31,3 +33,75 @@ class BypassSceneName(object):
     def __exit__(self, ex_type, ex_value, ex_traceback):
         cmds.file(rename=self.sceneName)
 # ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+class SuspendEvaluation(object):
+    """
+    Context Manager for suspending scene updates during bulk operations.
+    e.g. for flooding skin weights or editing attributes on thousands of nodes.
+
+    Viewport refresh and auto-keying are suspended, undo recording and the evaluation
+    manager mode are optionally changed. Every setting is queried on enter and restored in
+    reverse order on exit, even if the block raised an exception.
+    The wall time of the suspended block is stored in the elapsed attribute.
+    """
+    def __init__(self, refresh=True, autoKey=True, undo=False, evaluationMode=None):
+        """
+        :param refresh:        suspend viewport refresh.
+                                - bool
+        :param autoKey:        disable auto keyframing.
+                                - bool
+        :param undo:           disable undo recording, without flushing the undo queue.
+                                - bool
+        :param evaluationMode: temporary evaluation manager mode, None keeps the current mode.
+                                - str ('off', 'serial', 'parallel')
+
+        :return None:
+        """
+        self.refresh        = refresh
+        self.autoKey        = autoKey
+        self.undo           = undo
+        self.evaluationMode = evaluationMode
+        self.restore        = []
+        self.elapsed        = 0.0
+        self._start         = 0.0
+
+    def __enter__(self):
+        self.restore = []
+
+        if self.evaluationMode:
+            oldMode = cmds.evaluationManager(q=True, mode=True)[0]
+            if oldMode != self.evaluationMode:
+                cmds.evaluationManager(mode=self.evaluationMode)
+                self.restore.append(lambda: cmds.evaluationManager(mode=oldMode))
+
+        if self.autoKey and cmds.autoKeyframe(q=True, state=True):
+            cmds.autoKeyframe(state=False)
+            self.restore.append(lambda: cmds.autoKeyframe(state=True))
+
+        if self.undo and cmds.undoInfo(q=True, stateWithoutFlush=True):
+            cmds.undoInfo(stateWithoutFlush=False)
+            self.restore.append(lambda: cmds.undoInfo(stateWithoutFlush=True))
+
+        if self.refresh:
+            cmds.refresh(suspend=True)
+            self.restore.append(lambda: cmds.refresh(suspend=False))
+
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, ex_type, ex_value, ex_traceback):
+        self.elapsed = time.perf_counter() - self._start
+        self._restore(list(reversed(self.restore)))
+        self.restore = []
+
+    def _restore(self, callbacks):
+        """ run all restore callbacks, later callbacks still run if one of them fails """
+        if not callbacks:
+            return
+        try:
+            callbacks[0]()
+        finally:
+            self._restore(callbacks[1:])
+# ----------------------------------------------------------------------------------------------- #
@@ -0,0 +1 @@
+from .lib.lazy import attach
\ No newline at end of file
@@ -0,0 +1,311 @@
+"""
+    Relocatable Maya module deployment.
+
+        mayapy -m abMaya.libCore.lib.bundle <installRoot> --benchmark
+        mayapy -m abMaya.libCore.lib.bundle <repository>/modules --loose
+
+    Bundles the packages of every Maya module into one zip archive of byte compiled modules and
+    writes .mod files with paths relative to the install root, so the install can be copied to
+    any location or network share:
+
+        <installRoot>/<module>.mod
+        <installRoot>/<module>/python/<module>.zip      packages, imported through zipimport
+        <installRoot>/<module>/resources/abMaya/...     data files, see libCore.lib.resources
+
+    The shared libraries form the abMaya module with the abMaya package init, tool modules only
+    hold their own package and join the abMaya package through pkgutil.extend_path.
+    Modules are compiled to unchecked hash .pyc files, build with the mayapy of the target Maya
+    version. --loose writes .mod files for a source checkout instead.
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import argparse
+import os
+import py_compile
+import shutil
+import sys
+import tempfile
+import time
+import zipfile
+
+from .importtime import import_time
+from .resources import RESOURCES
+# ----------------------------------------------------------------------------------------------- #
+
+
+PACKAGE = 'abMaya'
+VERSION = '1.0'
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Maya module name -> folders of the abMaya package it bundles
+MODULES = {
+    'abMaya'          : ['libAnim', 'libContext', 'libCore', 'libModel'],
+    'abCache'         : ['abCache'],
+    'abNode'          : ['abNode'],
+    'abPreflight'     : ['abPreFlight'],
+    'plug_ngSkinTools': ['plug_ngSkinTools'],
+}
+# module folders with mel scripts, added to MAYA_SCRIPT_PATH
+SCRIPTS = {
+    'plug_ngSkinTools': ['plug_ngSkinTools/mel'],
+}
+SKIPPED = ('__pycache__', '.git')
+SKIPPED_FILES = ('.pyc', '.pyo', '.md')
+
+# maya free modules imported by the cold start benchmark
+BENCHMARK_MODULES = [
+    'abMaya.libCore.lib.shared',
+    'abMaya.libModel.lib.symmetry',
+    'abMaya.libModel.lib.texture',
+    'abMaya.abNode.python.label',
+    'abMaya.plug_ngSkinTools.python.core.dab',
+    'abMaya.plug_ngSkinTools.python.core.layers',
+]
+
+
+# FILES ----------------------------------------------------------------------------------------- #
+def package_files(folders, root=ROOT):
+    """
+    :param folders: folders of the package, relative to the package root
+                     - list [str, str, ...]
+    :param root:    package root
+                     - str
+
+    :return files:  python sources and data files, relative to the package root
+                     - tuple (list [str, ...], list [str, ...])
+    """
+    sources, resources = [], []
+    for folder in folders:
+        for directory, directories, names in os.walk(os.path.join(root, folder)):
+            directories[:] = sorted(name for name in directories if name not in SKIPPED)
+            for name in sorted(names):
+                path = os.path.relpath(os.path.join(directory, name), root)
+                if name.endswith('.py'):
+                    sources.append(path)
+                elif not name.endswith(SKIPPED_FILES):
+                    resources.append(path)
+    return sources, resources
+
+
+def build_archive(path, sources, root=ROOT, includeSources=True):
+    """
+    write a zipimport archive of byte compiled modules.
+    Modules are compiled to unchecked hash .pyc files next to their source, zipimport loads them
+    without comparing timestamps. Entries are stored uncompressed for the fastest import.
+
+    :param path:           archive path
+                            - str
+    :param sources:        python files relative to the package root, see package_files
+                            - list [str, str, ...]
+    :param root:           package root
+                            - str
+    :param includeSources: add the .py files for tracebacks
+                            - bool
+    """
+    staging = tempfile.mkdtemp()
+    try:
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_STORED) as archive:
+            # zipimport finds namespace portions of the package only through directory entries
+            directories = set()
+            for source in sources:
+                parts = [PACKAGE] + source.split(os.sep)[:-1]
+                for end in range(1, len(parts) + 1):
+                    directories.add('/'.join(parts[:end]) + '/')
+            for directory in sorted(directories):
+                archive.writestr(zipfile.ZipInfo(directory), b'')
+
+            for source in sources:
+                name = '/'.join([PACKAGE] + source.split(os.sep))
+                compiled = os.path.join(staging, source + 'c')
+                py_compile.compile(
+                    os.path.join(root, source), cfile=compiled, dfile=name, doraise=True,
+                    invalidation_mode=py_compile.PycInvalidationMode.UNCHECKED_HASH,
+                )
+                archive.write(compiled, name + 'c')
+                if includeSources:
+                    archive.write(os.path.join(root, source), name)
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+# ----------------------------------------------------------------------------------------------- #
+
+
+# MOD FILES ------------------------------------------------------------------------------------- #
+def mod_text(module, location, pythonPaths, scriptPaths=()):
+    """
+    :param module:      Maya module name
+                         - str
+    :param location:    module root relative to the .mod file
+                         - str
+    :param pythonPaths: PYTHONPATH entries relative to the module root
+                         - list [str, str, ...]
+    :param scriptPaths: MAYA_SCRIPT_PATH entries relative to the module root
+                         - list [str, str, ...]
+
+    :return text:       .mod file content
+                         - str
+    """
+    lines = ['+ {} {} {}'.format(module, VERSION, location)]
+    lines.extend('PYTHONPATH +:= {}'.format(path) for path in pythonPaths)
+    lines.extend('MAYA_SCRIPT_PATH +:= {}'.format(path) for path in scriptPaths)
+    return '\n'.join(lines) + '\n'
+
+
+def write_mod(directory, module, text):
+    path = os.path.join(directory, module + '.mod')
+    with open(path, 'w') as modFile:
+        modFile.write(text)
+    return path
+
+
+def write_loose_mods(directory, root=ROOT, modules=None):
+    """
+    write .mod files for a source checkout, the repository folder has to be named abMaya.
+
+    :param directory: folder of the .mod files, e.g. the modules folder of the repository
+                       - str
+    :param modules:   Maya module names, defaults to all MODULES
+                       - list [str, str, ...]
+
+    :return paths:    written .mod files
+                       - list [str, str, ...]
+    """
+    location = os.path.relpath(os.path.realpath(root), os.path.realpath(directory))
+    location = location.replace(os.sep, '/')
+    paths = []
+    for module in modules or MODULES:
+        # the module root is the repository, the parent folder holds the abMaya package
+        scripts = SCRIPTS.get(module, [])
+        paths.append(write_mod(directory, module, mod_text(module, location, ['..'], scripts)))
+    return paths
+# ----------------------------------------------------------------------------------------------- #
+
+
+# BUILD ----------------------------------------------------------------------------------------- #
+def build(output, modules=None, root=ROOT, includeSources=True):
+    """
+    bundle Maya modules into a relocatable install, see the module docstring for the layout.
+
+    :param output:         install root, existing module folders are replaced
+                            - str
+    :param modules:        Maya module names, defaults to all MODULES
+                            - list [str, str, ...]
+    :param root:           abMaya package root
+                            - str
+    :param includeSources: add the .py files to the archives for tracebacks
+                            - bool
+
+    :return report:        archive path, module count and resource count per Maya module
+                            - dict {str: dict, ...}
+    """
+    report = {}
+    for module in modules or MODULES:
+        folders = list(MODULES[module])
+        sources, resources = package_files(folders, root)
+        if module == PACKAGE:
+            sources.insert(0, '__init__.py')
+
+        moduleRoot = os.path.join(output, module)
+        if os.path.isdir(moduleRoot):
+            shutil.rmtree(moduleRoot)
+        os.makedirs(os.path.join(moduleRoot, 'python'))
+        archive = os.path.join(moduleRoot, 'python', module + '.zip')
+        build_archive(archive, sources, root, includeSources)
+
+        for resource in resources:
+            target = os.path.join(moduleRoot, RESOURCES, PACKAGE, resource)
+            if not os.path.isdir(os.path.dirname(target)):
+                os.makedirs(os.path.dirname(target))
+            shutil.copy2(os.path.join(root, resource), target)
+
+        scripts = ['/'.join([RESOURCES, PACKAGE, path]) for path in SCRIPTS.get(module, [])]
+        write_mod(output, module, mod_text(module, module, ['python/' + module + '.zip'], scripts))
+        report[module] = {'archive': archive, 'modules': len(sources), 'resources': len(resources)}
+    return report
+# ----------------------------------------------------------------------------------------------- #
+
+
+# BENCHMARK ------------------------------------------------------------------------------------- #
+def archives(output, modules=None):
+    """ :return paths: archive of every bundled module, the abMaya module first - list """
+    names = sorted(modules or MODULES, key=lambda name: name != PACKAGE)
+    return [os.path.join(output, name, 'python', name + '.zip') for name in names]
+
+
+def benchmark(output=None, modules=None, runs=5):
+    """
+    Cold start import time of the loose source tree without and with __pycache__ and of the
+    bundled archives, each module is imported in fresh interpreters.
+
+    :param output:   install root of a build, a temporary build if None
+                      - str
+    :param modules:  dotted module names, defaults to BENCHMARK_MODULES
+                      - list [str, str, ...]
+    :param runs:     fresh interpreters per module and layout
+                      - int
+
+    :return report:  seconds per layout and module
+                      - dict {str: dict {str: float, ...}, ...}
+    """
+    temporary = output is None
+    output = output or tempfile.mkdtemp()
+    sources = tempfile.mkdtemp()
+    try:
+        if temporary:
+            build(output)
+        # copy of the sources without __pycache__, like a fresh checkout on a network share
+        shutil.copytree(ROOT, os.path.join(sources, PACKAGE),
+                        ignore=shutil.ignore_patterns(*SKIPPED))
+        layouts = {
+            'loose': ([sources], {'PYTHONDONTWRITEBYTECODE': '1'}),
+            'cached': ([os.path.dirname(ROOT)], {}),
+            'bundled': (archives(output), {}),
+        }
+        report = {}
+        for layout, (path, environment) in layouts.items():
+            report[layout] = {}
+            for module in modules or BENCHMARK_MODULES:
+                result = import_time(module, runs, path=path, environment=environment)
+                report[layout][module] = result['seconds']
+        return report
+    finally:
+        shutil.rmtree(sources, ignore_errors=True)
+        if temporary:
+            shutil.rmtree(output, ignore_errors=True)
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Bundle abMaya into relocatable Maya modules.')
+    parser.add_argument('output', help='install root, or the .mod folder with --loose')
+    parser.add_argument('--modules', nargs='+', choices=sorted(MODULES), default=None)
+    parser.add_argument('--loose', action='store_true', help='write .mod files for the sources')
+    parser.add_argument('--no-source', action='store_true', help='bundle .pyc files only')
+    parser.add_argument('--benchmark', action='store_true', help='measure cold start imports')
+    options = parser.parse_args(args)
+
+    if options.loose:
+        for path in write_loose_mods(options.output, modules=options.modules):
+            print(path)
+        return 0
+
+    start = time.perf_counter()
+    report = build(options.output, options.modules, includeSources=not options.no_source)
+    for module, entry in report.items():
+        print('{:<18}{:>5} modules {:>4} resources  {}'.format(
+            module, entry['modules'], entry['resources'], entry['archive']
+        ))
+    print('built in {:.2f}s'.format(time.perf_counter() - start))
+
+    if options.benchmark:
+        results = benchmark(options.output)
+        for module in BENCHMARK_MODULES:
+            print('{:<44}'.format(module) + ''.join(
+                '{:>10} {:>7.1f}ms'.format(layout, results[layout][module] * 1000.0)
+                for layout in results
+            ))
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
+# ----------------------------------------------------------------------------------------------- #
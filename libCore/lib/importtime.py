@@ -0,0 +1,103 @@
+"""
+    Cold import benchmark of the abMaya packages.
+
+        python -m abMaya.libCore.lib.importtime
+
+    Every package is imported in fresh interpreters and has to stay within the import time
+    budget without loading any maya module, see libCore.lib.lazy.
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import json
+import os
+import subprocess
+import sys
+import tempfile
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+PACKAGES = [
+    'abMaya',
+    'abMaya.libCore',
+    'abMaya.libAnim',
+    'abMaya.libContext',
+    'abMaya.libModel',
+    'abMaya.abCache',
+    'abMaya.abNode',
+    'abMaya.abPreFlight',
+    'abMaya.plug_ngSkinTools',
+]
+BUDGET = 0.05  # seconds per package import in a fresh interpreter
+
+_MEASURE = (
+    'import json, sys, time\n'
+    'start = time.perf_counter()\n'
+    'import {module}\n'
+    'seconds = time.perf_counter() - start\n'
+    'maya = sorted(name for name in sys.modules if name.split(".")[0] == "maya")\n'
+    'print(json.dumps({{"seconds": seconds, "maya": maya}}))\n'
+)
+
+
+def import_time(module, runs=5, path=None, environment=None):
+    """
+    :param module:      dotted module name
+                         - str
+    :param runs:        fresh interpreters started, the fastest import is reported
+                         - int
+    :param path:        PYTHONPATH of the interpreters, defaults to the current sys.path
+                         - list [str, str, ...]
+    :param environment: additional environment variables of the interpreters
+                         - dict {str: str, ...}
+
+    :return result:     import time in seconds and the maya modules loaded by the import
+                         - dict {'seconds': float, 'maya': [str, ...]}
+    """
+    variables = dict(os.environ)
+    variables.update(environment or {})
+    variables['PYTHONPATH'] = os.pathsep.join(entry for entry in path or sys.path if entry)
+    # the working directory is on sys.path, keep it away from other package layouts
+    workingDirectory = tempfile.gettempdir() if path is not None else None
+    results = []
+    for _ in range(runs):
+        output = subprocess.check_output(
+            [sys.executable, '-c', _MEASURE.format(module=module)], env=variables,
+            cwd=workingDirectory,
+        )
+        results.append(json.loads(output.decode().strip().splitlines()[-1]))
+    return min(results, key=lambda result: result['seconds'])
+
+
+def benchmark(packages=None, budget=BUDGET, runs=5):
+    """
+    Measure the cold import time of every abMaya package.
+    A package fails when its import takes longer than the budget or loads any maya module.
+
+    :param packages: dotted package names, defaults to PACKAGES
+                      - list [str, str, ...]
+    :param budget:   allowed import time in seconds per package
+                      - float
+    :param runs:     fresh interpreters per package
+                      - int
+
+    :return report:  import time, loaded maya modules and the pass state per package
+                      - dict {str: dict, ...}
+    """
+    report = {}
+    for package in packages or PACKAGES:
+        result = import_time(package, runs)
+        result['passed'] = result['seconds'] <= budget and not result['maya']
+        report[package] = result
+    return report
+
+
+if __name__ == '__main__':
+    results = benchmark()
+    for name, result in results.items():
+        print('{:<6}{:>10.2f}ms  {}'.format(
+            'ok' if result['passed'] else 'FAIL', result['seconds'] * 1000.0, name
+        ))
+    raise SystemExit(0 if all(result['passed'] for result in results.values()) else 1)
+# ----------------------------------------------------------------------------------------------- #
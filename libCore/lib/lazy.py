@@ -0,0 +1,49 @@
+"""
+    Lazy submodule loading for abMaya packages, see PEP 562.
+    Package inits declare their public names and the submodules providing them, modules are
+    imported on first attribute access so importing a package stays cheap and Maya free.
+
+        __getattr__, __dir__, __all__ = attach(
+            __name__, attributes={'CurveSet': '.lib.curve'}, modules={'bake': '.lib.bake'}
+        )
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import importlib
+import sys
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+def attach(package, attributes=None, modules=None):
+    """
+    :param package:    name of the package, __name__ of its __init__
+                        - str
+    :param attributes: public names and the relative module defining them
+                        - dict {str: str, ...}
+    :param modules:    public names of whole modules and their relative path
+                        - dict {str: str, ...}
+
+    :return hooks:     module level __getattr__, __dir__ and __all__ of the package
+                        - tuple (function, function, list [str, str, ...])
+    """
+    attributes = dict(attributes or {})
+    modules = dict(modules or {})
+    names = sorted(set(attributes) | set(modules))
+
+    def __getattr__(name):
+        if name in modules:
+            value = importlib.import_module(modules[name], package)
+        elif name in attributes:
+            value = getattr(importlib.import_module(attributes[name], package), name)
+        else:
+            raise AttributeError('module {!r} has no attribute {!r}'.format(package, name))
+        setattr(sys.modules[package], name, value)  # later lookups skip __getattr__
+        return value
+
+    def __dir__():
+        return sorted(set(vars(sys.modules[package])) | set(names))
+
+    return __getattr__, __dir__, names
+# ----------------------------------------------------------------------------------------------- #
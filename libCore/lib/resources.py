@@ -0,0 +1,57 @@
+"""
+    Data files of abMaya packages.
+    Packages bundled into zip archives keep their data files loose in a resources folder next to
+    the python folder of the module, see libCore.lib.bundle. Files are looked up next to the
+    module first, so loose source trees need no resources folder.
+
+        DEFAULT_CONFIG = resource_path(__file__, 'config', 'default.yml')
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import os
+# ----------------------------------------------------------------------------------------------- #
+
+
+RESOURCES = 'resources'  # folder of the loose data files, next to the python folder
+
+
+# ----------------------------------------------------------------------------------------------- #
+def split_archive(path):
+    """
+    :param path:   file path, possibly inside a zip archive
+                    - str
+
+    :return split: archive path and the path inside the archive, None if not inside an archive
+                    - tuple (str, str)
+    """
+    path = os.path.normpath(path)
+    archive = path
+    while True:
+        parent = os.path.dirname(archive)
+        if parent == archive:
+            return None
+        if archive.lower().endswith('.zip') and os.path.isfile(archive):
+            return archive, os.path.relpath(path, archive)
+        archive = parent
+
+
+def resource_path(anchor, *parts):
+    """
+    :param anchor: __file__ of the module the data file belongs to
+                    - str
+    :param parts:  path of the data file relative to the module folder
+                    - str
+
+    :return path:  path of the data file on disk
+                    - str
+    """
+    path = os.path.normpath(os.path.join(os.path.dirname(anchor), *parts))
+    if os.path.exists(path):
+        return path
+    split = split_archive(path)
+    if split is None:
+        return path
+    archive, inner = split
+    return os.path.join(os.path.dirname(os.path.dirname(archive)), RESOURCES, inner)
+# ----------------------------------------------------------------------------------------------- #
@@ -0,0 +1,247 @@
+"""
+    Shared memory arrays for process pools.
+    Arrays are published once into named shared memory segments, tasks only carry the small
+    picklable handle. Workers attach zero copy and write results in place, so the pool overhead
+    does not grow with the array size.
+
+        with SharedArray.publish(weights) as shared:
+            with ProcessPoolExecutor() as pool:
+                list(pool.map(scale_rows, [(shared.handle, rows) for rows in chunks]))
+            result = shared.array.copy()
+
+        def scale_rows(arguments):
+            handle, rows = arguments
+            attach(handle)[rows] *= 0.5
+
+    Publish the arrays before starting the pool, workers then share the resource tracker of the
+    publishing process. Segments are unlinked when the last reference of the publisher is
+    released, leftovers when the publishing process exits.
+
+    Inside an interactive Maya session pass mp_context=pool_context() to the pool, workers are
+    then spawned with mayapy instead of forking or launching Maya.
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import atexit
+import multiprocessing
+import os
+import sys
+import time
+from collections import namedtuple
+from multiprocessing import shared_memory
+
+import numpy as np
+# ----------------------------------------------------------------------------------------------- #
+
+
+Handle = namedtuple('Handle', ['name', 'shape', 'dtype'])
+
+_PUBLISHED = {}  # segment name -> SharedArray published by this process
+_ATTACHED  = {}  # segment name -> SharedMemory attached by this process
+
+
+# ----------------------------------------------------------------------------------------------- #
+class SharedArray(object):
+    """ reference counted numpy array in a named shared memory segment """
+    def __init__(self, shape, dtype=np.float64):
+        """
+        :param shape: array shape
+                       - tuple (int, ...)
+        :param dtype: array data type
+                       - numpy dtype
+        """
+        dtype = np.dtype(dtype)
+        shape = tuple(int(size) for size in (shape if np.ndim(shape) else (shape,)))
+        size = max(int(np.prod(shape)) * dtype.itemsize, 1)
+
+        self.memory     = shared_memory.SharedMemory(create=True, size=size)
+        self.handle     = Handle(self.memory.name, shape, dtype.str)
+        self.array      = np.ndarray(shape, dtype, buffer=self.memory.buf)
+        self.references = 1
+        self.pid        = os.getpid()
+        _PUBLISHED[self.handle.name] = self
+
+    @classmethod
+    def publish(cls, array):
+        """
+        :param array:   array to copy into shared memory
+                         - ndarray
+
+        :return shared: shared copy with one reference
+                         - SharedArray
+        """
+        array = np.asarray(array)
+        shared = cls(array.shape, array.dtype)
+        shared.array[...] = array
+        return shared
+
+    def acquire(self):
+        """ add a reference, every acquire needs a release """
+        if self.references <= 0:
+            raise ValueError('shared array {} is already released'.format(self.handle.name))
+        self.references += 1
+        return self
+
+    def release(self):
+        """ remove a reference, the segment is unlinked with the last reference """
+        self.references -= 1
+        if self.references == 0:
+            self._free()
+
+    def _free(self):
+        self.array = None
+        _PUBLISHED.pop(self.handle.name, None)
+        detach(self.handle)
+        try:
+            self.memory.close()
+        except BufferError:  # views of the array are still alive, the mapping goes with them
+            pass
+        self.memory.unlink()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.release()
+
+    def __repr__(self):
+        return 'SharedArray({!r}, shape={}, dtype={}, references={})'.format(
+            self.handle.name, self.handle.shape, self.handle.dtype, self.references
+        )
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+def _open(name):
+    try:
+        return shared_memory.SharedMemory(name=name, track=False)  # Python 3.13+
+    except TypeError:
+        return shared_memory.SharedMemory(name=name)
+
+
+def attach(handle):
+    """
+    :param handle: handle of a published array
+                    - Handle
+
+    :return array: zero copy view of the shared array, writes are visible to all processes
+                    - ndarray
+    """
+    published = _PUBLISHED.get(handle.name)
+    if published is not None:  # tasks run in the publishing process
+        return published.array
+    memory = _ATTACHED.get(handle.name)
+    if memory is None:
+        memory = _ATTACHED[handle.name] = _open(handle.name)
+    return np.ndarray(handle.shape, np.dtype(handle.dtype), buffer=memory.buf)
+
+
+def detach(handle=None):
+    """ close the segment of the handle in this process, all attached segments if None """
+    names = [handle.name] if handle is not None else list(_ATTACHED)
+    for name in names:
+        memory = _ATTACHED.pop(name, None)
+        if memory is None:
+            continue
+        try:
+            memory.close()
+        except BufferError:
+            pass
+
+
+@atexit.register
+def _cleanup():
+    for shared in list(_PUBLISHED.values()):
+        if shared.pid == os.getpid():
+            shared.references = 0
+            shared._free()
+    detach()
+# ----------------------------------------------------------------------------------------------- #
+
+
+# PROCESS POOLS --------------------------------------------------------------------------------- #
+def find_mayapy(executable=None):
+    """
+    :param executable: executable of the running process, defaults to sys.executable
+                        - str
+
+    :return mayapy:    mayapy of the Maya install when running inside an interactive Maya
+                       session, None for mayapy and plain python processes
+                        - str
+    """
+    executable = executable or sys.executable
+    name = os.path.basename(executable).lower()
+    if not name.startswith('maya') or name.startswith('mayapy'):
+        return None
+    directory = os.path.dirname(executable)
+    for folder in (directory, os.path.join(os.path.dirname(directory), 'bin')):  # macOS bundle
+        for mayapy in ('mayapy.exe', 'mayapy'):
+            path = os.path.join(folder, mayapy)
+            if os.path.isfile(path):
+                return path
+    return None
+
+
+def pool_context():
+    """
+    :return context: spawn context running mayapy inside an interactive Maya session, None
+                     for the default context of mayapy and plain python processes
+                      - multiprocessing context
+    """
+    mayapy = find_mayapy()
+    if mayapy is None:
+        return None
+    context = multiprocessing.get_context('spawn')
+    context.set_executable(mayapy)
+    return context
+# ----------------------------------------------------------------------------------------------- #
+
+
+# BENCHMARK ------------------------------------------------------------------------------------- #
+def _scale_pickled(rows):
+    return rows * 0.5
+
+
+def _scale_shared(arguments):
+    handle, start, stop = arguments
+    array = attach(handle)
+    array[start:stop] *= 0.5
+
+
+def benchmark(sizes=(10000, 100000, 1000000), influences=32, processes=2, chunks=8):
+    """
+    :return timings: seconds of a pool map over weight rows with pickled arrays and with a
+                     shared array per vertex count
+                      - dict {int: dict {str: float, ...}, ...}
+    """
+    from concurrent.futures import ProcessPoolExecutor
+
+    timings = {}
+    for size in sizes:
+        weights = np.random.default_rng(0).random((influences, size))
+        bounds = np.linspace(0, influences, chunks + 1).astype(int)
+
+        with SharedArray.publish(weights) as shared:
+            with ProcessPoolExecutor(max_workers=processes) as pool:
+                list(pool.map(_scale_pickled, [weights[:1]] * processes))  # start the workers
+                start = time.perf_counter()
+                parts = list(pool.map(_scale_pickled, [weights[bounds[index]:bounds[index + 1]]
+                                                       for index in range(chunks)]))
+                pickled = time.perf_counter() - start
+
+                start = time.perf_counter()
+                list(pool.map(_scale_shared, [(shared.handle, bounds[index], bounds[index + 1])
+                                              for index in range(chunks)]))
+                inPlace = time.perf_counter() - start
+            assert np.array_equal(np.concatenate(parts), shared.array)
+        timings[size] = {'pickled': pickled, 'shared': inPlace}
+    return timings
+
+
+if __name__ == '__main__':
+    for size, timing in benchmark().items():
+        print('{:>8} vertices  pickled {pickled:.4f}s  shared {shared:.4f}s'.format(
+            size, **timing
+        ))
+# ----------------------------------------------------------------------------------------------- #
@@ -0,0 +1,88 @@
+"""
+    Maya undo queue entries for API edits.
+    Edits made through MDGModifier, MAnimCurveChange and other API classes are not recorded by
+    the undo queue. commit registers their undo and redo functions as one entry of the queue,
+    through a small command plugin that is written to the temp folder and loaded on first use.
+
+        modifier = OpenMaya.MDGModifier()
+        modifier.disconnect(source, destination)
+        modifier.doIt()
+        commit(modifier.undoIt, modifier.doIt)
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import os
+import tempfile
+# ----------------------------------------------------------------------------------------------- #
+
+
+COMMAND = 'abApiUndo'
+PLUGIN_SOURCE = '''"""
+    Undo queue command of abMaya.libCore.lib.undo, written by it.
+"""
+from maya.api import OpenMaya
+
+from abMaya.libCore.lib import undo
+
+
+def maya_useNewAPI():
+    pass
+
+
+class ApiUndo(OpenMaya.MPxCommand):
+    def doIt(self, args):
+        self.undo, self.redo = undo._PENDING.pop()
+
+    def undoIt(self):
+        self.undo()
+
+    def redoIt(self):
+        self.redo()
+
+    def isUndoable(self):
+        return True
+
+
+def initializePlugin(plugin):
+    OpenMaya.MFnPlugin(plugin).registerCommand(undo.COMMAND, ApiUndo)
+
+
+def uninitializePlugin(plugin):
+    OpenMaya.MFnPlugin(plugin).deregisterCommand(undo.COMMAND)
+'''
+
+_PENDING = []  # undo and redo functions of the next command call
+
+
+# ----------------------------------------------------------------------------------------------- #
+def plugin_path():
+    """ :return path: the command plugin, written if missing or outdated - str """
+    path = os.path.join(tempfile.gettempdir(), COMMAND + '.py')
+    if os.path.isfile(path):
+        with open(path) as pluginFile:
+            if pluginFile.read() == PLUGIN_SOURCE:
+                return path
+    with open(path, 'w') as pluginFile:
+        pluginFile.write(PLUGIN_SOURCE)
+    return path
+
+
+def commit(undo, redo):
+    """
+    add an already executed API edit to the undo queue.
+
+    :param undo: reverts the edit
+                  - function ()
+    :param redo: executes the edit again
+                  - function ()
+    """
+    from maya import cmds
+
+    if not cmds.pluginInfo(COMMAND, query=True, loaded=True):
+        cmds.loadPlugin(plugin_path(), quiet=True)
+    _PENDING.append((undo, redo))
+    try:
+        getattr(cmds, COMMAND)()
+    finally:
+        del _PENDING[:]
@@ -1 +1,5 @@
-from .lib import component
\ No newline at end of file
+from abMaya.libCore.lib.lazy import attach
+
+__getattr__, __dir__, __all__ = attach(__name__, modules={
+    'component': '.lib.component',
+})
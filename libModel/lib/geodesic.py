@@ -0,0 +1,357 @@
+"""
+    Geodesic distances over the mesh surface.
+    Brush falloffs measured along the surface do not bleed across nearby unconnected surfaces
+    like fingers or lips. Bounded queries run a Dijkstra search over the CSR adjacency that
+    stops at the brush radius, so the cost per dab depends on the vertices inside the radius.
+    Whole mesh queries can use the heat method, solved with conjugate gradients.
+    Results are memoized per source region, the cache is rebuilt when topology or points change.
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import heapq
+import time
+from collections import OrderedDict
+
+import numpy as np
+# ----------------------------------------------------------------------------------------------- #
+
+
+CACHE_SIZE = 256  # memoized source regions per mesh
+FIELD_CACHE_SIZE = 8  # memoized heat fields per mesh, each holds a distance for every vertex
+MESH_CACHE_SIZE  = 4  # meshes with shared memoized queries
+CG_TOLERANCE = 1e-8
+CG_ITERATIONS = 2000
+HEAT_DECAY    = 12.0  # largest extent of the mesh in heat flow lengths
+
+_GEODESICS = OrderedDict()  # (points hash, Geodesic) per topology hash, least recent first
+
+
+# EDGES ----------------------------------------------------------------------------------------- #
+def edge_lengths(points, adjacency):
+    """
+    :param points:    vertex positions
+                       - ndarray float64 (vertexCount, 3)
+    :param adjacency: CSR vertex adjacency (offsets, indices)
+                       - tuple (ndarray, ndarray)
+
+    :return lengths:  length of every adjacency entry
+                       - ndarray float64 (offsets[-1],)
+    """
+    offsets, indices = adjacency
+    rows = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+    return np.linalg.norm(points[indices] - points[rows], axis=1)
+
+
+def bounded_dijkstra(adjacency, lengths, sources, radius):
+    """
+    shortest edge path distances from the source vertices, up to the radius.
+
+    :param adjacency: CSR vertex adjacency (offsets, indices)
+                       - tuple (ndarray, ndarray)
+    :param lengths:   length of every adjacency entry, see edge_lengths
+                       - ndarray float64
+    :param sources:   source vertex IDs, all at distance 0
+                       - list [int, int, ...]
+    :param radius:    largest distance to search
+                       - float
+
+    :return result:   reached vertex IDs and their distances, in order of distance
+                       - tuple (ndarray int32, ndarray float64)
+    """
+    offsets, indices = adjacency
+    best = {int(source): 0.0 for source in sources}
+    heap = [(0.0, vertex) for vertex in best]
+    heapq.heapify(heap)
+    done = {}
+    while heap:
+        distance, vertex = heapq.heappop(heap)
+        if vertex in done:
+            continue
+        done[vertex] = distance
+        start, end = offsets[vertex], offsets[vertex + 1]
+        for neighbour, length in zip(indices[start:end].tolist(), lengths[start:end].tolist()):
+            total = distance + length
+            if total <= radius and total < best.get(neighbour, np.inf):
+                best[neighbour] = total
+                heapq.heappush(heap, (total, neighbour))
+    return (np.fromiter(done.keys(), dtype=np.int32, count=len(done)),
+            np.fromiter(done.values(), dtype=np.float64, count=len(done)))
+# ----------------------------------------------------------------------------------------------- #
+
+
+# HEAT METHOD ----------------------------------------------------------------------------------- #
+def _cotangents(points, triangles):
+    """ :return cotangents: cotangent of the angle at every triangle corner - ndarray (F, 3) """
+    cotangents = np.empty(triangles.shape)
+    for corner in range(3):
+        a = points[triangles[:, (corner + 1) % 3]] - points[triangles[:, corner]]
+        b = points[triangles[:, (corner + 2) % 3]] - points[triangles[:, corner]]
+        cross = np.linalg.norm(np.cross(a, b), axis=1)
+        cotangents[:, corner] = np.einsum('ij,ij->i', a, b) / np.maximum(cross, 1e-12)
+    return cotangents
+
+
+def conjugate_gradient(multiply, rhs, diagonal, guess=None, tolerance=CG_TOLERANCE,
+                       iterations=CG_ITERATIONS):
+    """
+    solve a symmetric positive (semi) definite system with jacobi preconditioned conjugate
+    gradients.
+
+    :param multiply:  matrix vector product
+                       - function (ndarray) -> ndarray
+    :param rhs:       right hand side
+                       - ndarray float64 (n,)
+    :param diagonal:  matrix diagonal for the preconditioner
+                       - ndarray float64 (n,)
+    :param guess:     initial solution, zeros if None
+                       - ndarray float64 (n,)
+
+    :return solution: approximate solution
+                       - ndarray float64 (n,)
+    """
+    inverse = 1.0 / np.where(np.abs(diagonal) > 1e-12, diagonal, 1.0)
+    solution = np.zeros_like(rhs) if guess is None else np.array(guess, dtype=np.float64)
+    residual = rhs - multiply(solution) if guess is not None else rhs.copy()
+    direction = residual * inverse
+    product = residual.dot(direction)
+    limit = tolerance * np.linalg.norm(rhs)
+    for _ in range(iterations):
+        if np.linalg.norm(residual) <= limit:
+            break
+        step = multiply(direction)
+        alpha = product / direction.dot(step)
+        solution += alpha * direction
+        residual -= alpha * step
+        preconditioned = residual * inverse
+        nextProduct = residual.dot(preconditioned)
+        direction = preconditioned + (nextProduct / product) * direction
+        product = nextProduct
+    return solution
+
+
+class HeatSolver(object):
+    """ cotangent Laplacian, lumped masses and gradient operators of a triangulated mesh """
+    def __init__(self, points, triangles, timeStep=1.0):
+        """
+        :param points:    vertex positions
+                           - ndarray float64 (vertexCount, 3)
+        :param triangles: vertex IDs of all triangles
+                           - ndarray int (triangleCount, 3)
+        :param timeStep:  heat flow time in squared mean edge lengths
+                           - float
+        """
+        self.points    = points
+        self.triangles = triangles
+        self.cotangent = _cotangents(points, triangles)
+
+        edges = np.concatenate([points[triangles[:, (corner + 2) % 3]]
+                                - points[triangles[:, (corner + 1) % 3]] for corner in range(3)])
+        self.time = timeStep * np.mean(np.linalg.norm(edges, axis=1)) ** 2
+        # heat decays exponentially, far vertices need heat above the precision of the solver
+        extent = np.linalg.norm(points.max(axis=0) - points.min(axis=0))
+        self.time = max(self.time, (extent / HEAT_DECAY) ** 2)
+
+        normals = np.cross(points[triangles[:, 1]] - points[triangles[:, 0]],
+                           points[triangles[:, 2]] - points[triangles[:, 0]])
+        doubleAreas = np.linalg.norm(normals, axis=1)
+        self.normals = normals / np.maximum(doubleAreas, 1e-12)[:, None]
+        self.doubleAreas = doubleAreas
+        self.mass = np.bincount(triangles.reshape(-1), np.repeat(doubleAreas / 6.0, 3),
+                                minlength=len(points))
+
+        # the edge opposite of corner c connects the corners c + 1 and c + 2
+        first = triangles[:, [1, 2, 0]].T.reshape(-1)
+        second = triangles[:, [2, 0, 1]].T.reshape(-1)
+        weights = 0.5 * self.cotangent.T.reshape(-1)
+        # merge the two triangles of every edge into one sorted matrix entry
+        rows = np.concatenate([first, second]).astype(np.int64)
+        cols = np.concatenate([second, first]).astype(np.int64)
+        keys, inverse = np.unique(rows * len(points) + cols, return_inverse=True)
+        self.rows = keys // len(points)
+        self.cols = keys % len(points)
+        self.weights = np.bincount(inverse, np.concatenate([weights, weights]))
+        self.degree = np.bincount(self.rows, self.weights, minlength=len(points))
+
+    def laplacian(self, values):
+        """ positive semi definite cotangent Laplacian times values """
+        return self.degree * values - np.bincount(self.rows, self.weights * values[self.cols],
+                                                  minlength=len(values))
+
+    def distances(self, sources):
+        """
+        :param sources:    source vertex IDs
+                            - list [int, int, ...]
+
+        :return distances: approximate geodesic distance of every vertex to the sources
+                            - ndarray float64 (vertexCount,)
+        """
+        sources = np.asarray(sources, dtype=np.int64)
+        impulse = np.zeros(len(self.points))
+        impulse[sources] = 1.0
+        heat = conjugate_gradient(lambda values: self.mass * values
+                                  + self.time * self.laplacian(values),
+                                  impulse, self.mass + self.time * self.degree)
+
+        # normalized negative heat gradient per triangle
+        corners = heat[self.triangles]
+        gradient = np.zeros((len(self.triangles), 3))
+        for corner in range(3):
+            opposite = (self.points[self.triangles[:, (corner + 2) % 3]]
+                        - self.points[self.triangles[:, (corner + 1) % 3]])
+            gradient += corners[:, corner, None] * np.cross(self.normals, opposite)
+        gradient /= np.maximum(self.doubleAreas, 1e-12)[:, None]
+        field = -gradient / np.maximum(np.linalg.norm(gradient, axis=1), 1e-12)[:, None]
+
+        # integrated divergence per vertex
+        divergence = np.zeros(len(self.points))
+        for corner in range(3):
+            vertex = self.triangles[:, corner]
+            nextCorner, lastCorner = (corner + 1) % 3, (corner + 2) % 3
+            toNext = self.points[self.triangles[:, nextCorner]] - self.points[vertex]
+            toLast = self.points[self.triangles[:, lastCorner]] - self.points[vertex]
+            value = 0.5 * (self.cotangent[:, lastCorner] * np.einsum('ij,ij->i', toNext, field)
+                           + self.cotangent[:, nextCorner] * np.einsum('ij,ij->i', toLast, field))
+            divergence += np.bincount(vertex, value, minlength=len(self.points))
+
+        # Laplacian is singular, regularize with a tiny mass term
+        regularization = 1e-8 * self.mass.mean()
+        potential = conjugate_gradient(
+            lambda values: self.laplacian(values) + regularization * values,
+            -divergence, self.degree + regularization,
+        )
+        return np.maximum(potential - potential[sources].min(), 0.0)
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+def _remember(cache, size, key, value):
+    """ store a value in a least recently used cache of the given size """
+    cache[key] = value
+    cache.move_to_end(key)
+    while len(cache) > size:
+        cache.popitem(last=False)
+
+
+class Geodesic(object):
+    """ memoized geodesic distance queries of one mesh """
+    def __init__(self, meshData, cacheSize=CACHE_SIZE, fieldCacheSize=FIELD_CACHE_SIZE):
+        """
+        :param meshData:       mesh to measure on
+                                - MeshData
+        :param cacheSize:      number of memoized bounded source regions
+                                - int
+        :param fieldCacheSize: number of memoized heat fields
+                                - int
+        """
+        self.meshData  = meshData
+        self.adjacency = meshData.adjacency()
+        self.lengths   = edge_lengths(meshData.points, self.adjacency)
+        self.cacheSize = cacheSize
+        self.fieldCacheSize = fieldCacheSize
+        self._cache    = OrderedDict()  # sources -> (radius, vertices, distances)
+        self._fields   = OrderedDict()  # sources -> distances
+        self._heat     = None
+
+    def distances(self, sources, radius):
+        """
+        :param sources:  source vertex ID or IDs of a source region
+                          - int
+                          - list [int, int, ...]
+        :param radius:   largest distance along the edges
+                          - float
+
+        :return result:  vertex IDs within the radius and their distances, in order of distance
+                          - tuple (ndarray int32, ndarray float64)
+        """
+        key = tuple(sorted(set(np.atleast_1d(sources).tolist())))
+        cached = self._cache.get(key)
+        if cached is not None and cached[0] >= radius:
+            self._cache.move_to_end(key)
+            _, vertices, distances = cached
+            count = np.searchsorted(distances, radius, side='right')
+            return vertices[:count], distances[:count]
+
+        vertices, distances = bounded_dijkstra(self.adjacency, self.lengths, key, radius)
+        _remember(self._cache, self.cacheSize, key, (radius, vertices, distances))
+        return vertices, distances
+
+    def field(self, sources):
+        """
+        :param sources:    source vertex ID or IDs of a source region
+                            - int
+                            - list [int, int, ...]
+
+        :return distances: heat method distance of every vertex, smooth across the surface
+                            - ndarray float64 (vertexCount,)
+        """
+        key = tuple(sorted(set(np.atleast_1d(sources).tolist())))
+        distances = self._fields.get(key)
+        if distances is None:
+            if self._heat is None:
+                self._heat = HeatSolver(self.meshData.points, self.meshData.triangles()[0])
+            distances = self._heat.distances(list(key))
+        _remember(self._fields, self.fieldCacheSize, key, distances)
+        return distances
+
+
+def get_geodesic(meshData):
+    """
+    :param meshData:  mesh to measure on
+                       - MeshData
+
+    :return geodesic: shared memoized queries of the mesh, new when its topology or points
+                      differ from the cached mesh, only the last MESH_CACHE_SIZE meshes are kept
+                       - Geodesic
+    """
+    topology = meshData.topology_hash()
+    digest = meshData.points_hash()
+    cached = _GEODESICS.get(topology)
+    if cached is None or cached[0] != digest:
+        cached = (digest, Geodesic(meshData))
+    _remember(_GEODESICS, MESH_CACHE_SIZE, topology, cached)
+    return cached[1]
+
+
+def clear_cache():
+    _GEODESICS.clear()
+# ----------------------------------------------------------------------------------------------- #
+
+
+# BENCHMARK ------------------------------------------------------------------------------------- #
+def benchmark(rings=500, segments=1000, radius=0.1, dabs=200):
+    """
+    :return timings: seconds of the bounded queries per dab, of memoized repeats and of a
+                     whole mesh heat method query on a sphere
+                      - dict {str: float, ...}
+    """
+    from .synthetic import sphere
+
+    meshData = sphere(rings, segments)
+    clear_cache()
+    start = time.perf_counter()
+    geodesic = get_geodesic(meshData)
+    timings = {'vertices': meshData.vertexCount, 'setup': time.perf_counter() - start}
+
+    sources = np.random.default_rng(0).integers(0, meshData.vertexCount, dabs)
+    start = time.perf_counter()
+    reached = sum(len(geodesic.distances(source, radius)[0]) for source in sources)
+    timings['dab'] = (time.perf_counter() - start) / dabs
+    timings['dab_vertices'] = reached / float(dabs)
+
+    start = time.perf_counter()
+    for source in sources:
+        geodesic.distances(source, radius * 0.5)
+    timings['dab_memoized'] = (time.perf_counter() - start) / dabs
+
+    small = get_geodesic(sphere(100, 200))
+    start = time.perf_counter()
+    small.field(0)
+    timings['heat_20k'] = time.perf_counter() - start
+    return timings
+
+
+if __name__ == '__main__':
+    for name, value in benchmark().items():
+        print('{:<14}{}'.format(name, value))
+# ----------------------------------------------------------------------------------------------- #
@@ -0,0 +1,54 @@
+"""
+    Mesh level operations
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import numpy as np
+from maya.api import OpenMaya
+
+from .topology import MeshData
+# ----------------------------------------------------------------------------------------------- #
+
+
+# MESH DATA ------------------------------------------------------------------------------------- #
+def get_mesh_fn(mesh):
+    """
+    :param mesh:   name of a mesh shape or its transform
+                    - str
+
+    :return meshFn: function set of the mesh
+                    - MFnMesh
+    """
+    selectionList = OpenMaya.MSelectionList()
+    selectionList.add(mesh)
+    return OpenMaya.MFnMesh(selectionList.getDagPath(0))
+
+
+def get_mesh_data(mesh, space=OpenMaya.MSpace.kObject):
+    """
+    read points and face topology of a mesh in bulk.
+
+    :param mesh:      name of a mesh shape or its transform
+                       - str
+    :param space:     coordinate space of the points
+                       - MSpace constant
+
+    :return meshData: bulk arrays of the mesh
+                       - MeshData
+    """
+    meshFn = get_mesh_fn(mesh)
+    faceCounts, faceConnects = meshFn.getVertices()
+    points = np.array(meshFn.getPoints(space), dtype=np.float64)[:, :3]
+
+    uvs = uvCounts = uvIds = None
+    if meshFn.numUVs():
+        us, vs = meshFn.getUVs()
+        uvs = np.stack([np.array(us), np.array(vs)], axis=1)
+        uvCounts, uvIds = meshFn.getAssignedUVs()
+
+    return MeshData(
+        points, faceCounts, faceConnects, name=meshFn.fullPathName(),
+        uvs=uvs, uvCounts=uvCounts, uvIds=uvIds
+    )
+# ----------------------------------------------------------------------------------------------- #
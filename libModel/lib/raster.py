@@ -0,0 +1,83 @@
+"""
+    Vectorized triangle rasterization on bulk arrays.
+    Pixel centers are tested against all triangles at once, in chunks of bounded memory.
+    Centers exactly on an edge shared by two triangles are covered by only one of them.
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import numpy as np
+# ----------------------------------------------------------------------------------------------- #
+
+
+CHUNK_SIZE = 1 << 22  # candidate pixels per chunk
+
+
+# ----------------------------------------------------------------------------------------------- #
+def rasterize(triangles, width, height, chunkSize=CHUNK_SIZE):
+    """
+    find all pixel centers covered by the given triangles.
+
+    :param triangles: triangle corners in pixel coordinates, pixel (x, y) spans [x, x + 1)
+                       - ndarray float (triangleCount, 3, 2)
+    :param width:     image width in pixels
+                       - int
+    :param height:    image height in pixels
+                       - int
+    :param chunkSize: maximum number of candidate pixels tested at once
+                       - int
+
+    :return chunks:   generator of covered pixels, one tuple per chunk
+                       - triangle index (ndarray int64 (n,))
+                       - pixel x and y (ndarray int64 (n,), ndarray int64 (n,))
+                       - barycentric weights (ndarray float64 (n, 3))
+    """
+    triangles = np.asarray(triangles, dtype=np.float64)
+    lower = np.floor(triangles.min(axis=1) - 0.5) + 1
+    upper = np.floor(triangles.max(axis=1) - 0.5)
+    x0 = np.clip(lower[:, 0], 0, width).astype(np.int64)
+    y0 = np.clip(lower[:, 1], 0, height).astype(np.int64)
+    spanX = np.maximum(np.clip(upper[:, 0], -1, width - 1).astype(np.int64) - x0 + 1, 0)
+    spanY = np.maximum(np.clip(upper[:, 1], -1, height - 1).astype(np.int64) - y0 + 1, 0)
+    counts = spanX * spanY
+
+    corner = triangles[:, 0]
+    edgeA = triangles[:, 1] - corner
+    edgeB = triangles[:, 2] - corner
+    determinant = edgeA[:, 0] * edgeB[:, 1] - edgeA[:, 1] * edgeB[:, 0]
+    valid = np.abs(determinant) > 1e-12
+    counts[~valid] = 0
+
+    # edges opposite of each corner, in counter clockwise order
+    orientation = np.where(determinant < 0, -1.0, 1.0)
+    starts = triangles[:, [1, 2, 0]]
+    edges = (triangles[:, [2, 0, 1]] - starts) * orientation[:, None, None]
+    # fill rule, pixel centers exactly on an edge belong to one side of every shared edge
+    owned = (edges[..., 1] > 0) | ((edges[..., 1] == 0) & (edges[..., 0] < 0))
+
+    ends = np.cumsum(counts)
+    start = 0
+    while start < len(triangles):
+        limit = (ends[start - 1] if start else 0) + chunkSize
+        stop = max(int(np.searchsorted(ends, limit, side='right')), start + 1)
+        chunk = np.arange(start, stop)
+        start = stop
+
+        chunkCounts = counts[chunk]
+        if not chunkCounts.sum():
+            continue
+        index = np.repeat(chunk, chunkCounts)
+        local = np.arange(chunkCounts.sum()) - np.repeat(
+            np.cumsum(chunkCounts) - chunkCounts, chunkCounts
+        )
+        pixelX = x0[index] + local % spanX[index]
+        pixelY = y0[index] + local // spanX[index]
+
+        centers = np.stack([pixelX + 0.5, pixelY + 0.5], axis=1)
+        # edge functions, twice the signed area of the sub triangle opposite of each corner
+        offsets = centers[:, None, :] - starts[index]
+        areas = edges[index, :, 0] * offsets[..., 1] - edges[index, :, 1] * offsets[..., 0]
+        inside = np.all((areas > 0) | ((areas == 0) & owned[index]), axis=1)
+        weights = areas[inside] / np.abs(determinant[index[inside], None])
+        yield index[inside], pixelX[inside], pixelY[inside], weights
+# ----------------------------------------------------------------------------------------------- #
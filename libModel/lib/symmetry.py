@@ -0,0 +1,343 @@
+"""
+    Symmetry maps for mirroring per vertex data.
+    Every vertex is matched to the vertex closest to its mirrored position with a spatial hash,
+    vertices without a match inside the tolerance are resolved by walking the topology from
+    matched neighbours. The int32 correspondence is cached per topology and points hash,
+    mirroring data is a single gather with it.
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import re
+import time
+
+import numpy as np
+# ----------------------------------------------------------------------------------------------- #
+
+
+AXES      = {'x': 0, 'y': 1, 'z': 2}
+TOLERANCE = 1e-3
+# neighbour cells of the spatial hash, the own cell first
+OFFSETS   = sorted([(x, y, z) for x in (-1, 0, 1) for y in (-1, 0, 1) for z in (-1, 0, 1)],
+                   key=lambda offset: sum(map(abs, offset)))
+
+# side tokens of influence names, only matched between delimiters, e.g. L_arm, arm_L, ns:L_arm
+SIDE_TOKENS = [('L', 'R'), ('l', 'r'), ('Left', 'Right'), ('left', 'right'), ('lf', 'rt')]
+DELIMITERS  = '_|:'
+
+_CACHE = {}  # SymmetryMap per (topology hash, points hash, axis, offset, tolerance)
+
+
+# MATCHING -------------------------------------------------------------------------------------- #
+def match_points(points, targets, tolerance):
+    """
+    find the closest point within the tolerance for every target with a spatial hash.
+
+    :param points:    searched positions
+                       - ndarray float64 (pointCount, 3)
+    :param targets:   query positions
+                       - ndarray float64 (targetCount, 3)
+    :param tolerance: largest matching distance, also the cell size of the hash
+                       - float
+
+    :return matches:  index of the closest point for every target, -1 without a match
+                       - ndarray int32 (targetCount,)
+    """
+    cells = np.floor(points / tolerance).astype(np.int64)
+    queries = np.floor(targets / tolerance).astype(np.int64)
+    low = np.minimum(cells.min(axis=0), queries.min(axis=0)) - 1
+    size = np.maximum(cells.max(axis=0), queries.max(axis=0)) - low + 2
+
+    def encode(cell):
+        cell = cell - low
+        return (cell[:, 0] * size[1] + cell[:, 1]) * size[2] + cell[:, 2]
+
+    order = np.argsort(encode(cells), kind='stable')
+    keys = encode(cells)[order]
+    # distance of every query to the lower and upper cell border per axis
+    lower = targets - queries * tolerance
+    borders = (lower, tolerance - lower)
+
+    matches = np.full(len(targets), -1, dtype=np.int32)
+    distances = np.full(len(targets), np.inf)
+    for offset in OFFSETS:
+        # skip cells further away than the closest point found so far
+        gap = np.zeros(len(targets))
+        for column, step in enumerate(offset):
+            if step:
+                gap += borders[step > 0][:, column] ** 2
+        active = np.flatnonzero(gap < distances ** 2)
+        key = encode(queries[active] + offset)
+        starts = np.searchsorted(keys, key, 'left')
+        counts = np.searchsorted(keys, key, 'right') - starts
+        if not counts.any():
+            continue
+        # expand every query to the points of its cell
+        query = np.repeat(active, counts)
+        first = np.concatenate([[0], np.cumsum(counts)[:-1]])
+        candidate = order[np.repeat(starts - first, counts) + np.arange(counts.sum())]
+        distance = np.linalg.norm(points[candidate] - targets[query], axis=1)
+
+        better = distance < distances[query]
+        query, candidate, distance = query[better], candidate[better], distance[better]
+        if not len(query):
+            continue
+        # closest candidate per query: sort by distance, keep the first of every query
+        byDistance = np.lexsort((distance, query))
+        query, candidate, distance = query[byDistance], candidate[byDistance], distance[byDistance]
+        first = np.concatenate([[True], query[1:] != query[:-1]])
+        distances[query[first]] = distance[first]
+        matches[query[first]] = candidate[first]
+
+    matches[distances > tolerance] = -1
+    return matches
+
+
+def walk_topology(mirror, adjacency, points, mirrored):
+    """
+    resolve unmatched vertices from the mirrors of their neighbours, in place.
+    the mirror of an unmatched vertex is the free neighbour of its neighbours' mirrors that is
+    shared by most of them, ties are decided by the distance to the mirrored position.
+
+    :param mirror:    mirror vertex of every vertex, -1 for unmatched vertices
+                       - ndarray int32 (vertexCount,)
+    :param adjacency: CSR vertex adjacency without the vertices themselves
+                       - tuple (offsets, indices)
+    :param points:    vertex positions
+                       - ndarray float64 (vertexCount, 3)
+    :param mirrored:  mirrored vertex positions
+                       - ndarray float64 (vertexCount, 3)
+
+    :return mirror:   the updated mirror array
+                       - ndarray int32 (vertexCount,)
+    """
+    offsets, indices = adjacency
+    taken = np.zeros(len(mirror), dtype=bool)
+    taken[mirror[mirror >= 0]] = True
+
+    pending = np.flatnonzero(mirror < 0)
+    while len(pending):
+        # resolve the vertices with the most matched neighbours first
+        known = np.array([np.count_nonzero(mirror[indices[offsets[v]:offsets[v + 1]]] >= 0)
+                          for v in pending])
+        pending = pending[np.argsort(-known, kind='stable')]
+        remaining = []
+        for vertex in pending.tolist():
+            if mirror[vertex] >= 0:
+                continue
+            neighbours = indices[offsets[vertex]:offsets[vertex + 1]]
+            known = mirror[neighbours]
+            known = known[known >= 0]
+            if not len(known):
+                remaining.append(vertex)
+                continue
+            candidates = np.concatenate([indices[offsets[n]:offsets[n + 1]] for n in known])
+            candidates = candidates[~taken[candidates]]
+            if not len(candidates):
+                continue
+            candidates, votes = np.unique(candidates, return_counts=True)
+            candidates = candidates[votes == votes.max()]
+            distance = np.linalg.norm(points[candidates] - mirrored[vertex], axis=1)
+            match = candidates[np.argmin(distance)]
+            mirror[vertex] = match
+            taken[match] = True
+            if mirror[match] < 0:
+                mirror[match] = vertex
+                taken[vertex] = True
+        if len(remaining) == len(pending):
+            break
+        pending = np.array([vertex for vertex in remaining if mirror[vertex] < 0], dtype=np.int64)
+    return mirror
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+class SymmetryMap(object):
+    """ mirror vertex of every vertex across an axis plane """
+    def __init__(self, mirror, side, axis='x', offset=0.0):
+        """
+        :param mirror: mirror vertex of every vertex, -1 for unresolved vertices
+                        - ndarray int32 (vertexCount,)
+        :param side:   -1, 0 or 1 for vertices below, on or above the plane
+                        - ndarray int8 (vertexCount,)
+        :param axis:   axis normal to the mirror plane
+                        - str 'x', 'y' or 'z'
+        :param offset: position of the mirror plane along the axis
+                        - float
+        """
+        self.mirror = mirror
+        self.side   = side
+        self.axis   = axis
+        self.offset = offset
+
+    @property
+    def unresolved(self):
+        """ :return vertices: IDs of vertices without mirror - ndarray int64 """
+        return np.flatnonzero(self.mirror < 0)
+
+    def gather_indices(self, direction='flip'):
+        """
+        :param direction: 'flip' swaps both sides, 'positive' copies the positive side onto
+                          the negative side, 'negative' copies the negative side onto the positive
+                           - str
+
+        :return indices:  source vertex of every vertex, unresolved vertices keep their own data
+                           - ndarray int32 (vertexCount,)
+        """
+        identity = np.arange(len(self.mirror), dtype=np.int32)
+        source = np.where(self.mirror < 0, identity, self.mirror)
+        if direction == 'flip':
+            return source
+        if direction == 'positive':
+            return np.where(self.side < 0, source, identity)
+        if direction == 'negative':
+            return np.where(self.side > 0, source, identity)
+        raise ValueError('unknown mirror direction: {}'.format(direction))
+
+    def mirror_data(self, data, direction='flip', rows=None):
+        """
+        mirror per vertex data with one gather.
+
+        :param data:      per vertex values along the last axis, e.g. influence weights
+                           - ndarray (..., vertexCount)
+        :param direction: see gather_indices
+                           - str
+        :param rows:      source row of every row of data, e.g. influence_remap
+                           - ndarray int (rowCount,)
+
+        :return data:     mirrored copy of the data, rows are remapped on the mirrored
+                          vertices only, the source side keeps its rows
+                           - ndarray (..., vertexCount)
+        """
+        data = np.asarray(data)
+        gather = self.gather_indices(direction)
+        if rows is None:
+            return data[..., gather]
+
+        if direction == 'flip':  # vertices on the plane flip onto themselves
+            targets = self.mirror >= 0
+        else:
+            targets = gather != np.arange(len(gather))
+        result = data.copy()
+        result[..., targets] = data[rows][..., gather[targets]]
+        return result
+
+
+def build_symmetry(meshData, axis='x', offset=0.0, tolerance=TOLERANCE, cache=True):
+    """
+    :param meshData:  mesh in its symmetric pose
+                       - MeshData
+    :param axis:      axis normal to the mirror plane
+                       - str 'x', 'y' or 'z'
+    :param offset:    position of the mirror plane along the axis
+                       - float
+    :param tolerance: largest distance between a mirrored position and its match
+                       - float
+    :param cache:     reuse and store the map of the same topology, points, axis, offset and
+                      tolerance
+                       - bool
+
+    :return symmetry: mirror vertex of every vertex
+                       - SymmetryMap
+    """
+    key = (meshData.topology_hash(), meshData.points_hash(), axis, offset, tolerance)
+    if cache and key in _CACHE:
+        return _CACHE[key]
+
+    column = AXES[axis]
+    points = meshData.points
+    mirrored = points.copy()
+    mirrored[:, column] = 2.0 * offset - mirrored[:, column]
+
+    mirror = match_points(points, mirrored, tolerance)
+    if (mirror < 0).any():
+        mirror = walk_topology(mirror, meshData.adjacency(), points, mirrored)
+
+    distance = points[:, column] - offset
+    side = np.where(np.abs(distance) <= tolerance, 0, np.sign(distance)).astype(np.int8)
+    symmetry = SymmetryMap(mirror, side, axis, offset)
+    if cache:
+        _CACHE[key] = symmetry
+    return symmetry
+
+
+def clear_cache():
+    _CACHE.clear()
+# ----------------------------------------------------------------------------------------------- #
+
+
+# INFLUENCES ------------------------------------------------------------------------------------ #
+def mirror_name(name, tokens=SIDE_TOKENS):
+    """
+    :param name:   influence name
+                    - str
+    :param tokens: pairs of side tokens, matched between delimiters
+                    - list [(str, str), ...]
+
+    :return name:  name with the first side token pair swapped, the name itself without tokens
+                    - str
+    """
+    for left, right in tokens:
+        pattern = r'(?<![^{0}])({1}|{2})(?![^{0}])'.format(
+            re.escape(DELIMITERS), re.escape(left), re.escape(right)
+        )
+        swapped, count = re.subn(
+            pattern, lambda match: right if match.group(1) == left else left, name
+        )
+        if count:
+            return swapped
+    return name
+
+
+def influence_remap(influences, tokens=SIDE_TOKENS):
+    """
+    :param influences: influence names
+                        - list [str, str, ...]
+    :param tokens:     see mirror_name
+                        - list [(str, str), ...]
+
+    :return rows:      index of the mirrored influence of every influence, itself if missing
+                        - ndarray int32 (influenceCount,)
+    """
+    indices = {name: index for index, name in enumerate(influences)}
+    return np.array([indices.get(mirror_name(name, tokens), index)
+                     for index, name in enumerate(influences)], dtype=np.int32)
+# ----------------------------------------------------------------------------------------------- #
+
+
+# BENCHMARK ------------------------------------------------------------------------------------- #
+def benchmark(rings=500, segments=1000, influences=40):
+    """
+    :return timings: seconds to build the symmetry map of a sphere, of the cached lookup and of
+                     mirroring all influence weights, plus the number of unresolved vertices
+                      - dict {str: float, ...}
+    """
+    from .synthetic import sphere
+
+    meshData = sphere(rings, segments)
+    # move a strip of vertices off their symmetric position to exercise the topology walk
+    generator = np.random.default_rng(0)
+    noisy = generator.choice(meshData.vertexCount, meshData.vertexCount // 100, replace=False)
+    meshData.points[noisy] += generator.normal(scale=0.002, size=(len(noisy), 3))
+
+    clear_cache()
+    start = time.perf_counter()
+    symmetry = build_symmetry(meshData, tolerance=1e-4)
+    timings = {'vertices': meshData.vertexCount, 'build': time.perf_counter() - start}
+    start = time.perf_counter()
+    build_symmetry(meshData, tolerance=1e-4)
+    timings['cached'] = time.perf_counter() - start
+
+    names = ['{}_joint{}'.format(side, index) for side in 'LR' for index in range(influences // 2)]
+    weights = generator.random((len(names), meshData.vertexCount))
+    start = time.perf_counter()
+    symmetry.mirror_data(weights, rows=influence_remap(names))
+    timings['mirror'] = time.perf_counter() - start
+    timings['unresolved'] = len(symmetry.unresolved)
+    return timings
+
+
+if __name__ == '__main__':
+    for name, value in benchmark().items():
+        print('{:<12}{}'.format(name, value))
+# ----------------------------------------------------------------------------------------------- #
@@ -0,0 +1,80 @@
+"""
+    Synthetic meshes for benchmarks, built directly as MeshData without Maya.
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import numpy as np
+
+from .topology import MeshData
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+def grid(rows, columns, size=1.0):
+    """
+    planar quad grid in the XZ plane, centered at the origin, with a single uv shell.
+
+    :param rows:     number of faces along Z
+                      - int
+    :param columns:  number of faces along X
+                      - int
+    :param size:     width of the grid along X
+                      - float
+
+    :return meshData: grid with (rows + 1) * (columns + 1) vertices
+                      - MeshData
+    """
+    ids = np.arange((rows + 1) * (columns + 1), dtype=np.int32).reshape(rows + 1, columns + 1)
+    quads = np.stack([ids[:-1, :-1], ids[1:, :-1], ids[1:, 1:], ids[:-1, 1:]], axis=-1)
+    faceConnects = quads.reshape(-1)
+    faceCounts = np.full(rows * columns, 4, dtype=np.int32)
+
+    u, v = np.meshgrid(np.linspace(0.0, 1.0, columns + 1), np.linspace(0.0, 1.0, rows + 1))
+    depth = size * rows / float(columns)
+    points = np.stack([(u - 0.5) * size, np.zeros_like(u), (v - 0.5) * depth], axis=-1)
+    uvs = np.stack([u, v], axis=-1).reshape(-1, 2)
+
+    return MeshData(
+        points.reshape(-1, 3), faceCounts, faceConnects, name='grid',
+        uvs=uvs, uvCounts=faceCounts.copy(), uvIds=faceConnects.copy()
+    )
+
+
+def sphere(rings, segments, radius=1.0):
+    """
+    uv sphere with quads and triangle fans at the poles.
+
+    :param rings:    number of face rings from pole to pole, at least 2
+                      - int
+    :param segments: number of faces around the Y axis, at least 3
+                      - int
+    :param radius:   sphere radius
+                      - float
+
+    :return meshData: sphere with (rings - 1) * segments + 2 vertices
+                      - MeshData
+    """
+    theta = np.linspace(0.0, np.pi, rings + 1)[1:-1]
+    phi = np.linspace(0.0, 2.0 * np.pi, segments, endpoint=False)
+    theta, phi = np.meshgrid(theta, phi, indexing='ij')
+    body = np.stack(
+        [np.sin(theta) * np.cos(phi), np.cos(theta), np.sin(theta) * np.sin(phi)], axis=-1
+    ).reshape(-1, 3)
+    points = np.concatenate([[[0.0, 1.0, 0.0]], body, [[0.0, -1.0, 0.0]]]) * radius
+
+    ids = np.arange(1, 1 + len(body), dtype=np.int32).reshape(rings - 1, segments)
+    following = np.roll(ids, -1, axis=1)
+    bottom = len(points) - 1
+
+    top = np.stack([np.zeros(segments, np.int32), following[0], ids[0]], axis=-1)
+    quads = np.stack([ids[:-1], following[:-1], following[1:], ids[1:]], axis=-1)
+    cap = np.stack([ids[-1], following[-1], np.full(segments, bottom, np.int32)], axis=-1)
+
+    faceConnects = np.concatenate([top.reshape(-1), quads.reshape(-1), cap.reshape(-1)])
+    faceCounts = np.concatenate([
+        np.full(segments, 3), np.full(quads.shape[0] * segments, 4), np.full(segments, 3)
+    ]).astype(np.int32)
+
+    return MeshData(points, faceCounts, faceConnects, name='sphere')
+# ----------------------------------------------------------------------------------------------- #
@@ -0,0 +1,241 @@
+"""
+    Per vertex data in uv space.
+    Bakes vertex values like skin weights into float images, all uv triangles are rasterized at
+    once with barycentric interpolation of their corner values, and samples images back to
+    vertex values with bilinear lookup at the vertex uvs.
+
+        uvRaster = UVRaster(meshData, 4096)
+        write_pfm('L_arm_jnt.pfm', uvRaster.bake(weights))
+        weights = vertex_values(meshData, read_pfm('L_arm_jnt.pfm'))
+
+    Images are float32 arrays (height, width) with row 0 at v = 0, the row order of the Portable
+    Float Map format (.pfm) that is read and written without extra dependencies.
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import time
+
+import numpy as np
+
+from .raster import rasterize
+# ----------------------------------------------------------------------------------------------- #
+
+
+PADDING = 4  # pixels the baked values are extended beyond the uv shell borders
+
+
+# ----------------------------------------------------------------------------------------------- #
+class UVRaster(object):
+    """ pixels covered by the uv triangles of a mesh with their corner vertices and weights """
+    def __init__(self, meshData, width, height=None):
+        """
+        :param meshData: mesh with uvs
+                          - MeshData
+        :param width:    image width in pixels
+                          - int
+        :param height:   image height in pixels, square images if None
+                          - int
+        """
+        self.width  = int(width)
+        self.height = int(height or width)
+
+        vertexTriangles, uvTriangles = meshData.uv_triangles()
+        corners = meshData.uvs[uvTriangles] * (self.width, self.height)
+
+        pixels, vertices, weights = [], [], []
+        for index, pixelX, pixelY, barycentric in rasterize(corners, self.width, self.height):
+            pixels.append(pixelY * self.width + pixelX)
+            vertices.append(vertexTriangles[index])
+            weights.append(barycentric.astype(np.float32))
+        self.pixels   = np.concatenate(pixels) if pixels else np.zeros(0, np.int64)
+        self.vertices = np.concatenate(vertices) if vertices else np.zeros((0, 3), np.int32)
+        self.weights  = np.concatenate(weights) if weights else np.zeros((0, 3), np.float32)
+
+    def covered(self):
+        """ :return mask: True for pixels inside a uv triangle - ndarray bool (height, width) """
+        mask = np.zeros(self.width * self.height, dtype=bool)
+        mask[self.pixels] = True
+        return mask.reshape(self.height, self.width)
+
+    def bake(self, values, padding=PADDING, background=0.0):
+        """
+        :param values:     value of every vertex
+                            - ndarray float (vertexCount,)
+        :param padding:    pixels to extend the values beyond the shell borders, so bilinear
+                           lookups at the borders do not blend in the background
+                            - int
+        :param background: value of pixels outside of the uv shells
+                            - float
+
+        :return image:     baked values
+                            - ndarray float32 (height, width)
+        """
+        values = np.asarray(values, dtype=np.float32)
+        image = np.full(self.width * self.height, background, dtype=np.float32)
+        image[self.pixels] = np.einsum('ij,ij->i', values[self.vertices], self.weights)
+        image = image.reshape(self.height, self.width)
+        if padding:
+            image = dilate(image, self.covered(), padding)
+        return image
+
+
+def dilate(image, covered, iterations=PADDING):
+    """
+    extend covered pixels into the uncovered pixels next to them, every iteration fills the
+    uncovered pixels with the average of their covered horizontal and vertical neighbours.
+
+    :param image:      image values
+                        - ndarray float (height, width)
+    :param covered:    pixels with valid values
+                        - ndarray bool (height, width)
+    :param iterations: width of the extended border in pixels
+                        - int
+
+    :return image:     copy of the image with extended values
+                        - ndarray float (height, width)
+    """
+    image = image.copy()
+    covered = covered.copy()
+    for _ in range(iterations):
+        values = np.pad(np.where(covered, image, 0.0), 1)
+        counts = np.pad(covered, 1).astype(np.float32)
+        total = values[:-2, 1:-1] + values[2:, 1:-1] + values[1:-1, :-2] + values[1:-1, 2:]
+        count = counts[:-2, 1:-1] + counts[2:, 1:-1] + counts[1:-1, :-2] + counts[1:-1, 2:]
+        border = ~covered & (count > 0)
+        if not border.any():
+            break
+        image[border] = total[border] / count[border]
+        covered |= border
+    return image
+
+
+def sample(image, uvs):
+    """
+    bilinear lookup of image values, lookups outside of the image are clamped to the edge.
+
+    :param image:  image values, row 0 at v = 0
+                    - ndarray float (height, width)
+    :param uvs:    uv coordinates to sample
+                    - ndarray float (n, 2)
+
+    :return values: sampled values
+                    - ndarray float64 (n,)
+    """
+    height, width = image.shape[:2]
+    x = np.clip(uvs[:, 0] * width - 0.5, 0.0, width - 1.0)
+    y = np.clip(uvs[:, 1] * height - 0.5, 0.0, height - 1.0)
+    x0 = np.minimum(x.astype(np.int64), width - 2) if width > 1 else np.zeros(len(x), np.int64)
+    y0 = np.minimum(y.astype(np.int64), height - 2) if height > 1 else np.zeros(len(y), np.int64)
+    x1 = np.minimum(x0 + 1, width - 1)
+    y1 = np.minimum(y0 + 1, height - 1)
+    fx, fy = x - x0, y - y0
+
+    image = np.asarray(image, dtype=np.float64)
+    top = image[y0, x0] * (1 - fx) + image[y0, x1] * fx
+    bottom = image[y1, x0] * (1 - fx) + image[y1, x1] * fx
+    return top * (1 - fy) + bottom * fy
+
+
+def vertex_values(meshData, image, default=0.0):
+    """
+    :param meshData: mesh with uvs
+                      - MeshData
+    :param image:    baked values, see UVRaster.bake
+                      - ndarray float (height, width)
+    :param default:  value of vertices without uvs
+                      - float
+
+    :return values:  image value of every vertex, the average over all uvs of seam vertices
+                      - ndarray float64 (vertexCount,)
+    """
+    vertices, uvIds = meshData.uv_vertices()
+    samples = sample(image, meshData.uvs[uvIds])
+    counts = np.bincount(vertices, minlength=meshData.vertexCount)
+    totals = np.bincount(vertices, samples, minlength=meshData.vertexCount)
+    values = np.full(meshData.vertexCount, default, dtype=np.float64)
+    np.divide(totals, counts, out=values, where=counts > 0)
+    return values
+# ----------------------------------------------------------------------------------------------- #
+
+
+# FILES ----------------------------------------------------------------------------------------- #
+def write_pfm(path, image):
+    """
+    write a Portable Float Map, little endian with row 0 at the bottom.
+
+    :param path:  file path
+                   - str
+    :param image: greyscale or rgb values, row 0 at v = 0
+                   - ndarray float (height, width)
+                   - ndarray float (height, width, 3)
+    """
+    image = np.asarray(image, dtype='<f4')
+    kind = b'PF' if image.ndim == 3 else b'Pf'
+    with open(path, 'wb') as pfmFile:
+        pfmFile.write(kind + b'\n%d %d\n-1.0\n' % (image.shape[1], image.shape[0]))
+        pfmFile.write(np.ascontiguousarray(image).tobytes())
+
+
+def read_pfm(path):
+    """
+    :param path:   Portable Float Map file
+                    - str
+
+    :return image: image values, row 0 at the bottom
+                    - ndarray float32 (height, width) or (height, width, 3)
+    """
+    with open(path, 'rb') as pfmFile:
+        kind = pfmFile.readline().strip()
+        if kind not in (b'PF', b'Pf'):
+            raise ValueError('"{}" is not a Portable Float Map'.format(path))
+        width, height = [int(size) for size in pfmFile.readline().split()]
+        scale = float(pfmFile.readline())
+        data = np.frombuffer(pfmFile.read(), dtype='<f4' if scale < 0 else '>f4')
+
+    shape = (height, width, 3) if kind == b'PF' else (height, width)
+    return data.reshape(shape).astype(np.float32)
+# ----------------------------------------------------------------------------------------------- #
+
+
+# BENCHMARK ------------------------------------------------------------------------------------- #
+def benchmark(rows=447, columns=447, resolution=4096):
+    """
+    :return timings: seconds to rasterize the uvs of a 200k vertex grid, to bake one map, to
+                     write and read it and to sample it back to the vertices, plus the largest
+                     round trip error
+                      - dict {str: float, ...}
+    """
+    import os
+    import tempfile
+
+    from .synthetic import grid
+
+    meshData = grid(rows, columns)
+    values = 0.5 + 0.5 * np.sin(meshData.points[:, 0] * 6.0) * np.cos(meshData.points[:, 2] * 4.0)
+
+    start = time.perf_counter()
+    uvRaster = UVRaster(meshData, resolution)
+    timings = {'vertices': meshData.vertexCount, 'rasterize': time.perf_counter() - start}
+    start = time.perf_counter()
+    image = uvRaster.bake(values)
+    timings['bake'] = time.perf_counter() - start
+
+    path = os.path.join(tempfile.mkdtemp(), 'benchmark.pfm')
+    start = time.perf_counter()
+    write_pfm(path, image)
+    image = read_pfm(path)
+    timings['file'] = time.perf_counter() - start
+    os.remove(path)
+
+    start = time.perf_counter()
+    result = vertex_values(meshData, image)
+    timings['sample'] = time.perf_counter() - start
+    timings['error'] = float(np.abs(result - values).max())
+    return timings
+
+
+if __name__ == '__main__':
+    for name, value in benchmark().items():
+        print('{:<10}{}'.format(name, value))
+# ----------------------------------------------------------------------------------------------- #
@@ -0,0 +1,252 @@
+"""
+    Mesh topology operations on bulk arrays.
+    Independent of Maya, mesh data is read in bulk by libModel.lib.mesh.
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import hashlib
+
+import numpy as np
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ADJACENCY ------------------------------------------------------------------------------------- #
+def face_edges(faceCounts, faceConnects):
+    """
+    find all polygon edges as pairs of vertex IDs, each face contributes one edge per side.
+
+    :param faceCounts:   number of vertices of each face
+                          - ndarray int32 (faceCount,)
+    :param faceConnects: vertex IDs of all faces, in face order
+                          - ndarray int32 (sum(faceCounts),)
+
+    :return edges:       vertex ID pairs, shared edges appear once per adjacent face
+                          - ndarray int32 (sum(faceCounts), 2)
+    """
+    faceCounts = np.asarray(faceCounts, dtype=np.int32)
+    faceConnects = np.asarray(faceConnects, dtype=np.int32)
+
+    faceStarts = np.repeat(np.cumsum(faceCounts) - faceCounts, faceCounts)
+    faceSizes = np.repeat(faceCounts, faceCounts)
+    local = np.arange(len(faceConnects), dtype=np.int32) - faceStarts
+    following = faceStarts + (local + 1) % faceSizes
+
+    return np.stack([faceConnects, faceConnects[following]], axis=1)
+
+
+def vertex_adjacency(faceCounts, faceConnects, vertexCount, includeSelf=False):
+    """
+    build the edge adjacency of all vertices in compressed sparse row layout.
+    the neighbours of vertex i are indices[offsets[i]:offsets[i + 1]].
+
+    :param faceCounts:   number of vertices of each face
+                          - ndarray int32 (faceCount,)
+    :param faceConnects: vertex IDs of all faces, in face order
+                          - ndarray int32 (sum(faceCounts),)
+    :param vertexCount:  number of vertices of the mesh
+                          - int
+    :param includeSelf:  add every vertex to its own neighbours,
+                         matches the Maya edge -> vertex component conversion
+                          - bool
+
+    :return offsets:     row offsets
+                          - ndarray int64 (vertexCount + 1,)
+    :return indices:     sorted neighbour vertex IDs of each row
+                          - ndarray int32 (offsets[-1],)
+    """
+    edges = face_edges(faceCounts, faceConnects).astype(np.int64)
+    rows = np.concatenate([edges[:, 0], edges[:, 1]])
+    cols = np.concatenate([edges[:, 1], edges[:, 0]])
+
+    if includeSelf:
+        vertices = np.arange(vertexCount, dtype=np.int64)
+        rows = np.concatenate([rows, vertices])
+        cols = np.concatenate([cols, vertices])
+
+    keys = np.unique(rows * vertexCount + cols)
+    rows = keys // vertexCount
+    indices = (keys % vertexCount).astype(np.int32)
+
+    offsets = np.zeros(vertexCount + 1, dtype=np.int64)
+    np.cumsum(np.bincount(rows, minlength=vertexCount), out=offsets[1:])
+    return offsets, indices
+
+
+def triangulate(faceCounts):
+    """
+    fan triangulation of all faces.
+
+    :param faceCounts: number of vertices of each face
+                        - ndarray int32 (faceCount,)
+
+    :return triangles: face vertex positions (indices into faceConnects) of every triangle
+                        - ndarray int64 (triangleCount, 3)
+    :return faces:     face ID of every triangle
+                        - ndarray int64 (triangleCount,)
+    """
+    faceCounts = np.asarray(faceCounts, dtype=np.int64)
+    triangleCounts = np.maximum(faceCounts - 2, 0)
+    faceStarts = np.cumsum(faceCounts) - faceCounts
+
+    faces = np.repeat(np.arange(len(faceCounts)), triangleCounts)
+    local = np.arange(triangleCounts.sum()) - np.repeat(
+        np.cumsum(triangleCounts) - triangleCounts, triangleCounts
+    )
+    first = faceStarts[faces]
+    triangles = np.stack([first, first + local + 1, first + local + 2], axis=1)
+    return triangles, faces
+
+
+def connected_components(edges, count):
+    """
+    label the connected components of a graph, by hooking and pointer jumping.
+
+    :param edges:  element ID pairs
+                    - ndarray int (edgeCount, 2)
+    :param count:  number of elements
+                    - int
+
+    :return labels: component root of every element, the smallest element ID of the component
+                    - ndarray int64 (count,)
+    """
+    labels = np.arange(count, dtype=np.int64)
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    if not len(edges):
+        return labels
+    first, second = edges[:, 0], edges[:, 1]
+
+    while True:
+        labelA, labelB = labels[first], labels[second]
+        pending = labelA != labelB
+        if not pending.any():
+            return labels
+        low = np.minimum(labelA[pending], labelB[pending])
+        high = np.maximum(labelA[pending], labelB[pending])
+        np.minimum.at(labels, high, low)
+
+        while True:
+            jumped = labels[labels]
+            if np.array_equal(jumped, labels):
+                break
+            labels = jumped
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+class MeshData(object):
+    """
+    Bulk arrays of a polygon mesh.
+    Derived data like the vertex adjacency is computed on first use and cached.
+    """
+    def __init__(self, points, faceCounts, faceConnects, name=None, uvs=None, uvCounts=None,
+                 uvIds=None):
+        """
+        :param points:       vertex positions
+                              - ndarray float64 (vertexCount, 3)
+        :param faceCounts:   number of vertices of each face
+                              - ndarray int32 (faceCount,)
+        :param faceConnects: vertex IDs of all faces, in face order
+                              - ndarray int32 (sum(faceCounts),)
+        :param name:         name of the mesh the data was read from
+                              - str
+        :param uvs:          uv coordinates of the default uv set
+                              - ndarray float64 (uvCount, 2)
+        :param uvCounts:     number of uvs of each face, 0 for unmapped faces
+                              - ndarray int32 (faceCount,)
+        :param uvIds:        uv IDs of all mapped faces, in face order
+                              - ndarray int32 (sum(uvCounts),)
+        """
+        self.name         = name
+        self.points       = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+        self.faceCounts   = np.asarray(faceCounts, dtype=np.int32)
+        self.faceConnects = np.asarray(faceConnects, dtype=np.int32)
+        self.uvs          = None if uvs is None else np.asarray(uvs, np.float64).reshape(-1, 2)
+        self.uvCounts     = None if uvCounts is None else np.asarray(uvCounts, dtype=np.int32)
+        self.uvIds        = None if uvIds is None else np.asarray(uvIds, dtype=np.int32)
+        self._cache       = {}
+
+    @property
+    def vertexCount(self):
+        return len(self.points)
+
+    @property
+    def faceCount(self):
+        return len(self.faceCounts)
+
+    def adjacency(self, includeSelf=False):
+        """
+        :param includeSelf: add every vertex to its own neighbours
+                             - bool
+
+        :return adjacency:  CSR vertex adjacency (offsets, indices), see vertex_adjacency
+                             - tuple (ndarray, ndarray)
+        """
+        key = ('adjacency', includeSelf)
+        if key not in self._cache:
+            self._cache[key] = vertex_adjacency(
+                self.faceCounts, self.faceConnects, self.vertexCount, includeSelf
+            )
+        return self._cache[key]
+
+    def topology_hash(self):
+        """ :return digest: hash of the vertex count and faces, independent of positions - str """
+        if 'topologyHash' not in self._cache:
+            digest = hashlib.blake2b(digest_size=16)
+            digest.update(np.int64(self.vertexCount).tobytes())
+            digest.update(self.faceCounts.tobytes())
+            digest.update(self.faceConnects.tobytes())
+            self._cache['topologyHash'] = digest.hexdigest()
+        return self._cache['topologyHash']
+
+    def points_hash(self):
+        """ :return digest: hash of the vertex positions, not cached as points can change - str """
+        return hashlib.blake2b(self.points.tobytes(), digest_size=16).hexdigest()
+
+    def triangles(self):
+        """
+        :return triangles: vertex IDs of the fan triangulation and face ID of every triangle
+                            - tuple (ndarray int32 (triangleCount, 3), ndarray int64)
+        """
+        if 'triangles' not in self._cache:
+            positions, faces = triangulate(self.faceCounts)
+            self._cache['triangles'] = (self.faceConnects[positions], faces)
+        return self._cache['triangles']
+
+    def uv_vertices(self):
+        """
+        :return pairs: vertex ID and uv ID of every mapped face vertex, each pair once
+                        - tuple (ndarray int64 (n,), ndarray int64 (n,))
+        """
+        if 'uvVertices' not in self._cache:
+            mapped = np.repeat(self.uvCounts > 0, self.faceCounts)
+            keys = np.unique(self.faceConnects[mapped].astype(np.int64) * len(self.uvs)
+                             + self.uvIds)
+            self._cache['uvVertices'] = (keys // len(self.uvs), keys % len(self.uvs))
+        return self._cache['uvVertices']
+
+    def uv_triangles(self):
+        """
+        :return triangles: vertex IDs and uv IDs of the fan triangulation of all mapped faces
+                            - tuple (ndarray int32 (triangleCount, 3), ndarray int32)
+        """
+        if 'uvTriangles' not in self._cache:
+            positions, faces = triangulate(self.faceCounts)
+            mapped = np.repeat(self.uvCounts > 0, self.faceCounts)
+            uvPositions = np.cumsum(mapped) - 1  # face vertex position -> uvIds position
+            positions = positions[self.uvCounts[faces] > 0]
+            self._cache['uvTriangles'] = (
+                self.faceConnects[positions], self.uvIds[uvPositions[positions]]
+            )
+        return self._cache['uvTriangles']
+
+    def uv_shells(self):
+        """
+        :return shells: shell label of every uv, the smallest uv ID of each shell
+                         - ndarray int64 (uvCount,)
+        """
+        if 'uvShells' not in self._cache:
+            edges = face_edges(self.uvCounts, self.uvIds)
+            self._cache['uvShells'] = connected_components(edges, len(self.uvs))
+        return self._cache['uvShells']
+# ----------------------------------------------------------------------------------------------- #
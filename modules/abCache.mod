@@ -0,0 +1,2 @@
++ abCache 1.0 ..
+PYTHONPATH +:= ..
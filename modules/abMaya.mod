@@ -0,0 +1,2 @@
++ abMaya 1.0 ..
+PYTHONPATH +:= ..
@@ -0,0 +1,2 @@
++ abNode 1.0 ..
+PYTHONPATH +:= ..
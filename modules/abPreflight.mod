@@ -0,0 +1,2 @@
++ abPreflight 1.0 ..
+PYTHONPATH +:= ..
@@ -1,2 +1,3 @@
-+ plug_ngSkinTools 1.0 F:\code\abMaya\plug_ngSkinTools\maya
-PYTHONPATH += F:\code\abMaya\plug_ngSkinTools\python
++ plug_ngSkinTools 1.0 ..
+PYTHONPATH +:= ..
+MAYA_SCRIPT_PATH +:= plug_ngSkinTools/mel
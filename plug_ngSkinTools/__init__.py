@@ -1,3 +1,9 @@
 # ngSkinTools extension package init
-from .python import ui, api
-reload(api)
+from abMaya.libCore.lib.lazy import attach
+
+__getattr__, __dir__, __all__ = attach(__name__, modules={
+    'api'     : '.python.api',
+    'batch'   : '.python.batch',
+    'profiler': '.python.profiler',
+    'ui'      : '.python.ui',
+})
@@ -2,12 +2,20 @@
 # IMPORTS --------------------------------------------------------------------------------------- #
 import os
 
+import numpy as np
 from maya import cmds, mel
 from ngSkinTools.mllInterface import MllInterface
 from ngSkinTools.paint import ngLayerPaintCtxInitialize
 from ngSkinTools.utils import Utils
 
-from .core import adjust, paint
+from abMaya.abNode.python.label import LabelIndex, short_name
+from abMaya.libCore.lib.resources import resource_path
+from abMaya.libModel.lib.mesh import get_mesh_data
+from abMaya.libModel.lib.symmetry import TOLERANCE, build_symmetry
+from abMaya.libModel.lib.texture import PADDING, UVRaster, read_pfm, vertex_values, write_pfm
+
+from .core import dab, layers, maps
+from .core.history import HISTORY
 # ----------------------------------------------------------------------------------------------- #
 
 
@@ -21,14 +29,23 @@ COMMANDS = {
     'equalize': 'ngSkinToolsCustom_VolEq'
 }
 
+MASK = 'mask'    # weight history target of the layer mask
+_ADJACENCY = {}  # vertex adjacency per (mesh, vertex count), shared by all brush strokes
+
 
 # ----------------------------------------------------------------------------------------------- #
 class NgPaintStroke():
-    """ Custom ngSkinTools brush setup class """
+    """
+    Custom ngSkinTools brush setup class.
+    The vertices of a brush dab are buffered and evaluated together as arrays, a dab ends on the
+    first repeated vertex or when the stroke ends. Set BATCH to False to apply every vertex
+    immediately.
+    """
 
     MODE      = 1
     VALUE     = 1
     STROKE_ID = None
+    BATCH     = True
 
     def __init__(self, surface):
         self.surface = surface
@@ -39,6 +56,11 @@ class NgPaintStroke():
         self.ngs_target_info = self.mll.getTargetInfo()
         self.ngs_weight_list = self.mll.getInfluenceWeights(self.ngs_layer_id, self.ngs_target)
 
+        self.weights    = np.array(self.ngs_weight_list, dtype=np.float64)
+        self.min_weight = self.weights.min()
+        self.max_weight = self.weights.max()
+        self.dab        = dab.Dab()
+
     def stroke_initialize(self):
         """ Executes before each brushstroke """
         cmds.undoInfo(openChunk=True, undoName="custom_ngPaintStroke")
@@ -49,29 +71,49 @@ class NgPaintStroke():
 
         return self.surface, self.STROKE_ID
 
-    def paint_contrast(self, vtxID, value):
-        """ sharpen edge of active weight map on brushstroke """
-        min_weight = min(self.ngs_weight_list)
-        max_weight = max(self.ngs_weight_list)
-        weight = self.ngs_weight_list[vtxID]
+    def get_adjacency(self):
+        """ vertex adjacency of the painted mesh including each vertex, read once per mesh """
+        key = (self.ngs_target_info[0], len(self.weights))
+        if key not in _ADJACENCY:
+            _ADJACENCY[key] = get_mesh_data(key[0]).adjacency(includeSelf=True)
+        return _ADJACENCY[key]
 
-        if not max_weight > weight > min_weight:
-            return  # skip weights with no change
+    def buffer(self, mode, vtxID, value):
+        """ add a vertex to the current dab, applying the previous dab when a new one starts """
+        if self.dab.is_new(mode, vtxID):
+            self.flush_dab()
+        self.dab.add(mode, vtxID, value)
+        if not self.BATCH:
+            self.flush_dab()
 
-        result = paint.contrast(value, weight, min_weight, max_weight)
-        cmds.ngSkinLayer(paintIntensity=result)
-        cmds.ngLayerPaintCtxSetValue(self.STROKE_ID, vtxID, 1)
+    def flush_dab(self):
+        """ evaluate the buffered dab as arrays and apply the changed weights """
+        if not len(self.dab):
+            return
+        mode, vertices, values = self.dab.pop()
+        adjacency = self.get_adjacency() if mode in dab.NEIGHBOUR_OPERATIONS else None
+        result, changed = dab.OPERATIONS[mode](
+            values, self.weights, vertices, self.min_weight, self.max_weight, adjacency
+        )
+        for vtxID, weight in zip(vertices[changed].tolist(), result[changed].tolist()):
+            cmds.ngSkinLayer(paintIntensity=weight)
+            cmds.ngLayerPaintCtxSetValue(self.STROKE_ID, vtxID, 1)
+
+    def paint_contrast(self, vtxID, value):
+        """ sharpen edge of active weight map on brushstroke """
+        self.buffer('contrast', vtxID, value)
 
     def paint_gain(self, vtxID, value):
         """ increase weight intensity, preserving zero weights """
-        weight = self.ngs_weight_list[vtxID]
+        self.buffer('gain', vtxID, value)
 
-        if weight == 0:
-            return # skip weights with no change
+    def paint_conceal(self, vtxID, value):
+        """ smooth weights, only lowering weight values """
+        self.buffer('conceal', vtxID, value)
 
-        result = paint.gain(value, weight)
-        cmds.ngSkinLayer(paintIntensity=result)
-        cmds.ngLayerPaintCtxSetValue(self.STROKE_ID, vtxID, 1)
+    def paint_spread(self, vtxID, value):
+        """ smooth weights, only increasing weight values """
+        self.buffer('spread', vtxID, value)
 
     def paint_test(self, vtxID, value):
         """ test input of the brush scripts """
@@ -81,6 +123,7 @@ class NgPaintStroke():
 
     def stroke_finalize(self):
         """ Executes after each brushstroke """
+        self.flush_dab()
         if self.STROKE_ID:
             cmds.ngLayerPaintCtxFinalize(self.STROKE_ID)
         self.STROKE_ID = None
@@ -91,8 +134,277 @@ class NgPaintStroke():
 # ----------------------------------------------------------------------------------------------- #
 class NgMapAdjustment():
     """ Custom operations applied onto entire active ngSkinTools layer """
-    def __init__(self):
-        pass
+
+    NEIGHBOUR_OPERATIONS = ('grow', 'shrink', 'conceal', 'spread')
+
+    def __init__(self, mesh=None, history=HISTORY):
+        """
+        :param mesh:    skinned mesh to operate on, defaults to the current ngSkinTools target
+                         - str
+        :param history: also records the changed weights for undo_weights / redo_weights next
+                        to the Maya undo queue, None only uses the Maya undo, e.g. in batch jobs
+                         - WeightHistory
+        """
+        self.mll = MllInterface()
+        if mesh:
+            self.mll.setCurrentMesh(mesh)
+
+        self.mesh      = self.mll.getTargetInfo()[0]
+        self.adjacency = None
+        self.history   = history
+        if history is not None:
+            watch_scene(history)
+
+    def find_layer(self, name):
+        """ returns the ID of the layer with the given name """
+        for layer_id, layer_name in self.mll.listLayers():
+            if layer_name == name:
+                return layer_id
+        raise ValueError('layer "{}" not found on {}'.format(name, self.mesh))
+
+    def find_influence(self, layer_id, name):
+        """ returns the index of the layer influence with the given name """
+        for influence_name, influence_index in self.mll.listLayerInfluences(layer_id, False):
+            if influence_name == name or influence_name.split('|')[-1] == name:
+                return influence_index
+        raise ValueError('influence "{}" not found in layer {}'.format(name, layer_id))
+
+    def get_adjacency(self):
+        """ vertex adjacency of the mesh including each vertex, read once per instance """
+        if self.adjacency is None:
+            self.adjacency = get_mesh_data(self.mesh).adjacency(includeSelf=True)
+        return self.adjacency
+
+    def apply(self, operation, intensity, layer=None, influence=None, iterations=1,
+              mask=None, falloff=None):
+        """
+        Apply a map operation to a single influence map with one read and one write.
+        Multiple iterations are solved in memory, only the final weights are written.
+
+        :param operation: name of the operation, see core.maps.OPERATIONS
+                           - str
+        :param intensity: intensity value of the operation
+                           - float 0.0 - 1.0
+        :param layer:     layer name, defaults to the current layer
+                           - str
+        :param influence: influence name, defaults to the current paint target
+                           - str
+        :param iterations: number of in-memory iterations, see core.maps.solve
+                           - int
+        :param mask:      affected vertex IDs, all vertices if None
+                           - list [int, int, ...]
+        :param falloff:   per vertex multiplier of the weight change
+                           - list [float, float, ...]
+
+        :return result:   modified weight values
+                           - ndarray float64 (vertexCount,)
+        """
+        layer_id = self.find_layer(layer) if layer else self.mll.getCurrentLayer()
+        if influence:
+            target = self.find_influence(layer_id, influence)
+        else:
+            target = self.mll.getCurrentPaintTarget()
+
+        weights = np.array(self.mll.getInfluenceWeights(layer_id, target), dtype=np.float64)
+        adjacency = self.get_adjacency() if operation in self.NEIGHBOUR_OPERATIONS else None
+        result, _ = maps.solve(
+            operation, weights, intensity, adjacency, iterations, mask=mask, falloff=falloff
+        )
+
+        self.set_weights(layer_id, target, weights, result, operation)
+        return result
+
+    def apply_layer(self, operation, intensity, layer=None, iterations=1, processes=0):
+        """
+        Apply a map operation to every influence map of a layer, the maps can be solved on a
+        process pool sharing the weights and adjacency, see core.maps.solve_rows.
+
+        :param processes: number of worker processes, 0 solves all maps in this process,
+                          None uses one process per CPU
+                           - int
+
+        :return result:   modified weights of every layer influence
+                           - ndarray float64 (influenceCount, vertexCount)
+        """
+        layer_id = self.find_layer(layer) if layer else self.mll.getCurrentLayer()
+        influences = self.mll.listLayerInfluences(layer_id, False)
+        weights = np.array([self.mll.getInfluenceWeights(layer_id, index)
+                            for _, index in influences], dtype=np.float64)
+        adjacency = self.get_adjacency() if operation in self.NEIGHBOUR_OPERATIONS else None
+        result = maps.solve_rows(operation, weights, intensity, adjacency, iterations,
+                                 processes=processes)
+
+        if self.history is not None:
+            self.history.open_chunk(operation)
+        for row, (_, index) in enumerate(influences):
+            if not np.array_equal(weights[row], result[row]):
+                self.set_weights(layer_id, index, weights[row], result[row], operation)
+        if self.history is not None:
+            self.history.close_chunk()
+        return result
+
+    def set_weights(self, layer_id, target, before, after, name=None):
+        """
+        write an influence map or the layer mask with Maya undo, the changed values are also
+        recorded in the weight history. target is the influence index or MASK.
+        """
+        if self.history is not None:
+            self.history.record((self.mesh, layer_id, target), before, after, name=name)
+        _write_map(self.mll, layer_id, target, after)
+
+    def mirror(self, layer=None, direction='positive', axis='x', tolerance=TOLERANCE):
+        """
+        Mirror all influence maps and the mask of a layer with the cached symmetry map of the
+        mesh, left and right influences are paired by joint label or name, see abNode label.
+        The mesh should be in its symmetric pose.
+
+        :param layer:     layer name, defaults to the current layer
+                           - str
+        :param direction: 'positive' copies the positive side onto the negative side,
+                          'negative' the other way round, 'flip' swaps both sides
+                           - str
+        :param axis:      axis normal to the mirror plane
+                           - str 'x', 'y' or 'z'
+        :param tolerance: largest distance of a mirrored vertex position to its match
+                           - float
+
+        :return unresolved: IDs of vertices without mirror vertex, their weights are kept
+                           - ndarray int64
+        """
+        layer_id = self.find_layer(layer) if layer else self.mll.getCurrentLayer()
+        symmetry = build_symmetry(get_mesh_data(self.mesh), axis, tolerance=tolerance)
+
+        influences = self.mll.listLayerInfluences(layer_id, False)
+        weights = np.array([self.mll.getInfluenceWeights(layer_id, index)
+                            for _, index in influences], dtype=np.float64)
+        names = [name for name, _ in influences]
+        rows = LabelIndex.from_scene(names).mirror_remap(names)
+        result = symmetry.mirror_data(weights, direction, rows)
+
+        mask = np.array(self.mll.getLayerMask(layer_id), dtype=np.float64)
+        if self.history is not None:
+            self.history.open_chunk('mirror')
+        for row, (_, index) in enumerate(influences):
+            if not np.array_equal(weights[row], result[row]):
+                self.set_weights(layer_id, index, weights[row], result[row], 'mirror')
+        if len(mask):
+            mirrored = symmetry.mirror_data(mask, direction)
+            if not np.array_equal(mask, mirrored):
+                self.set_weights(layer_id, MASK, mask, mirrored, 'mirror')
+        if self.history is not None:
+            self.history.close_chunk()
+        return symmetry.unresolved
+
+    def bake_maps(self, directory, layer=None, influences=None, resolution=2048, padding=PADDING):
+        """
+        Bake influence maps of a layer into uv space float images, one .pfm file per influence
+        named after the influence without path and namespace.
+
+        :param directory:  output directory, created if missing
+                            - str
+        :param layer:      layer name, defaults to the current layer
+                            - str
+        :param influences: influence names, all influences of the layer if None
+                            - list [str, str, ...]
+        :param resolution: image width and height in pixels
+                            - int
+        :param padding:    pixels the maps are extended beyond the uv shell borders
+                            - int
+
+        :return paths:     written files
+                            - list [str, str, ...]
+        """
+        layer_id = self.find_layer(layer) if layer else self.mll.getCurrentLayer()
+        if influences:
+            targets = [(name, self.find_influence(layer_id, name)) for name in influences]
+        else:
+            targets = self.mll.listLayerInfluences(layer_id, False)
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+        uvRaster = UVRaster(get_mesh_data(self.mesh), resolution)
+        paths = []
+        for name, index in targets:
+            path = os.path.join(directory, short_name(name) + '.pfm')
+            weights = self.mll.getInfluenceWeights(layer_id, index)
+            write_pfm(path, uvRaster.bake(weights, padding=padding))
+            paths.append(path)
+        return paths
+
+    def import_maps(self, paths, layer=None):
+        """
+        Sample weight images back onto the influences of a layer, influences are found by the
+        file name, see bake_maps. Weights are not normalized.
+
+        :param paths:  .pfm files named after layer influences
+                        - list [str, str, ...]
+        :param layer:  layer name, defaults to the current layer
+                        - str
+
+        :return names: influences that were set
+                        - list [str, str, ...]
+        """
+        layer_id = self.find_layer(layer) if layer else self.mll.getCurrentLayer()
+        influences = {short_name(name): (name, index)
+                      for name, index in self.mll.listLayerInfluences(layer_id, False)}
+        meshData = get_mesh_data(self.mesh)
+
+        names = []
+        if self.history is not None:
+            self.history.open_chunk('import maps')
+        for path in paths:
+            key = os.path.splitext(os.path.basename(path))[0]
+            if key not in influences:
+                raise ValueError('no influence "{}" in layer {}'.format(key, layer_id))
+            name, index = influences[key]
+            before = np.array(self.mll.getInfluenceWeights(layer_id, index), dtype=np.float64)
+            image = read_pfm(path)
+            if image.ndim == 3:  # maps saved as rgb by image editors
+                image = image.mean(axis=2)
+            after = np.clip(vertex_values(meshData, image), 0.0, 1.0)
+            self.set_weights(layer_id, index, before, after, 'import maps')
+            names.append(name)
+        if self.history is not None:
+            self.history.close_chunk()
+        return names
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+def export_layers(mesh=None):
+    """
+    read all layers of a skinned mesh for offline compositing, see core.layers.
+
+    :param mesh:    skinned mesh, defaults to the current ngSkinTools target
+                     - str
+
+    :return layers: layers from bottom to top
+                     - list [core.layers.Layer, ...]
+    """
+    mll = MllInterface()
+    if mesh:
+        mll.setCurrentMesh(mesh)
+
+    result = []
+    for layer_id, layer_name in reversed(list(mll.listLayers())):  # listLayers is top first
+        influences = mll.listLayerInfluences(layer_id, False)
+        weights = [mll.getInfluenceWeights(layer_id, index) for _, index in influences]
+        result.append(layers.Layer(
+            layer_name, [name for name, _ in influences], weights,
+            mask=mll.getLayerMask(layer_id), opacity=mll.getLayerOpacity(layer_id),
+            enabled=mll.isLayerEnabled(layer_id),
+        ))
+    return result
+
+
+def composite_weights(mesh=None, normalize=True):
+    """
+    final skin weights of all layers, computed without querying the skin cluster.
+
+    :return result: influence names and weights, see core.layers.composite
+                     - tuple (list [str, ...], ndarray float64 (influenceCount, vertexCount))
+    """
+    return layers.composite(export_layers(mesh), normalize=normalize)
 # ----------------------------------------------------------------------------------------------- #
 
 
@@ -104,10 +416,68 @@ class NgComponent():
 # ----------------------------------------------------------------------------------------------- #
 
 
+# WEIGHT HISTORY -------------------------------------------------------------------------------- #
+_WATCHED = {}  # id of a watched history -> scene message callback IDs
+
+
+def watch_scene(history=HISTORY):
+    """
+    clear the history before a scene is created or opened, its keys hold mesh names of the
+    current scene. Registered once per history.
+    """
+    if id(history) in _WATCHED:
+        return
+    from maya.api import OpenMaya
+
+    def clear(*args):
+        history.clear()
+
+    _WATCHED[id(history)] = [
+        OpenMaya.MSceneMessage.addCallback(message, clear)
+        for message in (OpenMaya.MSceneMessage.kBeforeNew, OpenMaya.MSceneMessage.kBeforeOpen)
+    ]
+
+
+def _write_map(mll, layer_id, target, weights):
+    if target == MASK:
+        mll.setLayerMask(layer_id, weights.tolist())
+    else:
+        mll.setInfluenceWeights(layer_id, target, weights.tolist())
+
+
+def _read_weights(key):
+    mesh, layer_id, target = key
+    mll = MllInterface()
+    mll.setCurrentMesh(mesh)
+    if target == MASK:
+        return np.array(mll.getLayerMask(layer_id), dtype=np.float64)
+    return np.array(mll.getInfluenceWeights(layer_id, target), dtype=np.float64)
+
+
+def _write_weights(key, weights):
+    mesh, layer_id, target = key
+    mll = MllInterface()
+    mll.setCurrentMesh(mesh)
+    _write_map(mll, layer_id, target, weights)
+
+
+def undo_weights(history=HISTORY):
+    """
+    revert the last recorded weight edit, returns the reverted HistoryStep or None.
+    Raises a ValueError if the weights were changed since, e.g. by ngSkinTools strokes.
+    """
+    return history.undo(_read_weights, _write_weights)
+
+
+def redo_weights(history=HISTORY):
+    """ reapply the last reverted weight edit, returns the HistoryStep or None """
+    return history.redo(_read_weights, _write_weights)
+# ----------------------------------------------------------------------------------------------- #
+
+
 # SCRIPT BRUSH SETUP ---------------------------------------------------------------------------- #
 def custom_paint_setup():
-    package_path = os.path.dirname(os.path.dirname(__file__))
-    mel_cmd = 'source "{}"'.format(os.path.join(package_path, MEL_SCRIPT).replace('\\', '/'))
+    mel_cmd = 'source "{}"'.format(resource_path(__file__, '..', MEL_SCRIPT).replace('\\', '/'))
     mel.eval(mel_cmd)
     cmds.artUserPaintCtx(
         "ngSkinToolsLayerPaintCtx",
@@ -0,0 +1,196 @@
+"""
+    Headless batch processing of ngSkinTools map operations.
+
+        mayapy -m abMaya.plug_ngSkinTools.python.batch manifest.json --processes 4 --report report.json
+
+    Scenes are spread across a pool of worker processes, each worker initializes
+    maya.standalone once and processes one scene at a time.
+
+    manifest layout:
+        {
+            "assets": [
+                {
+                    "scene": "path/to/asset.ma",
+                    "output": "path/to/asset_weights.ma",
+                    "operations": [
+                        {
+                            "mesh": "body_geo",
+                            "layer": "base",
+                            "influence": "L_arm_jnt",
+                            "operation": "grow",
+                            "intensity": 0.5,
+                            "iterations": 10
+                        }
+                    ]
+                }
+            ]
+        }
+
+    "output" is optional and defaults to saving over the scene.
+    "layer" and "influence" are optional and default to the current layer and paint target.
+    "iterations" is optional and defaults to a single pass.
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import argparse
+import json
+import os
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
+
+from .core import maps
+# ----------------------------------------------------------------------------------------------- #
+
+
+# MANIFEST -------------------------------------------------------------------------------------- #
+def load_manifest(path):
+    """
+    read and validate a batch manifest.
+
+    :param path:    path of the manifest json file
+                     - str
+
+    :return assets: asset entries of the manifest
+                     - list [dict, dict, ...]
+    """
+    with open(path, 'r') as manifest_file:
+        manifest = json.load(manifest_file)
+
+    assets = manifest.get('assets', [])
+    for asset in assets:
+        if 'scene' not in asset:
+            raise ValueError('manifest asset without scene: {}'.format(asset))
+        for operation in asset.get('operations', []):
+            if operation.get('operation') not in maps.OPERATIONS:
+                raise ValueError('unknown map operation in {}: {}'.format(
+                    asset['scene'], operation.get('operation')
+                ))
+            if 'mesh' not in operation:
+                raise ValueError('operation without mesh in {}'.format(asset['scene']))
+    return assets
+# ----------------------------------------------------------------------------------------------- #
+
+
+# WORKER ---------------------------------------------------------------------------------------- #
+def initialize_worker():
+    """ starts maya.standalone and loads the ngSkinTools plugin, once per worker process """
+    import maya.standalone
+    maya.standalone.initialize(name='python')
+
+    from maya import cmds
+    cmds.loadPlugin('ngSkinTools', quiet=True)
+
+
+def process_asset(asset):
+    """
+    open a scene, run all map operations of the asset and save the result.
+
+    :param asset:  asset entry of the manifest
+                    - dict
+
+    :return report: timing report of the asset
+                    - dict
+    """
+    from maya import cmds
+    from .api import NgMapAdjustment
+
+    start = time.perf_counter()
+    report = {'scene': asset['scene'], 'status': 'ok', 'operations': [], 'pid': os.getpid()}
+
+    try:
+        step = time.perf_counter()
+        cmds.file(asset['scene'], open=True, force=True)
+        report['open'] = time.perf_counter() - step
+
+        adjustments = {}
+        for operation in asset.get('operations', []):
+            step = time.perf_counter()
+            mesh = operation['mesh']
+            if mesh not in adjustments:
+                adjustments[mesh] = NgMapAdjustment(mesh, history=None)  # no history across assets
+
+            adjustments[mesh].apply(
+                operation['operation'],
+                operation.get('intensity', 1.0),
+                layer=operation.get('layer'),
+                influence=operation.get('influence'),
+                iterations=operation.get('iterations', 1),
+            )
+            entry = dict(operation)
+            entry['seconds'] = time.perf_counter() - step
+            report['operations'].append(entry)
+
+        step = time.perf_counter()
+        output = asset.get('output', asset['scene'])
+        cmds.file(rename=output)
+        cmds.file(save=True, force=True)
+        report['save'] = time.perf_counter() - step
+        report['output'] = output
+
+    except Exception:
+        report['status'] = 'error'
+        report['error'] = traceback.format_exc()
+
+    report['total'] = time.perf_counter() - start
+    return report
+# ----------------------------------------------------------------------------------------------- #
+
+
+# BATCH ----------------------------------------------------------------------------------------- #
+def run(assets, processes=None, report_path=None):
+    """
+    process all assets on a pool of worker processes.
+
+    :param assets:      asset entries, see load_manifest
+                         - list [dict, dict, ...]
+    :param processes:   number of worker processes, 0 processes in the current interpreter
+                         - int
+    :param report_path: optional path of the json timing report
+                         - str
+
+    :return report:     per asset timings, total wall time and failure count
+                         - dict
+    """
+    start = time.perf_counter()
+
+    if processes == 0:
+        initialize_worker()
+        results = [process_asset(asset) for asset in assets]
+    else:
+        with ProcessPoolExecutor(max_workers=processes, initializer=initialize_worker) as pool:
+            results = list(pool.map(process_asset, assets))
+
+    report = {
+        'assets': results,
+        'failed': sum(1 for result in results if result['status'] != 'ok'),
+        'wall': time.perf_counter() - start,
+    }
+
+    if report_path:
+        with open(report_path, 'w') as report_file:
+            json.dump(report, report_file, indent=4)
+
+    return report
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Batch ngSkinTools map operations.')
+    parser.add_argument('manifest', help='path of the manifest json file')
+    parser.add_argument('--processes', type=int, default=None, help='number of workers')
+    parser.add_argument('--report', default=None, help='path of the json timing report')
+    options = parser.parse_args(args)
+
+    report = run(load_manifest(options.manifest), options.processes, options.report)
+    for result in report['assets']:
+        print('{:<8}{:>10.2f}s  {}'.format(result['status'], result['total'], result['scene']))
+    print('{} assets, {} failed, {:.2f}s'.format(
+        len(report['assets']), report['failed'], report['wall']
+    ))
+    return 1 if report['failed'] else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
+# ----------------------------------------------------------------------------------------------- #
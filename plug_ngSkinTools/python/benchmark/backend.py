@@ -0,0 +1,179 @@
+"""
+    Headless skin backend for the benchmark suite.
+    Stands in for maya.cmds, maya.mel and the ngSkinTools MllInterface with a synthetic
+    MeshData and weight maps held in memory, so the legacy brush and map tools in temp/
+    run unchanged on plain Python. Only the calls used by the benchmarked code paths are
+    implemented, every other maya command is a no-op returning None.
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import importlib
+import os
+import re
+import sys
+import types
+
+import numpy as np
+
+from ..core.history import HISTORY
+# ----------------------------------------------------------------------------------------------- #
+
+
+TEMP_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(__file__)), 'temp')
+VERTEX         = re.compile(r'\.vtx\[(\d+)\]')
+FAKE_MODULES   = [
+    'maya', 'maya.cmds', 'maya.mel', 'ngSkinTools', 'ngSkinTools.mllInterface',
+    'ngSkinTools.utils', 'ngSkinTools.paint', 'alex_utils',
+]
+LEGACY_MODULES = ['ng_equalizer', 'ng_extra_tools']
+
+ACTIVE = None  # backend used by FakeMllInterface instances created inside the legacy tools
+
+
+# ----------------------------------------------------------------------------------------------- #
+class SkinBackend(object):
+    """ synthetic skinned mesh with one weight map per influence and a vertex selection """
+    def __init__(self, meshData, weights, selection=None, mesh='benchmarkMesh'):
+        """
+        :param meshData:  synthetic mesh
+                           - MeshData
+        :param weights:   weight map per influence
+                           - list [ndarray float64 (vertexCount,), ...]
+        :param selection: selected vertex IDs, used by the Equalize tool
+                           - list [int, int, ...]
+        :param mesh:      name of the mesh transform
+                           - str
+        """
+        self.meshData  = meshData
+        self.original  = [np.asarray(weightMap, dtype=np.float64) for weightMap in weights]
+        self.weights   = [weightMap.copy() for weightMap in self.original]
+        self.selection = list(selection or [])
+        self.mesh      = mesh
+        self.layer     = 1
+        self.target    = 0
+        self.writes    = 0
+        self.adjacency = meshData.adjacency(includeSelf=True)
+        self._restore  = {}
+
+    def reset(self):
+        """ restore the initial weight maps and clear the weight history """
+        self.weights = [weightMap.copy() for weightMap in self.original]
+        self.writes  = 0
+        HISTORY.clear()
+
+    # MAYA COMMANDS ----------------------------------------------------------------------------- #
+    def vertex_name(self, index):
+        return '{}.vtx[{}]'.format(self.mesh, index)
+
+    def ls(self, *args, **kwargs):
+        if kwargs.get('selection') or kwargs.get('sl'):
+            return [self.mesh]
+        if kwargs.get('os') or kwargs.get('orderedSelection'):
+            return [self.vertex_name(index) for index in self.selection]
+        items = args[0] if args else []
+        return [items] if isinstance(items, str) else list(items)
+
+    def polyListComponentConversion(self, components, toEdge=False, toVertex=False, **kwargs):
+        """ vertex -> edge returns the vertex, edge -> vertex returns its ring with itself """
+        if toEdge:
+            return [components] if isinstance(components, str) else list(components)
+        names = [components] if isinstance(components, str) else components
+        offsets, indices = self.adjacency
+        ring = set()
+        for name in names:
+            vertex = int(VERTEX.search(name).group(1))
+            ring.update(indices[offsets[vertex]:offsets[vertex + 1]].tolist())
+        return [self.vertex_name(index) for index in sorted(ring)]
+
+    def pointPosition(self, vertex, **kwargs):
+        return self.meshData.points[int(VERTEX.search(vertex).group(1))].tolist()
+
+    def listRelatives(self, *args, **kwargs):
+        return [self.mesh + 'Shape']
+
+    def install(self):
+        """ register the fake modules and import the legacy tools against them """
+        global ACTIVE
+        ACTIVE = self
+        for name in FAKE_MODULES + LEGACY_MODULES:
+            self._restore[name] = sys.modules.pop(name, None)
+
+        cmds = types.ModuleType('maya.cmds')
+        for name in ('ls', 'polyListComponentConversion', 'pointPosition', 'listRelatives'):
+            setattr(cmds, name, getattr(self, name))
+        cmds.__getattr__ = lambda name: _no_op
+        mel = types.ModuleType('maya.mel')
+        mel.eval = _no_op
+        maya = types.ModuleType('maya')
+        maya.cmds, maya.mel = cmds, mel
+
+        mllInterface = types.ModuleType('ngSkinTools.mllInterface')
+        mllInterface.MllInterface = FakeMllInterface
+        utils = types.ModuleType('ngSkinTools.utils')
+        utils.Utils = type('Utils', (object,), {'createMelProcedure': staticmethod(_no_op)})
+        paint = types.ModuleType('ngSkinTools.paint')
+        paint.ngLayerPaintCtxInitialize = lambda mesh: 'stroke 1'
+
+        modules = {
+            'maya': maya, 'maya.cmds': cmds, 'maya.mel': mel,
+            'ngSkinTools': types.ModuleType('ngSkinTools'), 'ngSkinTools.utils': utils,
+            'ngSkinTools.mllInterface': mllInterface, 'ngSkinTools.paint': paint,
+            'alex_utils': types.ModuleType('alex_utils'),
+        }
+        sys.modules.update(modules)
+        sys.path.insert(0, TEMP_DIRECTORY)
+        return [importlib.import_module(name) for name in LEGACY_MODULES]
+
+    def uninstall(self):
+        """ remove the fake and legacy modules, restoring previously imported modules """
+        global ACTIVE
+        ACTIVE = None
+        if TEMP_DIRECTORY in sys.path:
+            sys.path.remove(TEMP_DIRECTORY)
+        for name, module in self._restore.items():
+            sys.modules.pop(name, None)
+            if module is not None:
+                sys.modules[name] = module
+        self._restore = {}
+
+    def __enter__(self):
+        return self.install()
+
+    def __exit__(self, ex_type, ex_value, ex_traceback):
+        self.uninstall()
+
+
+def _no_op(*args, **kwargs):
+    return None
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+class FakeMllInterface(object):
+    """ MllInterface subset backed by the active SkinBackend, weights cross as python lists """
+    def __init__(self):
+        self.backend = ACTIVE
+
+    def getCurrentLayer(self):
+        return self.backend.layer
+
+    def getCurrentPaintTarget(self):
+        return self.backend.target
+
+    def getVertCount(self):
+        return self.backend.meshData.vertexCount
+
+    def getTargetInfo(self):
+        return [self.backend.mesh + 'Shape', 'skinCluster1']
+
+    def listLayerInfluences(self, layerId=None, activeInfluences=True):
+        return [('influence{}'.format(index), index) for index in range(len(self.backend.weights))]
+
+    def getInfluenceWeights(self, layer, influence):
+        return self.backend.weights[influence].tolist()
+
+    def setInfluenceWeights(self, layer, influence, weights, undoEnabled=True):
+        self.backend.weights[influence] = np.asarray(weights, dtype=np.float64)
+        self.backend.writes += 1
+# ----------------------------------------------------------------------------------------------- #
@@ -0,0 +1,265 @@
+"""
+    Benchmark suite of the skin weight operations on synthetic meshes.
+
+        python -m abMaya.plug_ngSkinTools.python.benchmark.suite --sizes 10000 100000 1000000
+            --output results.json --baseline previous.json
+
+    Every case runs on grid and sphere meshes with random weight maps:
+        - core.adjust / core.paint scalar operations over all vertices
+        - core.maps vectorized map operations
+        - core.dab brush dab evaluation
+        - the legacy Equalize modes and MapOperations algorithms of temp/, through the headless
+          backend. Legacy cases are slow pure Python and only run up to legacyLimit vertices.
+
+    Results are written as json, a baseline json is compared case by case to flag regressions.
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import argparse
+import json
+import platform
+import time
+
+import numpy as np
+
+from abMaya.libModel.lib.synthetic import grid, sphere
+
+from ..core import adjust, dab, maps, paint
+from .backend import SkinBackend
+# ----------------------------------------------------------------------------------------------- #
+
+
+SIZES        = [10000, 100000, 1000000]
+SHAPES       = ['grid', 'sphere']
+INTENSITY    = 0.5
+LEGACY_LIMIT = 20000
+SELECTION    = 200  # selected vertices of the Equalize cases
+DAB_SIZE     = 500  # vertices under the brush per dab
+THRESHOLD    = 1.25  # slowdown against the baseline reported as regression
+
+
+# MESHES ---------------------------------------------------------------------------------------- #
+def synthetic_mesh(shape, vertices):
+    """
+    :param shape:     'grid' or 'sphere'
+                       - str
+    :param vertices:  approximate vertex count
+                       - int
+
+    :return meshData: synthetic mesh
+                       - MeshData
+    """
+    if shape == 'grid':
+        side = max(int(round(np.sqrt(vertices))) - 1, 1)
+        return grid(side, side)
+    segments = max(int(round(np.sqrt(vertices * 2))), 3)
+    rings = max(int(round(vertices / float(segments))) + 1, 2)
+    return sphere(rings, segments)
+
+
+def weight_maps(meshData, influences=3, seed=0):
+    """
+    :return weights: smooth random weight maps with empty and full regions per influence
+                      - list [ndarray float64 (vertexCount,), ...]
+    """
+    generator = np.random.default_rng(seed)
+    points = meshData.points
+    weights = []
+    for _ in range(influences):
+        direction = generator.normal(size=3)
+        direction /= np.linalg.norm(direction)
+        frequency = generator.uniform(2.0, 8.0)
+        wave = np.sin(points.dot(direction) * frequency + generator.uniform(0, np.pi))
+        weights.append(np.clip(wave * 1.5 + 0.5, 0.0, 1.0))
+    return weights
+# ----------------------------------------------------------------------------------------------- #
+
+
+# CASES ----------------------------------------------------------------------------------------- #
+def adjust_cases(meshData, weights):
+    weightList = weights[0].tolist()
+    low, high = min(weightList), max(weightList)
+    return {
+        'adjust.contrast': lambda: adjust.contrast(INTENSITY, weightList, low, high),
+        'adjust.normal_cdf': lambda: [adjust.normal_cdf(weight - 0.5, scale=0.1)
+                                      for weight in weightList],
+    }
+
+
+def paint_cases(meshData, weights):
+    weightList = weights[0].tolist()
+    low, high = min(weightList), max(weightList)
+    return {
+        'paint.contrast': lambda: [paint.contrast(INTENSITY, weight, low, high)
+                                   for weight in weightList],
+        'paint.sharpen': lambda: [paint.sharpen(INTENSITY, weight, low, high)
+                                  for weight in weightList],
+        'paint.gain': lambda: [paint.gain(INTENSITY, weight) for weight in weightList],
+    }
+
+
+def maps_cases(meshData, weights):
+    adjacency = meshData.adjacency(includeSelf=True)
+    return {
+        'maps.' + name: (lambda name=name: maps.apply(name, weights[0], INTENSITY, adjacency))
+        for name in maps.OPERATIONS
+    }
+
+
+def dab_cases(meshData, weights):
+    adjacency = meshData.adjacency(includeSelf=True)
+    vertices = np.arange(min(DAB_SIZE, meshData.vertexCount))
+    values = np.full(len(vertices), INTENSITY)
+    low, high = weights[0].min(), weights[0].max()
+    return {
+        'dab.' + name: (lambda function=function: function(
+            values, weights[0], vertices, low, high, adjacency
+        ))
+        for name, function in dab.OPERATIONS.items()
+    }
+
+
+def legacy_cases(backend, equalize, extraTools):
+    """ cases of the legacy tools, the backend must be installed """
+    cases = {}
+    tool = equalize.Equalize()
+    for mode in tool.modes:
+        def run(mode=mode):
+            backend.reset()
+            tool.get_data(True)
+            tool.set_vert(mode, INTENSITY)
+        cases['equalize.' + mode] = run
+
+    operations = extraTools.MapOperations()
+    for name in ('grow', 'shrink', 'conceal', 'spread', 'gain', 'contrast'):
+        def run(name=name):
+            backend.reset()
+            getattr(operations, name + '_map')(INTENSITY)
+        cases['MapOperations.' + name] = run
+    return cases
+
+
+def time_case(function, repeats):
+    """ :return seconds: fastest wall time of the repeats - float """
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+def run(sizes=None, shapes=None, repeats=3, legacyLimit=LEGACY_LIMIT, log=print):
+    """
+    :param sizes:       approximate vertex counts of the synthetic meshes
+                         - list [int, int, ...]
+    :param shapes:      synthetic mesh types
+                         - list ['grid', 'sphere']
+    :param repeats:     runs per case, the fastest is recorded
+                         - int
+    :param legacyLimit: largest vertex count the legacy tools run on
+                         - int
+    :param log:         called with a line per finished case, None for silence
+                         - function
+
+    :return results:    environment and the timing of every case
+                         - dict
+    """
+    results = []
+    for shape in shapes or SHAPES:
+        for size in sizes or SIZES:
+            meshData = synthetic_mesh(shape, size)
+            weights = weight_maps(meshData)
+
+            cases = {}
+            cases.update(adjust_cases(meshData, weights))
+            cases.update(paint_cases(meshData, weights))
+            cases.update(maps_cases(meshData, weights))
+            cases.update(dab_cases(meshData, weights))
+
+            backend = SkinBackend(meshData, weights, selection=range(min(SELECTION, size)))
+            legacy = meshData.vertexCount <= legacyLimit
+            if legacy:
+                equalize, extraTools = backend.install()
+                cases.update(legacy_cases(backend, equalize, extraTools))
+            try:
+                for name, function in cases.items():
+                    seconds = time_case(function, 1 if name.split('.')[0] in (
+                        'equalize', 'MapOperations') else repeats)
+                    results.append({'case': name, 'shape': shape,
+                                    'vertices': meshData.vertexCount, 'seconds': seconds})
+                    if log:
+                        log('{:<26}{:<8}{:>9}{:>12.4f}s'.format(
+                            name, shape, meshData.vertexCount, seconds))
+            finally:
+                if legacy:
+                    backend.uninstall()
+
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, current, threshold=THRESHOLD):
+    """
+    :param baseline:  results of a previous run
+                       - dict
+    :param current:   results of this run
+                       - dict
+    :param threshold: slowdown factor counted as regression
+                       - float
+
+    :return regressions: cases slower than the threshold allows, with both timings
+                       - list [dict, dict, ...]
+    """
+    def key(result):
+        return result['case'], result['shape'], result['vertices']
+
+    previous = {key(result): result['seconds'] for result in baseline['results']}
+    regressions = []
+    for result in current['results']:
+        before = previous.get(key(result))
+        if before and result['seconds'] > before * threshold:
+            regressions.append(dict(result, baseline=before, factor=result['seconds'] / before))
+    return regressions
+
+
+def main(args=None):
+    parser = argparse.ArgumentParser(description='Benchmark the skin weight operations.')
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES)
+    parser.add_argument('--shapes', nargs='+', default=SHAPES, choices=SHAPES)
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--legacy-limit', type=int, default=LEGACY_LIMIT)
+    parser.add_argument('--output', default=None, help='path of the json results')
+    parser.add_argument('--baseline', default=None, help='json results to compare against')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD)
+    options = parser.parse_args(args)
+
+    results = run(options.sizes, options.shapes, options.repeats, options.legacy_limit)
+    if options.output:
+        with open(options.output, 'w') as results_file:
+            json.dump(results, results_file, indent=4)
+
+    if not options.baseline:
+        return 0
+    with open(options.baseline, 'r') as baseline_file:
+        regressions = compare(json.load(baseline_file), results, options.threshold)
+    for regression in regressions:
+        print('REGRESSION {case} {shape} {vertices}: {baseline:.4f}s -> {seconds:.4f}s'.format(
+            **regression
+        ))
+    return 1 if regressions else 0
+
+
+if __name__ == '__main__':
+    raise SystemExit(main())
+# ----------------------------------------------------------------------------------------------- #
@@ -1,6 +1,6 @@
 
 # IMPORTS --------------------------------------------------------------------------------------- #
-from math import pow, sqrt
+from math import erf, pow, sqrt
 # ----------------------------------------------------------------------------------------------- #
 
 
@@ -47,3 +47,22 @@ def contrast(value, weightList, vtxMin, vtxMax):
 
     return applied_list
 # ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+def normal_cdf(value, loc=0.0, scale=1.0):
+    """
+    Cumulative distribution function of the normal distribution, same as scipy.stats.norm.cdf.
+
+    :param value:   sample value
+                     - float
+    :param loc:     mean of the distribution
+                     - float
+    :param scale:   standard deviation of the distribution
+                     - float
+
+    :return result: probability of a sample below the value
+                     - float 0.0 - 1.0
+    """
+    return 0.5 * (1.0 + erf((value - loc) / (scale * sqrt(2.0))))
+# ----------------------------------------------------------------------------------------------- #
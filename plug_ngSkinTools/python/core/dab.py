@@ -0,0 +1,153 @@
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import numpy as np
+
+from .maps import ring_stats
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+# Brush dab evaluation.
+# artUserPaintCtx calls the set value command once per vertex under the brush, the vertex / value
+# pairs of one dab are gathered in a Dab and evaluated together as arrays.
+# The operations are the array counterparts of core.paint and the brush versions of the
+# core.maps neighbour operations, they return the new weights of the dab vertices and a mask of
+# the vertices that change.
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+class Dab(object):
+    """ vertex / value pairs of one brush dab """
+    def __init__(self):
+        self.mode     = None
+        self.vertices = []
+        self.values   = []
+        self._visited = set()
+
+    def __len__(self):
+        return len(self.vertices)
+
+    def is_new(self, mode, vtxID):
+        """ a repeated vertex or another brush mode starts the next dab """
+        return bool(self.vertices) and (mode != self.mode or vtxID in self._visited)
+
+    def add(self, mode, vtxID, value):
+        self.mode = mode
+        self.vertices.append(vtxID)
+        self.values.append(value)
+        self._visited.add(vtxID)
+
+    def pop(self):
+        """
+        :return dab: brush mode, vertex IDs and brush values of the dab, the buffer is cleared
+                      - tuple (str, ndarray int64, ndarray float64)
+        """
+        dab = (self.mode, np.array(self.vertices, dtype=np.int64),
+               np.array(self.values, dtype=np.float64))
+        self.__init__()
+        return dab
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+def _threshold(values):
+    return 0.01 / (np.maximum(values, 1e-9) / 0.1)
+
+
+def contrast(values, weights, vertices, vtxMin, vtxMax, adjacency=None):
+    """
+    True contrast operation that preserves minimum and maximum values, see core.paint.contrast.
+
+    :param values:    brush value of every dab vertex
+                       - ndarray float64 (dabCount,)
+    :param weights:   weight values of all vertices
+                       - ndarray float64 (vertexCount,)
+    :param vertices:  vertex IDs of the dab
+                       - ndarray int64 (dabCount,)
+    :param vtxMin:    minimum weight value of the weight map
+                       - float 0.0 - 1.0
+    :param vtxMax:    maximum weight value of the weight map
+                       - float 0.0 - 1.0
+    :param adjacency: CSR vertex adjacency including the vertex itself, neighbour operations only
+                       - tuple (offsets, indices)
+
+    :return result:   modified weight of every dab vertex and the mask of changed vertices
+                       - tuple (ndarray float64 (dabCount,), ndarray bool (dabCount,))
+    """
+    weight = weights[vertices]
+    average = (vtxMax + vtxMin) / 2.0
+    above = np.minimum(weight + (vtxMax - weight) * values, vtxMax)
+    below = np.maximum(weight - (weight - vtxMin) * values, vtxMin)
+
+    result = np.where(weight > average, above, np.where(weight < average, below, weight))
+    return result, (vtxMax > weight) & (weight > vtxMin)
+
+
+def gain(values, weights, vertices, vtxMin, vtxMax, adjacency=None):
+    """ increases weight values, preserving zero weights, see core.paint.gain """
+    weight = weights[vertices]
+    return np.minimum(weight + weight * values, 1.0), weight != 0
+
+
+def conceal(values, weights, vertices, vtxMin, vtxMax, adjacency=None):
+    """ smooth operation that only lowers weight values, see core.maps.conceal """
+    weight = weights[vertices]
+    ring_min, _, ring_avg = ring_stats(weights, adjacency, vertices)
+    difference = np.abs(ring_avg - weight)
+
+    result = np.maximum(weight * (1 - difference * values), ring_min)
+    keep = (weight <= vtxMin) | ((ring_avg >= vtxMax) & (difference <= _threshold(values)))
+    return result, ~keep
+
+
+def spread(values, weights, vertices, vtxMin, vtxMax, adjacency=None):
+    """ smooth operation that only increases weight values, see core.maps.spread """
+    weight = weights[vertices]
+    _, ring_max, ring_avg = ring_stats(weights, adjacency, vertices)
+    difference = np.abs(ring_avg - weight)
+
+    result = np.minimum(weight + difference * values, ring_max)
+    keep = (weight >= vtxMax) | ((ring_avg <= vtxMin) & (difference <= _threshold(values)))
+    return result, ~keep
+
+
+OPERATIONS = {
+    'contrast': contrast,
+    'gain'    : gain,
+    'conceal' : conceal,
+    'spread'  : spread,
+}
+NEIGHBOUR_OPERATIONS = ('conceal', 'spread')
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+def equalize(weights, vtxID, value, vertices, distances, threshold):
+    """
+    Volume equalize, applies the weight of a vertex onto the surrounding vertices with a linear
+    falloff over their distance along the surface.
+
+    :param weights:   weights of the whole map
+                       - ndarray float64 (vertexCount,)
+    :param vtxID:     vertex ID under the brush
+                       - int
+    :param value:     brush value, scales the volume and the strength
+                       - float
+    :param vertices:  vertex IDs within threshold * value of the vertex, see libModel.geodesic
+                       - ndarray int (n,)
+    :param distances: geodesic distance of every vertex
+                       - ndarray float64 (n,)
+    :param threshold: volume radius at full brush value
+                       - float
+
+    :return result:   vertex IDs that change and their new weights
+                       - tuple (ndarray int, ndarray float64)
+    """
+    vertex_weight = weights[vtxID]
+    target_weight = weights[vertices]
+    change = (target_weight != vertex_weight) & (vertices != vtxID)
+    falloff = (threshold - distances[change]) / threshold
+    result = target_weight[change] - (target_weight[change] - vertex_weight) * value * falloff
+    return vertices[change], result
+# ----------------------------------------------------------------------------------------------- #
@@ -0,0 +1,295 @@
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import time
+from collections import deque
+
+import numpy as np
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+# Weight edit history.
+# An edit stores the changed vertex IDs with their old and new values instead of full weight
+# lists, in float16 or float32 where that reproduces the values within the history tolerance.
+# Steps are evicted oldest first once the history exceeds its memory limit.
+# Weight maps are identified by a key, e.g. (mesh, layer ID, influence index). The history
+# does not access the maps itself, undo and redo read and write them through two functions.
+# A step is only reverted or reapplied while the maps still hold the values it left behind,
+# edits made outside the history since then make undo and redo raise a ValueError.
+# ----------------------------------------------------------------------------------------------- #
+
+
+MEMORY_LIMIT = 256 * 1024 * 1024  # bytes
+DTYPES = (np.float16, np.float32)
+# default history tolerance, float32 reproduces weights in [0, 1] within 6e-8
+TOLERANCE = 1e-7
+# largest difference of the current weights to the recorded values of a step that is undone
+MATCH_TOLERANCE = 1e-6
+
+
+# ----------------------------------------------------------------------------------------------- #
+def compact(values, tolerance=0.0):
+    """
+    :param values:    weight values
+                       - ndarray float64
+    :param tolerance: largest allowed error of the stored values
+                       - float
+
+    :return values:   the values in the smallest float type that stays within the tolerance
+                       - ndarray float16 / float32 / float64
+    """
+    for dtype in DTYPES:
+        converted = values.astype(dtype)
+        if np.all(np.abs(converted.astype(np.float64) - values) <= tolerance):
+            return converted
+    return values
+
+
+class WeightDelta(object):
+    """ changed values of one weight map """
+    def __init__(self, key, indices, old, new):
+        self.key     = key
+        self.indices = indices
+        self.old     = old
+        self.new     = new
+
+    @classmethod
+    def from_weights(cls, key, before, after, tolerance=0.0):
+        """
+        :param key:       weight map key
+                           - hashable
+        :param before:    weights before the edit
+                           - list [float, float, ...]
+                           - ndarray float (vertexCount,)
+        :param after:     weights after the edit
+                           - list [float, float, ...]
+                           - ndarray float (vertexCount,)
+        :param tolerance: largest allowed error of the stored values, see compact
+                           - float
+
+        :return delta:    changed values, None if nothing changed
+                           - WeightDelta
+        """
+        before = np.asarray(before, dtype=np.float64)
+        after = np.asarray(after, dtype=np.float64)
+        indices = np.flatnonzero(before != after)
+        if not len(indices):
+            return None
+        return cls(key, indices.astype(np.int32), compact(before[indices], tolerance),
+                   compact(after[indices], tolerance))
+
+    @property
+    def nbytes(self):
+        return self.indices.nbytes + self.old.nbytes + self.new.nbytes
+
+    def apply(self, weights):
+        """ set the new values, weights are modified in place and returned """
+        weights[self.indices] = self.new
+        return weights
+
+    def revert(self, weights):
+        """ set the old values, weights are modified in place and returned """
+        weights[self.indices] = self.old
+        return weights
+
+    def matches(self, weights, new=True, tolerance=MATCH_TOLERANCE):
+        """
+        :param weights:   current weights of the map
+                           - ndarray float (vertexCount,)
+        :param new:       compare with the new values, False compares with the old values
+                           - bool
+        :param tolerance: largest allowed difference, on top of the storage error
+                           - float
+
+        :return match:    the weights hold the recorded values at all changed vertices
+                           - bool
+        """
+        if len(self.indices) and self.indices[-1] >= len(weights):
+            return False
+        values = (self.new if new else self.old).astype(np.float64)
+        return bool(np.all(np.abs(weights[self.indices] - values) <= tolerance))
+
+
+class HistoryStep(object):
+    """ one undoable edit of one or more weight maps """
+    def __init__(self, name=None):
+        self.name   = name
+        self.deltas = []
+        self.time   = time.time()
+
+    @property
+    def nbytes(self):
+        return sum(delta.nbytes for delta in self.deltas)
+
+    def apply(self, read, write, tolerance=MATCH_TOLERANCE):
+        self._replay(read, write, self.deltas, False, tolerance)
+
+    def revert(self, read, write, tolerance=MATCH_TOLERANCE):
+        self._replay(read, write, list(reversed(self.deltas)), True, tolerance)
+
+    def _replay(self, read, write, deltas, undo, tolerance):
+        """ checks every delta against the current maps before the first map is written """
+        maps = {}
+        for delta in deltas:
+            if delta.key not in maps:
+                maps[delta.key] = np.array(read(delta.key), dtype=np.float64)
+            if not delta.matches(maps[delta.key], new=undo, tolerance=tolerance):
+                raise ValueError('weights of {} changed since "{}" was recorded'.format(
+                    delta.key, self.name
+                ))
+            if undo:
+                delta.revert(maps[delta.key])
+            else:
+                delta.apply(maps[delta.key])
+        for key, weights in maps.items():
+            write(key, weights)
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+class WeightHistory(object):
+    """ undo and redo stacks of weight edits with a memory limit """
+    def __init__(self, limit=MEMORY_LIMIT, tolerance=0.0):
+        """
+        :param limit:     memory limit of all stored steps in bytes, the latest step is always kept
+                           - int
+        :param tolerance: largest allowed error of the stored values, see compact
+                           - float
+        """
+        self.limit     = limit
+        self.tolerance = tolerance
+        self.undoStack = deque()
+        self.redoStack = []
+        self.nbytes    = 0
+        self._chunk    = None
+
+    def __len__(self):
+        return len(self.undoStack)
+
+    def open_chunk(self, name=None):
+        """ collect all following records into one step until close_chunk """
+        self.close_chunk()
+        self._chunk = HistoryStep(name)
+
+    def close_chunk(self):
+        step, self._chunk = self._chunk, None
+        if step is not None and step.deltas:
+            self._push(step)
+
+    def record(self, key, before, after, name=None):
+        """
+        :param key:    weight map key
+                        - hashable
+        :param before: weights before the edit
+                        - list [float, float, ...]
+                        - ndarray float (vertexCount,)
+        :param after:  weights after the edit
+                        - list [float, float, ...]
+                        - ndarray float (vertexCount,)
+        :param name:   name of the step, ignored inside a chunk
+                        - str
+
+        :return delta: the recorded changes, None if nothing changed
+                        - WeightDelta
+        """
+        delta = WeightDelta.from_weights(key, before, after, self.tolerance)
+        if delta is None:
+            return None
+        if self._chunk is not None:
+            self._chunk.deltas.append(delta)
+            return delta
+        step = HistoryStep(name)
+        step.deltas.append(delta)
+        self._push(step)
+        return delta
+
+    def _push(self, step):
+        self.redoStack = []
+        self.undoStack.append(step)
+        self.nbytes = sum(stored.nbytes for stored in self.undoStack)
+        while self.nbytes > self.limit and len(self.undoStack) > 1:
+            self.nbytes -= self.undoStack.popleft().nbytes
+
+    def undo(self, read, write):
+        """
+        :param read:  returns the current weights of a key as a writable array
+                       - function (key) -> ndarray
+        :param write: stores the weights of a key
+                       - function (key, ndarray)
+
+        :return step: the reverted step, None if there is nothing to undo
+                       - HistoryStep
+
+        :raises ValueError: the weights changed since the step was recorded, nothing is written
+                            and the step stays on the undo stack
+        """
+        self.close_chunk()
+        if not self.undoStack:
+            return None
+        step = self.undoStack[-1]
+        step.revert(read, write, self.tolerance + MATCH_TOLERANCE)
+        self.undoStack.pop()
+        self.nbytes -= step.nbytes
+        self.redoStack.append(step)
+        return step
+
+    def redo(self, read, write):
+        """ reapply the last undone step, see undo """
+        if not self.redoStack:
+            return None
+        step = self.redoStack[-1]
+        step.apply(read, write, self.tolerance + MATCH_TOLERANCE)
+        self.redoStack.pop()
+        self.undoStack.append(step)
+        self.nbytes += step.nbytes
+        return step
+
+    def clear(self):
+        self.undoStack.clear()
+        self.redoStack = []
+        self.nbytes = 0
+        self._chunk = None
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+HISTORY = WeightHistory(tolerance=TOLERANCE)
+
+
+def benchmark(vertices=1000000, edits=200, editSize=2000):
+    """
+    Memory and undo / redo time of local edits on a dense weight map, against full copies.
+
+    :return stats: bytes of the history and of full float64 copies, seconds of a full undo
+                   and redo of all edits
+                    - dict {str: float, ...}
+    """
+    generator = np.random.default_rng(0)
+    weights = np.round(generator.random(vertices), 3)
+    history = WeightHistory(limit=1 << 40)
+    for _ in range(edits):
+        start = generator.integers(0, vertices - editSize)
+        before = weights.copy()
+        weights[start:start + editSize] = np.clip(weights[start:start + editSize] * 1.5, 0, 1)
+        history.record('map', before, weights)
+
+    maps = {'map': weights}
+    final = weights.copy()
+    stats = {'history_bytes': history.nbytes, 'copy_bytes': edits * weights.nbytes}
+    begin = time.perf_counter()
+    while history.undo(maps.__getitem__, maps.__setitem__):
+        pass
+    stats['undo'] = time.perf_counter() - begin
+
+    begin = time.perf_counter()
+    while history.redo(maps.__getitem__, maps.__setitem__):
+        pass
+    stats['redo'] = time.perf_counter() - begin
+    stats['exact'] = bool(np.array_equal(maps['map'], final))
+    return stats
+
+
+if __name__ == '__main__':
+    for name, value in benchmark().items():
+        print('{:<16}{}'.format(name, value))
+# ----------------------------------------------------------------------------------------------- #
@@ -0,0 +1,202 @@
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import time
+
+import numpy as np
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+# Offline layer compositing.
+# Flattens ngSkinTools layers to the final skin weights without the plugin.
+# Layers are blended bottom to top, every enabled layer covers the result below by
+# opacity * mask at each vertex, scaled by the weight sum of the layer at that vertex:
+#
+#     alpha  = opacity * mask
+#     result = result * (1 - alpha * min(sum(layer), 1)) + layer * alpha
+#
+# so a layer with full weights replaces the layers below, a layer without weights at a vertex is
+# transparent there, and partial weights keep the rest of the lower layers. The result is
+# normalized per vertex at the end. Layers without a mask use a full mask.
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+class Layer(object):
+    """ influence weights, mask and blend settings of one ngSkinTools layer """
+    def __init__(self, name, influences, weights, mask=None, opacity=1.0, enabled=True):
+        """
+        :param name:       layer name
+                            - str
+        :param influences: influence names, one per weight row
+                            - list [str, str, ...]
+        :param weights:    weights of every influence and vertex
+                            - ndarray float (influenceCount, vertexCount)
+                            - list [list [float, ...], ...]
+        :param mask:       layer mask per vertex, None for a full mask
+                            - ndarray float (vertexCount,)
+                            - list [float, float, ...]
+        :param opacity:    layer opacity
+                            - float 0.0 - 1.0
+        :param enabled:    disabled layers are skipped
+                            - bool
+        """
+        self.name       = name
+        self.influences = list(influences)
+        self.weights    = np.asarray(weights, dtype=np.float64)
+        if self.weights.ndim != 2:  # flat lists, layers without influences have no vertices
+            self.weights = self.weights.reshape(len(self.influences), -1 if self.influences else 0)
+        self.mask       = None if mask is None or not len(mask) else np.asarray(mask, np.float64)
+        self.opacity    = float(opacity)
+        self.enabled    = bool(enabled)
+
+    @property
+    def vertexCount(self):
+        return self.weights.shape[1]
+
+    def alpha(self):
+        """ :return alpha: blend factor of every vertex - ndarray float64 (vertexCount,) """
+        if self.mask is None:
+            return np.full(self.vertexCount, self.opacity)
+        return np.clip(self.mask, 0.0, 1.0) * self.opacity
+
+
+def influence_names(layers):
+    """ :return influences: influences of all layers in order of appearance - list [str, ...] """
+    influences = []
+    for layer in layers:
+        influences.extend(name for name in layer.influences if name not in influences)
+    return influences
+
+
+def composite(layers, influences=None, normalize=True):
+    """
+    Flatten layers to the final skin weights.
+
+    :param layers:     layers from bottom to top
+                        - list [Layer, Layer, ...]
+    :param influences: order of the result rows, defaults to influence_names(layers)
+                        - list [str, str, ...]
+    :param normalize:  normalize the weights of every vertex to a sum of 1.0
+                        - bool
+
+    :return result:    influence names and the final weights, unweighted vertices stay zero
+                        - tuple (list [str, ...], ndarray float64 (influenceCount, vertexCount))
+    """
+    influences = list(influences or influence_names(layers))
+    rows = {name: row for row, name in enumerate(influences)}
+    vertexCount = max([layer.vertexCount for layer in layers] or [0])
+    result = np.zeros((len(influences), vertexCount), dtype=np.float64)
+
+    for layer in layers:
+        if not layer.enabled or layer.opacity <= 0.0 or not layer.influences:
+            continue
+        if layer.vertexCount != vertexCount:
+            raise ValueError('layer "{}" has {} vertices, expected {}'.format(
+                layer.name, layer.vertexCount, vertexCount
+            ))
+        alpha = layer.alpha()
+        coverage = alpha * np.minimum(layer.weights.sum(axis=0), 1.0)
+        result *= 1.0 - coverage
+        indices = [rows[name] for name in layer.influences]
+        if len(set(indices)) == len(indices):
+            result[indices] += layer.weights * alpha
+        else:  # an influence listed twice in a layer adds both of its rows
+            np.add.at(result, indices, layer.weights * alpha)
+
+    if normalize:
+        totals = result.sum(axis=0)
+        np.divide(result, totals, out=result, where=totals > 0)
+    return influences, result
+
+
+def validate(weights, maxInfluences=None, tolerance=1e-6):
+    """
+    :param weights:       final weights, see composite
+                           - ndarray float (influenceCount, vertexCount)
+    :param maxInfluences: largest allowed number of non zero influences per vertex
+                           - int
+    :param tolerance:     allowed deviation of the weight sum from 1.0
+                           - float
+
+    :return problems:     vertex IDs per problem, empty arrays if the weights are valid
+                           - dict {str: ndarray int64, ...}
+    """
+    totals = weights.sum(axis=0)
+    problems = {
+        'unweighted': np.flatnonzero(totals <= tolerance),
+        'unnormalized': np.flatnonzero((totals > tolerance) & (np.abs(totals - 1.0) > tolerance)),
+        'negative': np.flatnonzero((weights < -tolerance).any(axis=0)),
+    }
+    if maxInfluences is not None:
+        counts = np.count_nonzero(weights > tolerance, axis=0)
+        problems['influences'] = np.flatnonzero(counts > maxInfluences)
+    return problems
+# ----------------------------------------------------------------------------------------------- #
+
+
+# FILES ----------------------------------------------------------------------------------------- #
+def save_layers(path, layers):
+    """ write layers to a .npz file, see load_layers """
+    arrays = {'names': np.array([layer.name for layer in layers], dtype=str)}
+    for index, layer in enumerate(layers):
+        prefix = 'layer{}_'.format(index)
+        arrays[prefix + 'influences'] = np.array(layer.influences, dtype=str)
+        arrays[prefix + 'weights'] = layer.weights
+        arrays[prefix + 'mask'] = layer.mask if layer.mask is not None else np.empty(0)
+        arrays[prefix + 'settings'] = np.array([layer.opacity, layer.enabled], dtype=np.float64)
+    np.savez_compressed(path, **arrays)
+
+
+def load_layers(path):
+    """
+    :param path:    .npz file written by save_layers
+                     - str
+
+    :return layers: layers from bottom to top
+                     - list [Layer, Layer, ...]
+    """
+    layers = []
+    with np.load(path) as arrays:
+        for index, name in enumerate(arrays['names'].tolist()):
+            prefix = 'layer{}_'.format(index)
+            opacity, enabled = arrays[prefix + 'settings']
+            layers.append(Layer(
+                name, arrays[prefix + 'influences'].tolist(), arrays[prefix + 'weights'],
+                mask=arrays[prefix + 'mask'], opacity=opacity, enabled=enabled
+            ))
+    return layers
+# ----------------------------------------------------------------------------------------------- #
+
+
+# BENCHMARK ------------------------------------------------------------------------------------- #
+def benchmark(vertices=200000, influences=60, layerCount=8, perLayer=12):
+    """
+    :return timings: seconds to composite the synthetic layers and to validate the result
+                      - dict {str: float, ...}
+    """
+    generator = np.random.default_rng(0)
+    names = ['joint{}'.format(index) for index in range(influences)]
+    layers = []
+    for index in range(layerCount):
+        chosen = generator.choice(influences, perLayer, replace=False)
+        weights = generator.random((perLayer, vertices)) ** 4
+        weights /= weights.sum(axis=0)
+        mask = None if index == 0 else generator.random(vertices)
+        layers.append(Layer('layer{}'.format(index), [names[row] for row in chosen], weights,
+                            mask=mask, opacity=generator.uniform(0.5, 1.0)))
+
+    start = time.perf_counter()
+    _, weights = composite(layers, names)
+    timings = {'composite': time.perf_counter() - start}
+    start = time.perf_counter()
+    problems = validate(weights, maxInfluences=influences)
+    timings['validate'] = time.perf_counter() - start
+    timings['problems'] = sum(len(vertices) for vertices in problems.values())
+    return timings
+
+
+if __name__ == '__main__':
+    for name, value in benchmark().items():
+        print('{:<12}{}'.format(name, value))
+# ----------------------------------------------------------------------------------------------- #
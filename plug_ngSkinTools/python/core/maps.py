@@ -0,0 +1,279 @@
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import numpy as np
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+# Whole map operations on exported weight arrays.
+# Neighbour operations take the vertex adjacency in CSR layout (offsets, indices) including
+# every vertex itself, see abMaya.libModel.lib.topology.vertex_adjacency(includeSelf=True).
+# All operations return a new weight array and leave the input untouched.
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+def ring_stats(weights, adjacency, vertices=None):
+    """
+    Minimum, maximum and average weight of the neighbourhood of every vertex.
+
+    :param weights:   weight values of all vertices
+                       - ndarray float (vertexCount,)
+    :param adjacency: CSR vertex adjacency including the vertex itself
+                       - tuple (offsets, indices)
+    :param vertices:  only evaluate these vertex IDs, all vertices if None
+                       - ndarray int
+
+    :return result:   neighbourhood minimum, maximum and average
+                       - tuple (ndarray, ndarray, ndarray)
+    """
+    offsets, indices = adjacency
+    if vertices is not None:
+        # gather the rows of the given vertices into a smaller CSR table
+        starts = offsets[vertices]
+        counts = offsets[vertices + 1] - starts
+        offsets = np.concatenate([[0], np.cumsum(counts)])
+        indices = indices[np.repeat(starts - offsets[:-1], counts) + np.arange(offsets[-1])]
+    starts = offsets[:-1]
+    values = weights[indices]
+
+    ring_min = np.minimum.reduceat(values, starts)
+    ring_max = np.maximum.reduceat(values, starts)
+    ring_avg = np.add.reduceat(values, starts) / np.diff(offsets)
+    return ring_min, ring_max, ring_avg
+
+
+def _threshold(intensity):
+    return 0.01 / (intensity / 0.1)
+
+
+def grow(weights, intensity, adjacency):
+    """ pushes the border of the weight map outwards """
+    weights = np.asarray(weights, dtype=np.float64)
+    vtxMin, vtxMax = weights.min(), weights.max()
+    ring_max = ring_stats(weights, adjacency)[1]
+
+    result = np.minimum(weights + np.abs(weights - ring_max) * intensity, vtxMax)
+    keep = (weights >= vtxMax) | (ring_max <= vtxMin)
+    return np.where(keep, weights, result)
+
+
+def shrink(weights, intensity, adjacency):
+    """ pulls the border of the weight map inwards """
+    weights = np.asarray(weights, dtype=np.float64)
+    vtxMin, vtxMax = weights.min(), weights.max()
+    ring_min = ring_stats(weights, adjacency)[0]
+
+    result = np.maximum(weights - np.abs(weights - ring_min) * intensity, vtxMin)
+    keep = (weights <= vtxMin) | (ring_min >= vtxMax)
+    return np.where(keep, weights, result)
+
+
+def conceal(weights, intensity, adjacency):
+    """ smooth operation that only lowers weight values """
+    weights = np.asarray(weights, dtype=np.float64)
+    vtxMin, vtxMax = weights.min(), weights.max()
+    ring_min, _, ring_avg = ring_stats(weights, adjacency)
+    difference = np.abs(ring_avg - weights)
+
+    result = np.maximum(weights * (1 - difference * intensity), ring_min)
+    keep = (weights <= vtxMin) | ((ring_avg >= vtxMax) & (difference < _threshold(intensity)))
+    return np.where(keep, weights, result)
+
+
+def spread(weights, intensity, adjacency):
+    """ smooth operation that only increases weight values """
+    weights = np.asarray(weights, dtype=np.float64)
+    vtxMin, vtxMax = weights.min(), weights.max()
+    _, ring_max, ring_avg = ring_stats(weights, adjacency)
+    difference = np.abs(ring_avg - weights)
+
+    result = np.minimum(weights + difference * intensity, ring_max)
+    keep = (weights >= vtxMax) | ((ring_avg <= vtxMin) & (difference < _threshold(intensity)))
+    return np.where(keep, weights, result)
+
+
+def gain(weights, intensity, adjacency=None):
+    """ increases weight values, preserving zero weights """
+    weights = np.asarray(weights, dtype=np.float64)
+    result = np.minimum(weights + weights * intensity, 1.0)
+    return np.where(weights == 0, weights, result)
+
+
+# Abramowitz and Stegun 7.1.26, highest order first
+ERF_P            = 0.3275911
+ERF_COEFFICIENTS = (1.061405429, -1.453152027, 1.421413741, -0.284496736, 0.254829592)
+
+
+def erf(values):
+    """ error function of every value, rational approximation with an error below 1.5e-7 """
+    values = np.asarray(values, dtype=np.float64)
+    t = 1.0 / (1.0 + ERF_P * np.abs(values))
+    polynomial = np.zeros_like(t)
+    for coefficient in ERF_COEFFICIENTS:
+        polynomial = (polynomial + coefficient) * t
+    return np.sign(values) * (1.0 - polynomial * np.exp(-values * values))
+
+
+def normal_cdf(values, loc=0.0, scale=1.0):
+    """ array version of adjust.normal_cdf, see erf for the accuracy """
+    return 0.5 * (1.0 + erf((np.asarray(values) - loc) / (scale * np.sqrt(2.0))))
+
+
+def contrast(weights, intensity, adjacency=None):
+    """ sharpens the edge of the weight map, preserving minimum and maximum values """
+    weights = np.asarray(weights, dtype=np.float64)
+    vtxMin, vtxMax = weights.min(), weights.max()
+    if vtxMax == vtxMin:
+        return weights.copy()
+
+    average = (vtxMax + vtxMin) / 2.0
+    scale = 0.1 * (vtxMax - vtxMin)
+    cdf = normal_cdf(weights - average, 0.0, scale)
+
+    result = np.clip(weights + (cdf - weights) * intensity, vtxMin, vtxMax)
+    keep = ~((vtxMax > weights) & (weights > vtxMin))
+    return np.where(keep, weights, result)
+
+
+OPERATIONS = {
+    'grow'    : grow,
+    'shrink'  : shrink,
+    'conceal' : conceal,
+    'spread'  : spread,
+    'gain'    : gain,
+    'contrast': contrast,
+}
+
+
+def apply(operation, weights, intensity, adjacency=None):
+    """
+    Apply a named map operation.
+
+    :param operation: name of the operation, see OPERATIONS
+                       - str
+    :param weights:   weight values of all vertices
+                       - list [float, float, ...]
+                       - ndarray float (vertexCount,)
+    :param intensity: intensity value of the operation
+                       - float 0.0 - 1.0
+    :param adjacency: CSR vertex adjacency including the vertex itself,
+                      only required by neighbour operations
+                       - tuple (offsets, indices)
+
+    :return result:   modified weight values
+                       - ndarray float64 (vertexCount,)
+    """
+    if operation not in OPERATIONS:
+        raise KeyError('unknown map operation: {}'.format(operation))
+    return OPERATIONS[operation](weights, intensity, adjacency)
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+def solve(operation, weights, intensity, adjacency=None, iterations=1, tolerance=1e-6,
+          mask=None, falloff=None):
+    """
+    Apply a named map operation repeatedly in memory, the equivalent of multiple clicks on
+    the map operation buttons without a Maya round trip per click.
+    Stops early once no weight changes by more than the tolerance.
+
+    :param operation:  name of the operation, see OPERATIONS
+                        - str
+    :param weights:    weight values of all vertices
+                        - list [float, float, ...]
+                        - ndarray float (vertexCount,)
+    :param intensity:  intensity value of the operation
+                        - float 0.0 - 1.0
+    :param adjacency:  CSR vertex adjacency including the vertex itself
+                        - tuple (offsets, indices)
+    :param iterations: maximum number of iterations
+                        - int
+    :param tolerance:  convergence threshold of the largest weight change per iteration
+                        - float
+    :param mask:       vertices affected by the operation, all vertices if None
+                        - ndarray bool (vertexCount,)
+                        - list [int, int, ...] vertex IDs
+    :param falloff:    per vertex multiplier of the weight change
+                        - ndarray float 0.0 - 1.0 (vertexCount,)
+
+    :return result:    modified weight values and number of iterations run
+                        - tuple (ndarray float64 (vertexCount,), int)
+    """
+    result = np.array(weights, dtype=np.float64)
+
+    factor = np.ones(len(result))
+    if mask is not None:
+        mask = np.asarray(mask)
+        if mask.dtype != np.bool_:
+            mask = np.bincount(mask.astype(np.int64), minlength=len(result)) > 0
+        factor *= mask
+    if falloff is not None:
+        factor *= np.asarray(falloff, dtype=np.float64)
+
+    blend = mask is not None or falloff is not None
+    iteration = 0
+    for iteration in range(1, iterations + 1):
+        applied = apply(operation, result, intensity, adjacency)
+        if blend:
+            applied = result + (applied - result) * factor
+
+        change = np.abs(applied - result).max() if len(result) else 0.0
+        result = applied
+        if change <= tolerance:
+            break
+
+    return result, iteration
+
+
+def _solve_chunk(arguments):
+    handles, rows, operation, intensity, iterations, tolerance = arguments
+    from abMaya.libCore.lib.shared import attach
+
+    weights, result = attach(handles[0]), attach(handles[1])
+    adjacency = (attach(handles[2]), attach(handles[3])) if len(handles) > 2 else None
+    for row in range(*rows):
+        result[row], _ = solve(
+            operation, weights[row], intensity, adjacency, iterations, tolerance
+        )
+
+
+def solve_rows(operation, weights, intensity, adjacency=None, iterations=1, tolerance=1e-6,
+               processes=0, chunkSize=4):
+    """
+    solve all influence maps of a layer on a process pool, see solve.
+    Weights and adjacency are published once in shared memory, workers write their rows of the
+    result in place, so only handles and row ranges are sent to the workers.
+
+    :param weights:    weight values of every influence and vertex
+                        - ndarray float (influenceCount, vertexCount)
+    :param processes:  number of worker processes, 0 solves all rows in this process,
+                       None uses one process per CPU, spawned with mayapy inside Maya
+                        - int
+    :param chunkSize:  rows per task
+                        - int
+
+    :return result:    modified weight values
+                        - ndarray float64 (influenceCount, vertexCount)
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from abMaya.libCore.lib.shared import SharedArray, pool_context
+
+    weights = np.asarray(weights, dtype=np.float64)
+    arrays = [weights, np.zeros_like(weights)] + list(adjacency or [])
+    shared = [SharedArray.publish(array) for array in arrays]
+    try:
+        handles = tuple(array.handle for array in shared)
+        tasks = [(handles, (start, min(start + chunkSize, len(weights))), operation, intensity,
+                  iterations, tolerance) for start in range(0, len(weights), chunkSize)]
+        if processes == 0 or len(tasks) < 2:
+            for task in tasks:
+                _solve_chunk(task)
+        else:
+            with ProcessPoolExecutor(max_workers=processes, mp_context=pool_context()) as pool:
+                list(pool.map(_solve_chunk, tasks))
+        return shared[1].array.copy()
+    finally:
+        for array in shared:
+            array.release()
+# ----------------------------------------------------------------------------------------------- #
@@ -2,7 +2,7 @@
 # IMPORTS --------------------------------------------------------------------------------------- #
 from math import pow, sqrt
 
-from abMaya.libModel import component
+from .adjust import normal_cdf
 # ----------------------------------------------------------------------------------------------- #
 
 
@@ -38,6 +38,29 @@ def contrast(value, weight, vtxMin, vtxMax):
 
 
 
+def sharpen(value, weight, vtxMin, vtxMax):
+    """
+    Contrast operation along a normal distribution around the average value.
+    Pulls the given weight value towards the cumulative distribution of the weight range,
+    per vertex counterpart of core.maps.contrast.
+
+    :param value:   intensity value of the brush stroke
+                     - float 0.0 - 1.0
+    :param weight:  current weight value of the given vertex
+                     - float 0.0 - 1.0
+    :param vtxMin:  minimum weight value of affected vertices
+                     - float 0.0 - 1.0
+    :param vtxMax:  maximum weight value of affected vertices
+                     - float 0.0 - 1.0
+
+    :return result: modified weight value
+                     - float 0.0 - 1.0
+    """
+    average = (vtxMax + vtxMin) / 2.0
+    modifier = normal_cdf(weight - average, scale=0.1 * (vtxMax - vtxMin)) - weight
+    return max(vtxMin, min(weight + modifier * value, vtxMax))
+
+
 def gain(value, weight):
     """
     Gain operation that preserves zero weights.
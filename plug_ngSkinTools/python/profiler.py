@@ -0,0 +1,261 @@
+"""
+    Stroke profiler for the custom ngSkinTools brushes.
+
+        from abMaya.plug_ngSkinTools.python import profiler
+        profiler.enable()          # NgPaintStroke, pass UseNgBrush or other brush classes
+        ...                        # paint
+        print(profiler.report())
+        profiler.dump('strokes.json')
+        profiler.disable()
+
+    enable() wraps the stroke phases of the brush classes, the Maya commands and the
+    MllInterface methods used by the brushes with timing and counting wrappers, disable()
+    restores the original functions. Nothing is wrapped while the profiler is disabled.
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import bisect
+import functools
+import json
+import time
+import types
+from collections import Counter
+# ----------------------------------------------------------------------------------------------- #
+
+
+# upper bucket edges of the latency histograms in seconds, the last bucket is open
+BUCKETS = [1e-5, 2e-5, 5e-5, 1e-4, 2e-4, 5e-4, 1e-3, 2e-3, 5e-3, 1e-2, 2e-2, 5e-2, 1e-1, 2e-1,
+           5e-1, 1.0]
+
+PHASES = {
+    'stroke_initialize': 'initialize',
+    'stroke_finalize'  : 'finalize',
+    'stroke_update'    : 'update',
+    'flush_dab'        : 'dab',
+}
+SAMPLE_PREFIXES = ('paint_',)
+SAMPLE_SUFFIXES = ('_paint', '_equalize')
+
+COMMANDS = [
+    'ngSkinLayer',
+    'ngLayerPaintCtxSetValue',
+    'ngLayerPaintCtxInitialize',
+    'ngLayerPaintCtxFinalize',
+    'undoInfo',
+    'polyListComponentConversion',
+    'pointPosition',
+    'ls',
+    'listRelatives',
+]
+
+
+# ----------------------------------------------------------------------------------------------- #
+class Histogram(object):
+    """ latency histogram with fixed logarithmic buckets """
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)
+        self.count  = 0
+        self.total  = 0.0
+        self.worst  = 0.0
+
+    def add(self, seconds):
+        self.counts[bisect.bisect_left(BUCKETS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.worst = max(self.worst, seconds)
+
+    def percentile(self, fraction):
+        """ upper bucket edge below which the given fraction of all samples fall """
+        target = fraction * self.count
+        running = 0
+        for index, count in enumerate(self.counts):
+            running += count
+            if running >= target and count:
+                return min(BUCKETS[index], self.worst) if index < len(BUCKETS) else self.worst
+        return 0.0
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'total': self.total,
+            'mean': self.total / self.count if self.count else 0.0,
+            'worst': self.worst,
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'buckets': dict(zip([str(edge) for edge in BUCKETS] + ['inf'], self.counts)),
+        }
+
+
+class StrokeProfiler(object):
+    """ collects phase timings and command counts per brush stroke """
+    def __init__(self):
+        self.histograms = {}
+        self.strokes    = []
+        self.current    = None
+        self.idle       = Counter()  # commands dispatched outside of a stroke
+        self._patches   = []
+
+    def reset(self):
+        self.histograms = {}
+        self.strokes    = []
+        self.current    = None
+        self.idle       = Counter()
+
+    # RECORDING --------------------------------------------------------------------------------- #
+    def enter(self, phase):
+        if phase == 'initialize' or self.current is None:
+            self.current = {'phases': {}, 'samples': 0, 'commands': Counter(),
+                            'start': time.perf_counter()}
+
+    def exit(self, phase, seconds):
+        self.histograms.setdefault(phase, Histogram()).add(seconds)
+        stroke = self.current
+        stroke['phases'][phase] = stroke['phases'].get(phase, 0.0) + seconds
+        if phase == 'sample':
+            stroke['samples'] += 1
+        if phase == 'finalize':
+            stroke['wall'] = time.perf_counter() - stroke.pop('start')
+            stroke['commands'] = dict(stroke['commands'])
+            self.strokes.append(stroke)
+            self.current = None
+
+    def count(self, command):
+        (self.current['commands'] if self.current else self.idle)[command] += 1
+
+    # PATCHING ---------------------------------------------------------------------------------- #
+    def _patch(self, owner, name, wrapper):
+        original = owner.__dict__[name] if isinstance(owner, type) else getattr(owner, name)
+        self._patches.append((owner, name, original))
+        setattr(owner, name, wrapper(getattr(owner, name)))
+
+    def _timed(self, phase):
+        def decorate(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                self.enter(phase)
+                start = time.perf_counter()
+                try:
+                    return function(*args, **kwargs)
+                finally:
+                    self.exit(phase, time.perf_counter() - start)
+            return wrapper
+        return decorate
+
+    def _counted(self, command):
+        def decorate(function):
+            @functools.wraps(function)
+            def wrapper(*args, **kwargs):
+                self.count(command)
+                return function(*args, **kwargs)
+            return wrapper
+        return decorate
+
+    def install(self, classes, commands=COMMANDS, modules=()):
+        """
+        :param classes:  brush classes, stroke phases are found by method name
+                          - list [type, type, ...]
+        :param commands: maya.cmds commands to count
+                          - list [str, str, ...]
+        :param modules:  modules that imported ngLayerPaintCtxInitialize by name
+                          - list [module, module, ...]
+        """
+        from maya import cmds
+        from ngSkinTools.mllInterface import MllInterface
+
+        for cls in classes:
+            for name in list(vars(cls)):
+                if not isinstance(vars(cls)[name], types.FunctionType):
+                    continue
+                if name in PHASES:
+                    self._patch(cls, name, self._timed(PHASES[name]))
+                elif name.startswith(SAMPLE_PREFIXES) or name.endswith(SAMPLE_SUFFIXES):
+                    self._patch(cls, name, self._timed('sample'))
+
+        for command in commands:
+            if hasattr(cmds, command):
+                self._patch(cmds, command, self._counted(command))
+        for module in modules:
+            if hasattr(module, 'ngLayerPaintCtxInitialize'):
+                self._patch(module, 'ngLayerPaintCtxInitialize',
+                            self._counted('ngLayerPaintCtxInitialize'))
+        for name in list(vars(MllInterface)):
+            if isinstance(vars(MllInterface)[name], types.FunctionType) and name[0] != '_':
+                self._patch(MllInterface, name, self._counted('mll.' + name))
+
+    def uninstall(self):
+        for owner, name, original in reversed(self._patches):
+            setattr(owner, name, original)
+        self._patches = []
+
+    @property
+    def installed(self):
+        return bool(self._patches)
+
+    # REPORTS ----------------------------------------------------------------------------------- #
+    def summary(self):
+        """
+        :return summary: latency histograms per phase and the recorded strokes
+                          - dict
+        """
+        return {
+            'phases': {phase: histogram.as_dict()
+                       for phase, histogram in sorted(self.histograms.items())},
+            'strokes': self.strokes,
+            'idle': dict(self.idle),
+        }
+
+    def format(self):
+        lines = ['{:<12}{:>8}{:>12}{:>12}{:>12}{:>12}'.format(
+            'phase', 'count', 'mean ms', 'p95 ms', 'worst ms', 'total ms'
+        )]
+        for phase, histogram in sorted(self.histograms.items()):
+            stats = histogram.as_dict()
+            lines.append('{:<12}{:>8}{:>12.3f}{:>12.3f}{:>12.3f}{:>12.1f}'.format(
+                phase, stats['count'], stats['mean'] * 1e3, stats['p95'] * 1e3,
+                stats['worst'] * 1e3, stats['total'] * 1e3
+            ))
+        for index, stroke in enumerate(self.strokes):
+            calls = sum(stroke['commands'].values())
+            lines.append('stroke {:<4} {:>6} samples {:>10.1f}ms {:>8} calls  {}'.format(
+                index, stroke['samples'], stroke['wall'] * 1e3, calls,
+                ', '.join('{} {}'.format(name, count)
+                          for name, count in Counter(stroke['commands']).most_common(4))
+            ))
+        return '\n'.join(lines)
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+PROFILER = StrokeProfiler()
+
+
+def enable(*classes):
+    """
+    start profiling the given brush classes, NgPaintStroke if none are given.
+
+    :return profiler: the module profiler
+                       - StrokeProfiler
+    """
+    if PROFILER.installed:
+        PROFILER.uninstall()
+    from . import api
+    PROFILER.install(classes or [api.NgPaintStroke], modules=[api])
+    return PROFILER
+
+
+def disable():
+    """ restore all wrapped functions, recorded stats are kept """
+    PROFILER.uninstall()
+
+
+def report():
+    """ :return text: phase latencies and per stroke command counts - str """
+    return PROFILER.format()
+
+
+def dump(path):
+    """ write the phase histograms and recorded strokes to a json file """
+    with open(path, 'w') as report_file:
+        json.dump(PROFILER.summary(), report_file, indent=4)
+# ----------------------------------------------------------------------------------------------- #
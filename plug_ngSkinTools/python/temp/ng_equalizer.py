@@ -2,6 +2,8 @@ import maya.cmds as cmds
 import alex_utils as utils
 from ngSkinTools.mllInterface import MllInterface
 
+from abMaya.plug_ngSkinTools.python.core.history import HISTORY
+
 
 class Equalize(object):
     def __init__(self):
@@ -51,12 +53,21 @@ class Equalize(object):
 
     def set_vert(self, mode, intensity):
         self.intensity = intensity
-        for influences in self.ngs_influence:
-            self.new_weight_list = []
-            self.ngs_weight_list = self.ngs_weight_dict[influences]
-            self.vert_weight_list = self.vert_weight_dict[influences]
-            self.modes[mode]()
-            self.mll.setInfluenceWeights(self.ngs_layer_id, influences[1], self.new_weight_list)
+        mesh = self.mll.getTargetInfo()[0]
+        HISTORY.open_chunk("equalize " + mode)  # one undo step for all influences
+        try:
+            for influences in self.ngs_influence:
+                self.new_weight_list = []
+                self.ngs_weight_list = self.ngs_weight_dict[influences]
+                self.vert_weight_list = self.vert_weight_dict[influences]
+                self.modes[mode]()
+                HISTORY.record((mesh, self.ngs_layer_id, influences[1]),
+                               self.ngs_weight_list, self.new_weight_list)
+                self.mll.setInfluenceWeights(
+                    self.ngs_layer_id, influences[1], self.new_weight_list
+                )
+        finally:
+            HISTORY.close_chunk()
 
     def vert_max(self):
         for i in range(self.ngs_vert_count):
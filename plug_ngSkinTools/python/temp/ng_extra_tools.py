@@ -18,13 +18,16 @@
 import maya.cmds as cmds
 import maya.mel as mel
 import ng_equalizer as eq
-from math import pow
-from math import sqrt
-from scipy.stats import norm
+import numpy as np
 from ngSkinTools.mllInterface import MllInterface
 from ngSkinTools.utils import Utils
 from ngSkinTools.paint import ngLayerPaintCtxInitialize
 
+from abMaya.libModel.lib.geodesic import get_geodesic
+from abMaya.plug_ngSkinTools.python.core.adjust import normal_cdf
+from abMaya.plug_ngSkinTools.python.core.dab import equalize
+from abMaya.plug_ngSkinTools.python.core.history import HISTORY
+
 
 def get_target_control(ui_path):
     """ returns a list of controls or layouts within a specified ui path """
@@ -59,6 +62,8 @@ class UseNgBrush(object):
         self.mode = 1
         self.value = 1
         self.volumeThreshold = -0.1
+        self.geodesic = None  # surface distances of the mesh, read on the first equalize dab
+        self.weights = None
 
         self.mll = MllInterface()
         self.selection_name = cmds.ls(selection=True)
@@ -105,7 +110,7 @@ class UseNgBrush(object):
         avg_value = (self.max_value + self.min_value) / 2
         normalized_range = self.max_value - self.min_value
         dist_value = vertex_weight - avg_value
-        modifier = norm.cdf(dist_value, loc=0, scale=(0.1 * normalized_range)) - vertex_weight
+        modifier = normal_cdf(dist_value, loc=0, scale=(0.1 * normalized_range)) - vertex_weight
         contrast_weight = vertex_weight + (modifier * value)
         contrast_weight = max(self.min_value, min(contrast_weight, self.max_value))
         cmds.ngSkinLayer(paintIntensity=contrast_weight)
@@ -162,28 +167,23 @@ class UseNgBrush(object):
     def volume_equalize(self, vert_id, value):
         """
         i.e a volumetric match operation with a falloff.
-        applies weight values inside the brush radius onto other vertices inside a spherical volume
+        applies weight values inside the brush radius onto other vertices within the volume
+        radius, measured along the surface so unconnected nearby surfaces are not affected.
         """
-        origin_vertex = '.'.join([self.selection_name[0], 'vtx[%s]']) % vert_id
-        vertex_weight = self.ngs_weight_list[vert_id]
-        v1 = cmds.pointPosition(origin_vertex)
-        for i in range(len(self.ngs_weight_list)):
-            target_weight = self.ngs_weight_list[i]
-            if target_weight == vertex_weight:
-                continue
-            if i == vert_id:
-                continue
-            target_vertex = '.'.join([self.selection_name[0], 'vtx[%s]']) % i
-            v2 = cmds.pointPosition(target_vertex)
-            target_distance = sqrt(
-                (pow((v1[0]-v2[0]), 2)) +
-                (pow((v1[1]-v2[1]), 2)) +
-                (pow((v1[2]-v2[2]), 2))
-            )
-            if target_distance > (self.volumeThreshold * value):
-                continue
-            falloff = (self.volumeThreshold - target_distance) / self.volumeThreshold
-            eq_weight = target_weight - (((target_weight - vertex_weight) * value) * falloff)
+        if self.volumeThreshold <= 0:
+            return
+        if self.geodesic is None:
+            # maya api imports on first use, the module stays importable by the headless suite
+            from maya.api import OpenMaya
+            from abMaya.libModel.lib.mesh import get_mesh_data
+
+            self.geodesic = get_geodesic(get_mesh_data(self.mesh[0], OpenMaya.MSpace.kWorld))
+            self.weights = np.array(self.ngs_weight_list, dtype=np.float64)
+        vertices, distances = self.geodesic.distances(vert_id, self.volumeThreshold * value)
+        vertices, eq_weights = equalize(
+            self.weights, vert_id, value, vertices, distances, self.volumeThreshold
+        )
+        for i, eq_weight in zip(vertices.tolist(), eq_weights.tolist()):
             cmds.ngSkinLayer(paintIntensity=eq_weight)
             cmds.ngLayerPaintCtxSetValue(self.stroke_id, i, 1)
 
@@ -210,6 +210,12 @@ class MapOperations(object):
         self.max_value = max(self.ngs_weight_list)
         self.min_value = min(self.ngs_weight_list)
 
+    def set_weights(self, new_weight_list):
+        """ writes the map with Maya undo, changed values are also kept in the weight history """
+        key = (self.mll.getTargetInfo()[0], self.ngs_layer_id, self.ngs_influence)
+        HISTORY.record(key, self.ngs_weight_list, new_weight_list, name="map operation")
+        self.mll.setInfluenceWeights(self.ngs_layer_id, self.ngs_influence, new_weight_list)
+
     def grow_map(self, intensity):
         """ pushes the border of the active weight map outwards """
         self.get_data()
@@ -229,7 +235,7 @@ class MapOperations(object):
             grow_weight = vertex_weight + (abs(vertex_weight - max_avg) * intensity)
             grow_weight = min(grow_weight, self.max_value)
             new_weight_list.append(grow_weight)
-        self.mll.setInfluenceWeights(self.ngs_layer_id, self.ngs_influence, new_weight_list)
+        self.set_weights(new_weight_list)
 
     def shrink_map(self, intensity):
         """ pulls the border of the active weight map inwards """
@@ -250,7 +256,7 @@ class MapOperations(object):
             shrink_weight = vertex_weight - (abs(vertex_weight - min_avg) * intensity)
             shrink_weight = max(shrink_weight, self.min_value)
             new_weight_list.append(shrink_weight)
-        self.mll.setInfluenceWeights(self.ngs_layer_id, self.ngs_influence, new_weight_list)
+        self.set_weights(new_weight_list)
 
     def conceal_map(self, intensity):
         """ smooth operation for the active map by only lowering values """
@@ -274,7 +280,7 @@ class MapOperations(object):
             conceal_weight = vertex_weight * (1 - (weight_diff * intensity))
             conceal_weight = max(conceal_weight, min_avg)
             new_weight_list.append(conceal_weight)
-        self.mll.setInfluenceWeights(self.ngs_layer_id, self.ngs_influence, new_weight_list)
+        self.set_weights(new_weight_list)
 
     def spread_map(self, intensity):
         """ smooth operation for the active map by only increasing values """
@@ -298,7 +304,7 @@ class MapOperations(object):
             spread_weight = vertex_weight + weight_diff * intensity
             spread_weight = min(spread_weight, max_avg)
             new_weight_list.append(spread_weight)
-        self.mll.setInfluenceWeights(self.ngs_layer_id, self.ngs_influence, new_weight_list)
+        self.set_weights(new_weight_list)
 
     def gain_map(self, intensity):
         """ 'reverse scale' tool that only increases weight values above 0 """
@@ -312,7 +318,7 @@ class MapOperations(object):
             gain_weight = vertex_weight + (vertex_weight * intensity)
             gain_weight = min(gain_weight, 1)
             new_weight_list.append(gain_weight)
-        self.mll.setInfluenceWeights(self.ngs_layer_id, self.ngs_influence, new_weight_list)
+        self.set_weights(new_weight_list)
 
     def contrast_map(self, intensity):
         """ sharpens the edge of the active weight map """
@@ -326,11 +332,11 @@ class MapOperations(object):
                 new_weight_list.append(vertex_weight)
                 continue
             dist_value = vertex_weight - avg_value
-            modifier = norm.cdf(dist_value, loc=0, scale=(0.1 * normalized_range)) - vertex_weight
+            modifier = normal_cdf(dist_value, loc=0, scale=(0.1 * normalized_range)) - vertex_weight
             contrast_weight = vertex_weight + modifier * intensity
             contrast_weight = max(self.min_value, min(contrast_weight, self.max_value))
             new_weight_list.append(contrast_weight)
-        self.mll.setInfluenceWeights(self.ngs_layer_id, self.ngs_influence, new_weight_list)
+        self.set_weights(new_weight_list)
 
 
 class PaintExtras(object):
@@ -359,6 +365,8 @@ class PaintExtras(object):
 
         self.dividerEQ = "dividerEQ"
         self.editMenuEQ = 'Vertex Equalizer Tool'
+        self.undoMenu = 'Undo Weight Edit'
+        self.redoMenu = 'Redo Weight Edit'
 
         self.extra_check = "Use Extra Brushes"
         self.extra_frame = "Extra Tools"
@@ -489,9 +497,7 @@ class PaintExtras(object):
 
     def insert_menu(self):
         """ adds the equalizer tool to the ngSkin Tools menu bar """
-        if cmds.menuItem('equalizer_item', exists=True):
-            cmds.deleteUI('equalizer_item', menuItem=True)
-            cmds.deleteUI('divider_item', menuItem=True)
+        delete_menu()
         self.dividerEQ = cmds.menuItem(
             'divider_item',
             parent=self.ng_menu[-1],
@@ -503,6 +509,20 @@ class PaintExtras(object):
             label=self.editMenuEQ,
             command=eq.open_equalizer
         )
+        # map operations and the equalizer are also kept in the weight history, it undoes them
+        # independently of the Maya undo queue
+        self.undoMenu = cmds.menuItem(
+            'undo_weights_item',
+            parent=self.ng_menu[-1],
+            label=self.undoMenu,
+            command=undo_weights
+        )
+        self.redoMenu = cmds.menuItem(
+            'redo_weights_item',
+            parent=self.ng_menu[-1],
+            label=self.redoMenu,
+            command=redo_weights
+        )
 
     def insert_ui(self):
         """ adds the custom brush modes to an existing ngSkinTools UI """
@@ -692,12 +712,39 @@ class PaintExtras(object):
 
 
 def insert_ui_frame(*args):
+    from abMaya.plug_ngSkinTools.python import api
+    api.watch_scene(HISTORY)
     PE = PaintExtras()
     PE.insert_ui()
     PE.insert_menu()
 
 
 def delete_ui_frame(*args):
-    cmds.deleteUI('equalizer_item', menuItem=True)
-    cmds.deleteUI('divider_item', menuItem=True)
+    delete_menu()
     cmds.deleteUI("extra_brushes")
+
+
+def delete_menu():
+    for item in ('divider_item', 'equalizer_item', 'undo_weights_item', 'redo_weights_item'):
+        if cmds.menuItem(item, exists=True):
+            cmds.deleteUI(item, menuItem=True)
+
+
+def undo_weights(*args):
+    """ reverts the last map operation or equalize step of the weight history """
+    from abMaya.plug_ngSkinTools.python import api
+    try:
+        if api.undo_weights(HISTORY) is None:
+            cmds.warning("No weight edit to undo")
+    except ValueError as error:
+        cmds.warning(str(error))
+
+
+def redo_weights(*args):
+    """ reapplies the last undone step of the weight history """
+    from abMaya.plug_ngSkinTools.python import api
+    try:
+        if api.redo_weights(HISTORY) is None:
+            cmds.warning("No weight edit to redo")
+    except ValueError as error:
+        cmds.warning(str(error))
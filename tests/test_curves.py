@@ -0,0 +1,184 @@
+"""
+    Regression tests of libAnim.lib.curve and libAnim.lib.reduce, run with python -m pytest tests
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import numpy as np
+import pytest
+
+from abMaya.libAnim.lib.curve import CurveSet
+from abMaya.libAnim.lib.reduce import reduce_curves, simplify, synthetic_capture
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+def reference_time(times, infinity, time):
+    """ sample time after cycle infinity, one curve at a time """
+    first, last = times[0], times[-1]
+    if (time < first and infinity[0] == 2) or (time > last and infinity[1] == 2):
+        return first + (time - first) % (last - first)
+    return time
+
+
+def reference_bezier(t0, t1, v0, v1, handles, time):
+    """ weighted segment solved by bisection, independent of the Newton steps of the CurveSet """
+    (timeA, valueA), (timeB, valueB) = handles
+
+    def bezier(start, a, b, end, parameter):
+        inverse = 1.0 - parameter
+        return (inverse ** 3 * start + 3 * inverse ** 2 * parameter * a +
+                3 * inverse * parameter ** 2 * b + parameter ** 3 * end)
+
+    low, high = 0.0, 1.0
+    for _ in range(60):
+        middle = 0.5 * (low + high)
+        if bezier(t0, timeA, timeB, t1, middle) < time:
+            low = middle
+        else:
+            high = middle
+    return bezier(v0, valueA, valueB, v1, 0.5 * (low + high))
+
+
+def reference(curveSet, index, time):
+    """ value of one curve at one time, evaluated key by key """
+    start, end = curveSet.offsets[index], curveSet.offsets[index + 1]
+    times, values = curveSet.times[start:end], curveSet.values[start:end]
+    infinity = curveSet.preInfinity[index], curveSet.postInfinity[index]
+    time = reference_time(times, infinity, time)
+
+    if time < times[0]:
+        slope = curveSet.inSlopes[start] if infinity[0] == 1 else 0.0
+        return values[0] + slope * (time - times[0])
+    if time >= times[-1]:
+        slope = curveSet.outSlopes[end - 1] if infinity[1] == 1 else 0.0
+        return values[-1] + slope * (time - times[-1])
+
+    key = int(np.searchsorted(times, time, side='right')) - 1
+    t0, t1, v0, v1 = times[key], times[key + 1], values[key], values[key + 1]
+    outSlope, inSlope = curveSet.outSlopes[start + key], curveSet.inSlopes[start + key + 1]
+    if curveSet.steps[start + key]:
+        return v0
+    if curveSet.weighted[index]:
+        w0, w1 = curveSet.outWeights[start + key], curveSet.inWeights[start + key + 1]
+        handles = (t0 + w0, v0 + w0 * outSlope), (t1 - w1, v1 - w1 * inSlope)
+        return reference_bezier(t0, t1, v0, v1, handles, time)
+
+    deltaTime = t1 - t0
+    parameter = (time - t0) / deltaTime
+    squared, cubed = parameter ** 2, parameter ** 3
+    return ((2 * cubed - 3 * squared + 1) * v0 + (cubed - 2 * squared + parameter) * deltaTime *
+            outSlope + (-2 * cubed + 3 * squared) * v1 + (cubed - squared) * deltaTime * inSlope)
+
+
+def reference_values(curveSet, sampleTimes):
+    return np.array([[reference(curveSet, index, time) for time in sampleTimes]
+                     for index in range(curveSet.curveCount)])
+
+
+def random_curves(count=6, keys=7, seed=0, **kwargs):
+    """ spline curves with random key times and values """
+    generator = np.random.default_rng(seed)
+    curves = []
+    for _ in range(count):
+        times = np.cumsum(generator.uniform(0.5, 4.0, keys)) - 5.0
+        curves.append((times, generator.normal(size=keys)))
+    curveSet = CurveSet.from_keys(curves, **kwargs)
+    curveSet.inSlopes, curveSet.outSlopes = curveSet.auto_slopes('spline')
+    curveSet.outSlopes = curveSet.outSlopes + generator.normal(0.0, 0.3, curveSet.keyCount)
+    return curveSet
+# ----------------------------------------------------------------------------------------------- #
+
+
+# EVALUATION ------------------------------------------------------------------------------------ #
+SAMPLES = np.linspace(-20.0, 40.0, 241)
+
+
+@pytest.mark.parametrize('infinity', ['constant', 'linear', 'cycle'])
+def test_infinity(infinity):
+    curveSet = random_curves(preInfinity=infinity, postInfinity=infinity)
+    expected = reference_values(curveSet, SAMPLES)
+    assert np.allclose(curveSet.evaluate(SAMPLES), expected, atol=1e-9)
+
+
+def test_mixed_infinity():
+    infinity = ['constant', 'linear', 'cycle', 'cycle', 'linear', 'constant']
+    curveSet = random_curves(preInfinity=infinity, postInfinity=infinity[::-1])
+    assert np.allclose(curveSet.evaluate(SAMPLES), reference_values(curveSet, SAMPLES),
+                       atol=1e-9)
+
+
+def test_steps():
+    curveSet = random_curves(postInfinity='cycle')
+    curveSet.steps = np.random.default_rng(1).random(curveSet.keyCount) < 0.5
+    assert curveSet.steps.any()
+    assert np.allclose(curveSet.evaluate(SAMPLES), reference_values(curveSet, SAMPLES),
+                       atol=1e-9)
+
+
+def test_weighted_bezier():
+    generator = np.random.default_rng(2)
+    curveSet = random_curves(weighted=[True, False, True, True, False, True],
+                             preInfinity='linear', postInfinity='cycle')
+    # handles inside their segment keep the time of every segment monotonic
+    gaps = np.diff(curveSet.times)
+    outWeights = np.concatenate([gaps, [1.0]]) * generator.uniform(0.05, 0.5, curveSet.keyCount)
+    inWeights = np.concatenate([[1.0], gaps]) * generator.uniform(0.05, 0.5, curveSet.keyCount)
+    curveSet.outWeights, curveSet.inWeights = outWeights, inWeights
+    assert np.allclose(curveSet.evaluate(SAMPLES), reference_values(curveSet, SAMPLES),
+                       atol=1e-6)
+
+
+def test_unsorted_samples():
+    curveSet = random_curves(preInfinity='linear', postInfinity='constant')
+    curveSet.steps = np.arange(curveSet.keyCount) % 5 == 2
+    sampleTimes = np.random.default_rng(3).permutation(SAMPLES)
+    expected = reference_values(curveSet, sampleTimes)
+    assert np.allclose(curveSet.evaluate(sampleTimes), expected, atol=1e-9)
+    # small blocks split the curves across several passes
+    assert np.allclose(curveSet.evaluate(sampleTimes, blockSize=300), expected, atol=1e-9)
+
+
+def test_samples_on_keys():
+    curveSet = random_curves(preInfinity='cycle', postInfinity='linear')
+    sampleTimes = np.sort(curveSet.times)
+    assert np.allclose(curveSet.evaluate(sampleTimes), reference_values(curveSet, sampleTimes),
+                       atol=1e-9)
+# ----------------------------------------------------------------------------------------------- #
+
+
+# REDUCTION ------------------------------------------------------------------------------------- #
+def test_simplify_error_bound():
+    curveSet = synthetic_capture(curves=20, frames=300, seed=4)
+    tolerance = np.linspace(0.001, 0.1, curveSet.curveCount)
+    reduced, errors = simplify(curveSet, tolerance)
+    assert reduced.keyCount < curveSet.keyCount
+    assert np.all(errors <= tolerance + 1e-12)
+
+    # the reduced curves evaluated at the original keys stay within the tolerance
+    for index in range(curveSet.curveCount):
+        times, values = curveSet.curve(index)
+        error = np.abs(reduced.select([index]).evaluate(times)[0] - values).max()
+        assert error <= tolerance[index] + 1e-9
+        assert error == pytest.approx(errors[index], abs=1e-9)
+
+
+def test_simplify_keeps_end_keys():
+    curveSet = synthetic_capture(curves=5, frames=120, seed=5)
+    reduced, _ = simplify(curveSet, 0.05)
+    for index in range(curveSet.curveCount):
+        times, values = curveSet.curve(index)
+        reducedTimes, reducedValues = reduced.curve(index)
+        assert (reducedTimes[0], reducedTimes[-1]) == (times[0], times[-1])
+        assert (reducedValues[0], reducedValues[-1]) == (values[0], values[-1])
+
+
+def test_reduce_curves_chunks():
+    curveSet = synthetic_capture(curves=12, frames=200, seed=6)
+    reduced, report = reduce_curves(curveSet, 0.01, processes=0, chunkSize=5)
+    single, _ = simplify(curveSet, 0.01)
+    assert np.array_equal(reduced.offsets, single.offsets)
+    assert np.allclose(reduced.evaluate(np.arange(200.0)), single.evaluate(np.arange(200.0)))
+    assert [channel['keys'] for channel in report] == [200] * 12
+    assert all(channel['error'] <= 0.01 for channel in report)
+# ----------------------------------------------------------------------------------------------- #
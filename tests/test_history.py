@@ -0,0 +1,49 @@
+"""
+    Regression tests of plug_ngSkinTools.python.core.history, run with python -m pytest tests
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import numpy as np
+import pytest
+
+from abMaya.plug_ngSkinTools.python.core.history import WeightHistory
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+def edited_history(size=100):
+    """ history of one edit of the map 'map', with the maps as a dict """
+    history = WeightHistory(tolerance=0.0)
+    before = np.linspace(0.0, 1.0, size)
+    after = before.copy()
+    after[10:20] = 0.25
+    history.record('map', before, after, name='edit')
+    return history, before, {'map': after}
+
+
+def test_undo_redo_round_trip():
+    history, before, maps = edited_history()
+    after = maps['map'].copy()
+    assert history.undo(maps.__getitem__, maps.__setitem__).name == 'edit'
+    assert np.array_equal(maps['map'], before)
+    history.redo(maps.__getitem__, maps.__setitem__)
+    assert np.array_equal(maps['map'], after)
+
+
+def test_undo_refuses_changed_weights():
+    history, _, maps = edited_history()
+    maps['map'][15] = 0.9  # e.g. a stroke painted after the recorded edit
+    changed = maps['map'].copy()
+    with pytest.raises(ValueError):
+        history.undo(maps.__getitem__, maps.__setitem__)
+    assert np.array_equal(maps['map'], changed)
+    assert len(history) == 1
+
+
+def test_undo_refuses_other_mesh():
+    history, _, maps = edited_history()
+    maps['map'] = np.zeros(12)  # same key, smaller mesh
+    with pytest.raises(ValueError):
+        history.undo(maps.__getitem__, maps.__setitem__)
+# ----------------------------------------------------------------------------------------------- #
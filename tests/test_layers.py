@@ -0,0 +1,30 @@
+"""
+    Regression tests of plug_ngSkinTools.python.core.layers, run with python -m pytest tests
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import numpy as np
+
+from abMaya.plug_ngSkinTools.python.core.layers import Layer, composite
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+def test_full_layer_replaces_lower_layers():
+    base = Layer('base', ['a', 'b'], [[1.0, 0.5, 0.0], [0.0, 0.5, 1.0]])
+    top = Layer('top', ['c'], [[1.0, 1.0, 0.0]], mask=[1.0, 0.5, 1.0])
+    influences, weights = composite([base, top])
+    assert influences == ['a', 'b', 'c']
+    assert np.allclose(weights, [[0.0, 0.25, 0.0], [0.0, 0.25, 1.0], [1.0, 0.5, 0.0]])
+
+
+def test_duplicate_influences_add_up():
+    duplicated = Layer('duplicated', ['a', 'b', 'a'], [[0.25, 0.0], [0.5, 0.5], [0.25, 0.5]])
+    merged = Layer('merged', ['a', 'b'], [[0.5, 0.5], [0.5, 0.5]])
+    lower = Layer('lower', ['b'], [[1.0, 1.0]])
+    for normalize in (True, False):
+        expected = composite([lower, merged], normalize=normalize)
+        assert composite([lower, duplicated], normalize=normalize)[0] == expected[0]
+        assert np.allclose(composite([lower, duplicated], normalize=normalize)[1], expected[1])
+# ----------------------------------------------------------------------------------------------- #
@@ -0,0 +1,82 @@
+"""
+    Regression tests of plug_ngSkinTools.python.core.maps against the legacy MapOperations of
+    temp/ng_extra_tools.py on the headless benchmark backend, run with python -m pytest tests
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import json
+
+import numpy as np
+import pytest
+
+from abMaya.libModel.lib.synthetic import grid
+from abMaya.plug_ngSkinTools.python import batch
+from abMaya.plug_ngSkinTools.python.benchmark.backend import SkinBackend
+from abMaya.plug_ngSkinTools.python.benchmark.suite import weight_maps
+from abMaya.plug_ngSkinTools.python.core import maps
+# ----------------------------------------------------------------------------------------------- #
+
+
+INTENSITY  = 0.5
+OPERATIONS = ['grow', 'shrink', 'conceal', 'spread', 'gain', 'contrast']
+
+
+# ----------------------------------------------------------------------------------------------- #
+@pytest.fixture(scope='module')
+def legacy():
+    """ legacy results of every operation on the first weight map of a small grid """
+    meshData = grid(8, 8)
+    weights = weight_maps(meshData)
+    backend = SkinBackend(meshData, weights)
+    results = {}
+    _, extraTools = backend.install()
+    try:
+        operations = extraTools.MapOperations()
+        for name in OPERATIONS:
+            backend.reset()
+            getattr(operations, name + '_map')(INTENSITY)
+            results[name] = backend.weights[backend.target].copy()
+    finally:
+        backend.uninstall()
+    return meshData, weights[backend.target], results
+
+
+@pytest.mark.parametrize('name', OPERATIONS)
+def test_matches_legacy(legacy, name):
+    meshData, weights, results = legacy
+    result = maps.apply(name, weights, INTENSITY, meshData.adjacency(includeSelf=True))
+    assert not np.array_equal(results[name], weights)  # the operation changed the map
+    assert np.allclose(result, results[name], rtol=0.0, atol=1e-6)
+
+
+def test_input_untouched(legacy):
+    meshData, weights, _ = legacy
+    original = weights.copy()
+    for name in OPERATIONS:
+        maps.apply(name, weights, INTENSITY, meshData.adjacency(includeSelf=True))
+    assert np.array_equal(weights, original)
+# ----------------------------------------------------------------------------------------------- #
+
+
+# MANIFEST -------------------------------------------------------------------------------------- #
+def write_manifest(directory, assets):
+    path = directory / 'manifest.json'
+    path.write_text(json.dumps({'assets': assets}))
+    return str(path)
+
+
+def test_manifest_valid(tmp_path):
+    assets = [{'scene': 'a.ma', 'operations': [{'mesh': 'body', 'operation': 'grow'}]}]
+    assert batch.load_manifest(write_manifest(tmp_path, assets)) == assets
+
+
+@pytest.mark.parametrize('asset, message', [
+    ({'operations': []}, 'without scene'),
+    ({'scene': 'a.ma', 'operations': [{'mesh': 'body', 'operation': 'blur'}]}, 'unknown'),
+    ({'scene': 'a.ma', 'operations': [{'operation': 'grow'}]}, 'without mesh'),
+])
+def test_manifest_errors(tmp_path, asset, message):
+    with pytest.raises(ValueError, match=message):
+        batch.load_manifest(write_manifest(tmp_path, [asset]))
+# ----------------------------------------------------------------------------------------------- #
@@ -0,0 +1,88 @@
+"""
+    Tests of the preflight mesh hygiene checks on synthetic arrays, run with python -m pytest tests
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import numpy as np
+
+from abMaya.abPreFlight.core import mesh_rules
+from abMaya.libModel.lib.raster import rasterize
+from abMaya.libModel.lib.synthetic import grid
+from abMaya.libModel.lib.topology import MeshData
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+def quads(points, faces, uvs=None):
+    """ MeshData of quads, uvs are given per vertex """
+    faceConnects = np.asarray(faces, dtype=np.int32).reshape(-1)
+    faceCounts = np.full(len(faces), 4, dtype=np.int32)
+    if uvs is None:
+        return MeshData(points, faceCounts, faceConnects)
+    return MeshData(points, faceCounts, faceConnects, uvs=uvs, uvCounts=faceCounts.copy(),
+                    uvIds=faceConnects.copy())
+
+
+def uv_squares(offset):
+    """ two unit uv squares, the second shifted along u by offset """
+    corners = np.array([[0, 0], [1, 0], [1, 1], [0, 1]], dtype=np.float64)
+    uvs = np.concatenate([corners, corners + [offset, 0.0]])
+    points = np.pad(uvs, ((0, 0), (0, 1)))
+    return quads(points, [[0, 1, 2, 3], [4, 5, 6, 7]], uvs)
+# ----------------------------------------------------------------------------------------------- #
+
+
+# ----------------------------------------------------------------------------------------------- #
+def test_clean_grid():
+    meshData = grid(4, 4)
+    assert not len(mesh_rules.zero_area_faces(meshData))
+    assert not len(mesh_rules.lamina_faces(meshData))
+    assert not len(mesh_rules.non_manifold_edges(meshData))
+    assert not len(mesh_rules.overlapping_uv_shells(meshData, resolution=64))
+
+
+def test_zero_area_faces():
+    meshData = grid(2, 2)
+    meshData.points[[0, 1, 3, 4]] = meshData.points[0]  # collapse face 0
+    assert mesh_rules.zero_area_faces(meshData).tolist() == [0]
+
+
+def test_lamina_faces():
+    meshData = grid(1, 2)
+    lamina = quads(meshData.points, np.concatenate([
+        meshData.faceConnects.reshape(-1, 4), meshData.faceConnects.reshape(-1, 4)[:1, ::-1]
+    ]))
+    assert mesh_rules.lamina_faces(lamina).tolist() == [0, 2]
+
+
+def test_non_manifold_edges():
+    points = [[0, 0, 0], [1, 0, 0], [1, 0, 1], [0, 0, 1], [0, 1, 1], [1, 1, 1], [0, -1, 1],
+              [1, -1, 1]]
+    meshData = quads(points, [[0, 1, 2, 3], [3, 2, 5, 4], [3, 2, 7, 6]])
+    assert mesh_rules.non_manifold_edges(meshData).tolist() == [[2, 3]]
+
+
+def test_overlapping_uv_shells():
+    assert mesh_rules.overlapping_uv_shells(uv_squares(0.5), resolution=64).tolist() == [0, 4]
+    assert not len(mesh_rules.overlapping_uv_shells(uv_squares(1.0), resolution=63))
+
+
+def test_touching_uv_shells():
+    """ shells sharing a slanted edge, it runs through pixel centers at 10 pixels per uv unit """
+    uvs = np.array([[0, 0], [1, 0], [2, 1], [0, 1], [1, 0], [3, 0], [3, 1], [2, 1]], np.float64)
+    meshData = quads(np.pad(uvs, ((0, 0), (0, 1))), [[0, 1, 2, 3], [4, 5, 6, 7]], uvs)
+    assert not len(mesh_rules.overlapping_uv_shells(meshData, resolution=30))
+    assert not len(mesh_rules.overlapping_uv_shells(uv_squares(1.5), resolution=64))
+
+
+def test_raster_shared_edges():
+    """ pixel centers on the shared diagonal and borders are covered exactly once """
+    triangles = np.array([[[0, 0], [4, 0], [4, 4]], [[0, 0], [4, 4], [0, 4]],
+                          [[4, 0], [8, 0], [4, 4]]], dtype=np.float64) * 2.0 - 0.5
+    coverage = np.zeros((8, 16), dtype=np.int64)
+    for index, pixelX, pixelY, weights in rasterize(triangles, 16, 8):
+        np.add.at(coverage, (pixelY, pixelX), 1)
+        assert np.allclose(weights.sum(axis=1), 1.0)
+    assert coverage.max() == 1
+# ----------------------------------------------------------------------------------------------- #
@@ -0,0 +1,60 @@
+"""
+    Regression tests of libModel.lib.symmetry, run with python -m pytest tests
+"""
+
+
+# IMPORTS --------------------------------------------------------------------------------------- #
+import numpy as np
+
+from abMaya.libModel.lib import symmetry
+from abMaya.libModel.lib.synthetic import grid
+# ----------------------------------------------------------------------------------------------- #
+
+
+INFLUENCES = ['L_arm', 'R_arm']
+
+
+# ----------------------------------------------------------------------------------------------- #
+def side_weights(meshData):
+    """ L_arm weights the positive X side, R_arm the negative side, the plane is split evenly """
+    positive = meshData.points[:, 0] > 1e-6
+    negative = meshData.points[:, 0] < -1e-6
+    weights = np.full((2, meshData.vertexCount), 0.5)
+    weights[0, positive], weights[1, positive] = 1.0, 0.0
+    weights[0, negative], weights[1, negative] = 0.0, 1.0
+    return weights
+
+
+def test_positive_keeps_source_rows():
+    meshData = grid(4, 4)
+    weights = side_weights(meshData)
+    weights[:, 4] = [0.75, 0.25]  # positive side vertex, mirrored onto vertex 0
+    rows = symmetry.influence_remap(INFLUENCES)
+    result = symmetry.build_symmetry(meshData, cache=False).mirror_data(weights, 'positive', rows)
+
+    positive = meshData.points[:, 0] > 1e-6
+    assert np.array_equal(result[:, positive], weights[:, positive])
+    assert np.array_equal(result[:, 4], [0.75, 0.25])
+    assert np.array_equal(result[:, 0], [0.25, 0.75])
+
+
+def test_flip_swaps_rows_everywhere():
+    meshData = grid(4, 4)
+    weights = side_weights(meshData)
+    rows = symmetry.influence_remap(INFLUENCES)
+    result = symmetry.build_symmetry(meshData, cache=False).mirror_data(weights, 'flip', rows)
+    assert np.array_equal(result, weights)
+
+
+def test_cache_follows_points():
+    symmetry.clear_cache()
+    meshData = grid(4, 4)
+    first = symmetry.build_symmetry(meshData)
+    assert symmetry.build_symmetry(meshData) is first
+
+    meshData.points[:, 0] += 0.1  # same topology, the plane no longer splits the grid evenly
+    moved = symmetry.build_symmetry(meshData)
+    assert moved is not first
+    assert not np.array_equal(moved.side, first.side)
+    symmetry.clear_cache()
+# ----------------------------------------------------------------------------------------------- #